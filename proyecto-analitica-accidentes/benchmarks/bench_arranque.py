@@ -0,0 +1,114 @@
+"""
+Benchmark: arranque en frío del dashboard y de generar_graficos.py
+Ejecuta cada punto de entrada en un proceso nuevo con `python -X importtime`
+y reporta el tiempo total (mediana), el tiempo de importación (suma de los
+módulos de primer nivel), cuántos módulos se cargaron y cuáles de los
+módulos pesados (pandas, matplotlib, seaborn, plotly, duckdb, pyarrow)
+llegaron a importarse. El dashboard corre en modo bare de Streamlit con
+cada fuente; generar_graficos.py se mide con --help y con una ejecución
+sin cambios (todo en caché), que es lo que paga cada job programado.
+Usa los datos de data/ y db/ del proyecto (ejecutar antes create_database.py).
+Ejecutar: python benchmarks/bench_arranque.py [--repeticiones 5] [--detalle 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROYECTO_DIR = os.path.join(BASE_DIR, '..')
+
+APP = os.path.join(PROYECTO_DIR, 'dashboard', 'app_dashboard.py')
+GRAFICOS = os.path.join(PROYECTO_DIR, 'scripts', 'generar_graficos.py')
+
+REPETICIONES = 5
+
+MODULOS_PESADOS = ['pandas', 'matplotlib.pyplot', 'seaborn', 'plotly.express',
+                   'plotly.graph_objects', 'duckdb', 'pyarrow.dataset']
+
+# Nombre → (argumentos de python, variables de entorno)
+ESCENARIOS = {
+    'import streamlit': (['-c', 'import streamlit'], {}),
+    'dashboard memoria': ([APP], {'DASHBOARD_FUENTE': 'memoria'}),
+    'dashboard sqlite': ([APP], {'DASHBOARD_FUENTE': 'sqlite'}),
+    'dashboard duckdb': ([APP], {'DASHBOARD_FUENTE': 'duckdb'}),
+    'graficos --help': ([GRAFICOS, '--help'], {}),
+    'graficos sin cambios': ([GRAFICOS], {}),
+}
+
+
+def parsear_importtime(salida):
+    """
+    Líneas de -X importtime → lista de (nivel, modulo, propio_us,
+    acumulado_us). El nivel 0 son las importaciones de primer nivel.
+    """
+    modulos = []
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:'):
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        if not propio.strip().isdigit():
+            continue  # encabezado
+        nivel = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        modulos.append((nivel, nombre.strip(), int(propio), int(acumulado)))
+    return modulos
+
+
+def ejecutar(argumentos, entorno):
+    """Corre un escenario una vez. Retorna (segundos, módulos importados, código de salida)."""
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + argumentos,
+        capture_output=True, text=True, env=dict(os.environ, **entorno), cwd=PROYECTO_DIR
+    )
+    return time.perf_counter() - inicio, parsear_importtime(proceso.stderr), proceso.returncode
+
+
+def medir(argumentos, entorno, repeticiones):
+    tiempos, importaciones = [], []
+    for _ in range(repeticiones):
+        segundos, modulos, codigo = ejecutar(argumentos, entorno)
+        tiempos.append(segundos)
+        importaciones.append(sum(acumulado for nivel, _, _, acumulado in modulos if nivel == 0) / 1e6)
+    return {
+        'total': statistics.median(tiempos),
+        'importacion': statistics.median(importaciones),
+        'modulos': modulos,
+        'codigo': codigo,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío (-X importtime)")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--detalle', type=int, default=0,
+                        help="Mostrar los N módulos de primer nivel más lentos de cada escenario")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🚀 BENCHMARK: ARRANQUE EN FRÍO")
+    print("=" * 80)
+
+    # Una ejecución previa deja la caché de gráficos al día
+    subprocess.run([sys.executable, GRAFICOS], capture_output=True, cwd=PROYECTO_DIR)
+
+    print(f"\n{'Escenario':<22} {'Total (s)':>10} {'Imports (s)':>12} {'Módulos':>8}  Pesados cargados")
+    print("-" * 80)
+    for nombre, (argumentos, entorno) in ESCENARIOS.items():
+        m = medir(argumentos, entorno, args.repeticiones)
+        cargados = {modulo for _, modulo, _, _ in m['modulos']}
+        pesados = ', '.join(modulo for modulo in MODULOS_PESADOS if modulo in cargados) or '-'
+        aviso = '' if m['codigo'] == 0 else f"  ⚠️ salida {m['codigo']}"
+        print(f"{nombre:<22} {m['total']:>10.3f} {m['importacion']:>12.3f} {len(m['modulos']):>8}  "
+              f"{pesados}{aviso}")
+        if args.detalle:
+            primer_nivel = sorted((fila for fila in m['modulos'] if fila[0] == 0), key=lambda fila: -fila[3])
+            for _, modulo, _, acumulado in primer_nivel[:args.detalle]:
+                print(f"{'':<24}{acumulado / 1e6:>8.3f} s  {modulo}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+Benchmark: escalabilidad del proyecto completo con datos sintéticos
+Para cada escala genera road_accidents.csv (generar_dataset.py, con el
+esquema de Kaggle o, con --esquema us, el tipo US-Accidents) en una
+copia temporal del proyecto (scripts/, dashboard/, data/, db/, docs/) y
+mide, cada etapa en su propio proceso:
+  - create_database.py: tiempo total y por paso (informe de instrumentacion.py)
+  - las vistas SQLite de proyecto.db (mediana de SELECT * completo)
+  - generar_graficos.py: etapa resumen y etapa graficos, forzadas
+  - las funciones de agregación del dashboard con cada fuente (bench_fuentes.py)
+Los resultados se guardan en benchmarks/resultados/escalas_<fecha>.json y
+--comparar muestra la diferencia con una ejecución guardada.
+Ejecutar: python benchmarks/bench_escalas.py [--escalas 10k,100k,1m] [--esquema us] [--comparar base.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from generar_dataset import ESCALAS, ESQUEMAS, parsear_filas, generar_csv
+from bench_fuentes import medir_en_proceso
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROYECTO_DIR = os.path.join(BASE_DIR, '..')
+RESULTADOS_DIR = os.path.join(BASE_DIR, 'resultados')
+
+ESCALAS_DEFECTO = ['10k', '100k', '1m']
+REPETICIONES = 3
+
+# Desde este tamaño el ETL corre por bloques (--chunksize) en vez de en memoria
+CHUNKSIZE = 500_000
+
+FUENTES_DASHBOARD = ['memoria', 'sqlite', 'duckdb']
+
+
+def preparar_proyecto(carpeta):
+    """Copia de scripts/ y dashboard/ con data/, db/ y docs/graficos vacíos."""
+    ignorar = shutil.ignore_patterns('__pycache__', 'data')
+    for nombre in ('scripts', 'dashboard'):
+        shutil.copytree(os.path.join(PROYECTO_DIR, nombre), os.path.join(carpeta, nombre), ignore=ignorar)
+    for nombre in ('data', 'db', os.path.join('docs', 'graficos')):
+        os.makedirs(os.path.join(carpeta, nombre))
+
+
+def ejecutar(carpeta, script, *argumentos):
+    """Corre un script de la copia del proyecto. Retorna los segundos de pared."""
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, script, *argumentos], cwd=os.path.join(carpeta, 'scripts'),
+                   capture_output=True, text=True, check=True)
+    return time.perf_counter() - inicio
+
+
+def medir_etl(carpeta, filas):
+    informe = os.path.join(carpeta, 'db', 'informe_ejecucion.json')
+    argumentos = ['--nrows', '0', '--informe', informe]
+    if filas > CHUNKSIZE:
+        argumentos += ['--chunksize', str(CHUNKSIZE)]
+    segundos = ejecutar(carpeta, 'create_database.py', *argumentos)
+    with open(informe, encoding='utf-8') as f:
+        datos = json.load(f)
+    return {
+        'segundos': segundos,
+        'modo': datos['modo'],
+        'registros': datos['registros'],
+        'pico_rss_mb': datos['pico_rss_mb'],
+        'pasos': {p['id']: p['segundos'] for p in datos['pasos']},
+    }
+
+
+def medir_vistas(db_file, repeticiones):
+    """Mediana de leer completa cada vista de proyecto.db."""
+    conn = sqlite3.connect(db_file)
+    vistas = [fila[0] for fila in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")]
+    resultado = {}
+    for vista in vistas:
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            conn.execute(f'SELECT * FROM "{vista}"').fetchall()
+            tiempos.append(time.perf_counter() - inicio)
+        resultado[vista] = statistics.median(tiempos)
+    conn.close()
+    return resultado
+
+
+def medir_graficos(carpeta):
+    resumen = ejecutar(carpeta, 'generar_graficos.py', '--etapa', 'resumen', '--forzar')
+    graficos = ejecutar(carpeta, 'generar_graficos.py', '--etapa', 'graficos', '--forzar')
+    with open(os.path.join(carpeta, 'docs', 'graficos', 'manifiesto_graficos.json'), encoding='utf-8') as f:
+        manifiesto = json.load(f)
+    return {
+        'resumen': resumen,
+        'graficos': graficos,
+        'por_grafico': {archivo: r['segundos'] for archivo, r in manifiesto['graficos'].items()},
+    }
+
+
+def medir_dashboard(carpeta, repeticiones):
+    data_dir = os.path.join(carpeta, 'data')
+    db_file = os.path.join(carpeta, 'db', 'proyecto.db')
+    return {nombre: medir_en_proceso(nombre, data_dir, db_file, repeticiones) for nombre in FUENTES_DASHBOARD}
+
+
+def medir_escala(escala, repeticiones, esquema='kaggle'):
+    filas = parsear_filas(escala)
+    with tempfile.TemporaryDirectory() as carpeta:
+        preparar_proyecto(carpeta)
+        print(f"\n⏳ {escala}: generando {filas:,} filas ({esquema})...")
+        inicio = time.perf_counter()
+        tamano = generar_csv(os.path.join(carpeta, 'data', 'road_accidents.csv'), filas, esquema=esquema)
+        generacion = time.perf_counter() - inicio
+
+        print(f"   create_database.py...")
+        etl = medir_etl(carpeta, filas)
+        print(f"   vistas SQLite...")
+        vistas = medir_vistas(os.path.join(carpeta, 'db', 'proyecto.db'), repeticiones)
+        print(f"   generar_graficos.py...")
+        graficos = medir_graficos(carpeta)
+        print(f"   agregaciones del dashboard...")
+        dashboard = medir_dashboard(carpeta, repeticiones)
+
+    return {
+        'filas': filas,
+        'esquema': esquema,
+        'csv_mb': tamano / 1024**2,
+        'generacion': generacion,
+        'etl': etl,
+        'vistas': vistas,
+        'graficos': graficos,
+        'dashboard': dashboard,
+    }
+
+
+def metricas(resultado):
+    """Métricas principales de una escala, en segundos (o MB), para tablas y comparaciones."""
+    fila = {
+        'ETL total': resultado['etl']['segundos'],
+        'ETL pico RSS (MB)': resultado['etl']['pico_rss_mb'],
+        'Vistas (suma)': sum(resultado['vistas'].values()),
+        'Gráficos: resumen': resultado['graficos']['resumen'],
+        'Gráficos: render': resultado['graficos']['graficos'],
+    }
+    for nombre, m in resultado['dashboard'].items():
+        fila[f'Dashboard {nombre}: apertura'] = m['apertura']
+        fila[f'Dashboard {nombre}: rerun'] = m['defecto']
+    return fila
+
+
+def imprimir_resultados(resultados, base=None):
+    for escala, resultado in resultados.items():
+        print(f"\n📏 {escala}: {resultado['filas']:,} filas ({resultado.get('esquema', 'us')}), CSV de {resultado['csv_mb']:,.1f} MB "
+              f"(ETL en modo {resultado['etl']['modo']})")
+        anterior = metricas(base[escala]) if base and escala in base else {}
+        for nombre, valor in metricas(resultado).items():
+            delta = ''
+            if anterior.get(nombre):
+                delta = f"  ({(valor - anterior[nombre]) / anterior[nombre]:+.0%} vs {anterior[nombre]:.3f})"
+            print(f"   {nombre:<32} {valor:>10.3f}{delta}")
+        pasos = resultado['etl']['pasos']
+        lentos = sorted(pasos.items(), key=lambda paso: -paso[1])[:3]
+        print(f"   {'Pasos más lentos del ETL':<32} " + ', '.join(f"{i} ({s:.2f} s)" for i, s in lentos))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidad con datos sintéticos")
+    parser.add_argument('--escalas', default=','.join(ESCALAS_DEFECTO),
+                        help=f"Escalas separadas por coma ({', '.join(ESCALAS)} o números de filas)")
+    parser.add_argument('--esquema', choices=ESQUEMAS, default='kaggle',
+                        help="Esquema del CSV sintético (generar_dataset.py). Por defecto: %(default)s")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--salida', default=None,
+                        help="JSON de resultados. Por defecto: benchmarks/resultados/escalas_<fecha>.json")
+    parser.add_argument('--comparar', default=None, help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📈 BENCHMARK: ESCALABILIDAD CON DATOS SINTÉTICOS")
+    print("=" * 80)
+
+    resultados = {escala: medir_escala(escala, args.repeticiones, args.esquema)
+                  for escala in args.escalas.split(',')}
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)['escalas']
+    imprimir_resultados(resultados, base)
+
+    salida = args.salida or os.path.join(RESULTADOS_DIR, f"escalas_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump({
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'entorno': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                        'cpus': os.cpu_count()},
+            'escalas': resultados,
+        }, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"\n📁 Resultados: {salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: generación de fechas sintéticas (paso 2.5)
+Compara el bucle original en Python (random + timedelta por fila) con la
+versión vectorizada de transformaciones.generar_fechas_aleatorias.
+Ejecutar: python benchmarks/bench_fechas.py [--tamanos 10000 132000 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, '..', 'scripts'))
+
+from transformaciones import FECHA_INICIO, FECHA_FIN, generar_fechas_aleatorias
+
+TAMANOS = [10_000, 132_000, 1_000_000]
+
+
+def generar_fechas_bucle(n):
+    """Implementación original: tres random.randint por fila."""
+    dias_dif = (FECHA_FIN - FECHA_INICIO).days
+    fechas = []
+    for _ in range(n):
+        dias_random = random.randint(0, dias_dif)
+        fecha = FECHA_INICIO + timedelta(days=dias_random)
+        hora = random.randint(0, 23)
+        minuto = random.randint(0, 59)
+        fecha = fecha.replace(hour=hora, minute=minuto)
+        fechas.append(fecha)
+    return fechas
+
+
+def medir(funcion, n, repeticiones):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(n)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de fechas sintéticas")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    # Reproducibilidad: misma semilla → mismas fechas
+    assert (generar_fechas_aleatorias(1000, 42) == generar_fechas_aleatorias(1000, 42)).all()
+
+    print("=" * 80)
+    print("⏱️  BENCHMARK: FECHAS SINTÉTICAS")
+    print("=" * 80)
+    print(f"\n{'Filas':>12} {'Bucle (s)':>12} {'NumPy (s)':>12} {'Aceleración':>12}")
+    print("-" * 52)
+    for n in args.tamanos:
+        t_bucle = medir(generar_fechas_bucle, n, args.repeticiones)
+        t_numpy = medir(lambda k: generar_fechas_aleatorias(k, 42), n, args.repeticiones)
+        print(f"{n:>12,} {t_bucle:>12.4f} {t_numpy:>12.4f} {t_bucle / t_numpy:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
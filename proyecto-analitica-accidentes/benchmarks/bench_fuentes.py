@@ -0,0 +1,209 @@
+"""
+Benchmark: fuentes de datos del dashboard (pandas en memoria, SQLite, DuckDB)
+Para cada tamaño genera un dataset enriquecido sintético y lo escribe como
+CSV, Parquet (particionado por año si hay fechas) y proyecto.db. Con el
+esquema kaggle (por defecto) los bloques de generar_dataset.py pasan por la
+limpieza y el enriquecimiento del ETL, así que tienen las columnas que
+create_database.py produce con el archivo de Kaggle; --esquema us usa un
+enriquecido tipo US-Accidents con años, Zipf de ciudades, nulos y atípicos. Luego, en un proceso por
+fuente, mide la apertura (carga/índices o pool de conexiones), la memoria
+RSS que queda ocupada y el tiempo del conjunto completo de consultas de un
+rerun del dashboard (opciones de los tres filtros, agregados y las dos
+distribuciones), sin caché, con la selección por defecto y con una
+selección estrecha.
+Ejecutar: python benchmarks/bench_fuentes.py [--filas 10000,132000,5000000] [--esquema us]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import psutil
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, '..', 'scripts'))
+
+from fuentes import FUENTES, abrir_fuente
+from carga_sqlite import cargar_accidentes
+from columnar import ruta_columnar, escribir_bloque, finalizar_salida
+from transformaciones import COLUMNAS_CLAVE
+from generar_dataset import ESQUEMAS, generar_bloque_kaggle
+
+FILAS = [10_000, 132_000, 5_000_000]
+REPETICIONES = 3
+
+# Bloques para escribir Parquet y SQLite sin materializar todo de nuevo
+FILAS_POR_BLOQUE = 500_000
+
+COLUMNAS_DASHBOARD = ['severity', 'city', 'weather_condition', 'temperature_f',
+                      'visibility_mi', 'anio', 'mes']
+
+CLIMAS = ['Clear', 'Fair', 'Cloudy', 'Mostly Cloudy', 'Partly Cloudy', 'Overcast',
+          'Light Rain', 'Rain', 'Heavy Rain', 'Light Snow', 'Snow', 'Fog', 'Haze',
+          'Thunderstorm', 'Drizzle', 'Smoke', 'Windy', 'Mist', 'Sleet', 'Desconocido']
+
+
+def generar_enriquecido(n, semilla=0):
+    """Dataset enriquecido tipo US-Accidents: ciudades con distribución de Zipf, nulos y atípicos."""
+    rng = np.random.default_rng(semilla)
+    ciudades = np.array([f'Ciudad {i:04d}' for i in range(2000)], dtype=object)
+    rango_ciudad = np.minimum(rng.zipf(1.3, size=n), len(ciudades)) - 1
+    anio = rng.integers(2016, 2024, size=n).astype('float64')
+    anio[rng.random(n) < 0.02] = np.nan
+    visibilidad = np.clip(rng.gamma(4.0, 2.5, size=n), 0, 100).round(1)
+    return pd.DataFrame({
+        'severity': rng.choice([1, 2, 3, 4], size=n, p=[0.05, 0.7, 0.2, 0.05]),
+        'city': ciudades[rango_ciudad],
+        'weather_condition': np.array(CLIMAS, dtype=object)[rng.integers(0, len(CLIMAS), size=n)],
+        'temperature_f': rng.normal(62, 18, size=n).round(1),
+        'visibility_mi': visibilidad,
+        'anio': anio,
+        'mes': np.where(np.isnan(anio), np.nan, rng.integers(1, 13, size=n)),
+    })
+
+
+def enriquecer_bloque_kaggle(inicio, n, semilla=0):
+    """Bloque con el esquema de Kaggle tras la limpieza y el enriquecimiento del ETL."""
+    from create_database import limpiar_dataset, enriquecer_dataset
+    df = generar_bloque_kaggle(inicio, n, semilla)
+    # Las columnas sintéticas del ETL usan el generador global de NumPy
+    np.random.seed([semilla, inicio])
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = limpiar_dataset(df, semilla=semilla)
+        df = enriquecer_dataset(df, len(df.columns))
+    return df.drop(columns=COLUMNAS_CLAVE)
+
+
+def bloques_enriquecidos(n, semilla=0, esquema='kaggle'):
+    """Dataset enriquecido sintético en bloques de FILAS_POR_BLOQUE filas."""
+    if esquema == 'us':
+        df = generar_enriquecido(n, semilla)
+        return [df.iloc[i:i + FILAS_POR_BLOQUE] for i in range(0, n, FILAS_POR_BLOQUE)]
+    return [enriquecer_bloque_kaggle(inicio, min(FILAS_POR_BLOQUE, n - inicio), semilla)
+            for inicio in range(0, n, FILAS_POR_BLOQUE)]
+
+
+def preparar_datos(carpeta, n, esquema='kaggle'):
+    """Escribe CSV, Parquet y proyecto.db en `carpeta` (data/ y db/)."""
+    data_dir = os.path.join(carpeta, 'data')
+    db_file = os.path.join(carpeta, 'db', 'proyecto.db')
+    os.makedirs(data_dir)
+    os.makedirs(os.path.dirname(db_file))
+
+    bloques = bloques_enriquecidos(n, esquema=esquema)
+    for i, bloque in enumerate(bloques):
+        bloque.to_csv(os.path.join(data_dir, 'dataset_enriquecido.csv'), index=False,
+                      mode='w' if i == 0 else 'a', header=(i == 0))
+
+    # Parquet después del CSV para que sea la salida vigente
+    ruta = ruta_columnar('parquet', data_dir)
+    esquema = None
+    for i, bloque in enumerate(bloques):
+        esquema = escribir_bloque(bloque, ruta, 'parquet', f'parte-{i:05d}', esquema)
+    finalizar_salida(ruta)
+
+    with sqlite3.connect(db_file) as conn:
+        cargar_accidentes(conn, bloques)
+    conn.close()
+    return data_dir, db_file
+
+
+def consultas_dashboard(fuente, estrecha=False):
+    """Las consultas de un rerun del dashboard, en el mismo orden."""
+    consultar = fuente['consultar']
+    filtros = {}
+    # Sin fechas en origen (esquema de Kaggle) no hay filtro de año
+    conteos = consultar(filtros)['conteos']
+    if 'anio' in conteos:
+        anios = sorted(conteos['anio'].index)
+        filtros['anio'] = anios[-1:] if estrecha else anios
+    ciudades = consultar(filtros)['conteos']['city'].head(10).index.tolist()
+    filtros['city'] = ciudades[:1] if estrecha else ciudades[:5]
+    severidades = sorted(consultar(filtros)['conteos']['severity'].index)
+    filtros['severity'] = severidades[:2] if estrecha else severidades
+    agregados = consultar(filtros)
+    for columna in ('visibility_mi', 'temperature_f'):
+        fuente['distribucion'](columna, filtros)
+    return agregados['total']
+
+
+def medir_fuente(nombre, data_dir, db_file, repeticiones):
+    """Ejecuta la medición de una fuente (en este proceso) y retorna sus métricas."""
+    proceso = psutil.Process()
+    base = proceso.memory_info().rss
+    inicio = time.perf_counter()
+    fuente = abrir_fuente(nombre, data_dir=data_dir, db_file=db_file,
+                          columnas=COLUMNAS_DASHBOARD, tamano_cache=0)
+    apertura = time.perf_counter() - inicio
+    rss_apertura = proceso.memory_info().rss - base
+
+    resultado = {'fuente': nombre, 'apertura': apertura, 'rss_mb': rss_apertura / 1024**2}
+    for escenario, estrecha in (('defecto', False), ('estrecha', True)):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado[f'filas_{escenario}'] = consultas_dashboard(fuente, estrecha)
+            tiempos.append(time.perf_counter() - inicio)
+        resultado[escenario] = float(np.median(tiempos))
+    resultado['rss_total_mb'] = (proceso.memory_info().rss - base) / 1024**2
+    return resultado
+
+
+def medir_en_proceso(nombre, data_dir, db_file, repeticiones):
+    salida = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--medir', nombre, '--data-dir', data_dir,
+         '--db', db_file, '--repeticiones', str(repeticiones)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de las fuentes de datos del dashboard")
+    parser.add_argument('--filas', default=','.join(str(n) for n in FILAS),
+                        help="Tamaños separados por coma (por defecto: 10000,132000,5000000)")
+    parser.add_argument('--fuentes', default=','.join(FUENTES))
+    parser.add_argument('--esquema', choices=ESQUEMAS, default='kaggle',
+                        help="Origen del enriquecido sintético. Por defecto: %(default)s")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--medir', choices=FUENTES, help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Proceso hijo: mide una sola fuente y devuelve JSON por stdout
+    if args.medir:
+        print(json.dumps(medir_fuente(args.medir, args.data_dir, args.db, args.repeticiones)))
+        return
+
+    print("=" * 80)
+    print("🗄️ BENCHMARK: FUENTES DE DATOS DEL DASHBOARD")
+    print("=" * 80)
+
+    for n in [int(valor) for valor in args.filas.split(',')]:
+        with tempfile.TemporaryDirectory() as carpeta:
+            print(f"\n⏳ Preparando {n:,} filas ({args.esquema}: CSV, Parquet y SQLite)...")
+            inicio = time.perf_counter()
+            data_dir, db_file = preparar_datos(carpeta, n, args.esquema)
+            print(f"   listo en {time.perf_counter() - inicio:.1f} s")
+
+            print(f"\n{'Fuente':>8} {'Apertura (s)':>13} {'RSS (MB)':>9} {'Rerun (s)':>10} "
+                  f"{'Estrecha (s)':>13} {'Filas sel.':>11}")
+            print("-" * 70)
+            for nombre in args.fuentes.split(','):
+                m = medir_en_proceso(nombre, data_dir, db_file, args.repeticiones)
+                print(f"{nombre:>8} {m['apertura']:>13.3f} {m['rss_total_mb']:>9.1f} "
+                      f"{m['defecto']:>10.3f} {m['estrecha']:>13.3f} {m['filas_defecto']:>11,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark: memoria pico de la limpieza (paso 2)
+Compara la cadena original (copy, duplicated + drop_duplicates, dos rename,
+astype(str) por columna) con create_database.limpiar_dataset. Cada
+variante corre en procesos aparte sobre el mismo CSV sintético: uno mide el
+pico con tracemalloc (asignaciones de NumPy/Python) y otro, sin tracemalloc
+(que tiene su propio costo en memoria), el pico de RSS muestreado con
+psutil, que incluye los buffers de Arrow de las cadenas.
+Ejecutar: python benchmarks/bench_memoria_limpieza.py [--filas 1000000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import psutil
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, '..', 'scripts'))
+
+from transformaciones import (
+    COLUMNAS_TEXTO,
+    mapear_columnas,
+    hash_filas,
+    crear_columnas_sinteticas,
+    convertir_numericos,
+    convertir_fechas,
+)
+
+FILAS = 1_000_000
+VARIANTES = ['anterior', 'actual']
+
+# Intervalo de muestreo del RSS (segundos)
+MUESTREO = 0.002
+
+
+def generar_csv(ruta, n, semilla=0):
+    """CSV con el formato de road_accidents.csv: nulos y ~2% de duplicados."""
+    rng = np.random.default_rng(semilla)
+    ciudades = np.array(['bogotá', 'Medellín ', 'cali', 'CARTAGENA', 'Barranquilla'], dtype=object)
+    climas = np.array(['Clear', 'rain', 'Cloudy ', 'Fog', 'snow'], dtype=object)
+    minutos = rng.integers(0, 730 * 1440, size=n)
+    df = pd.DataFrame({
+        'ID': np.arange(n),
+        'Severity': rng.integers(1, 5, size=n),
+        'Start_Time': (np.datetime64('2023-01-01T00:00') + minutos.astype('timedelta64[m]')).astype(str),
+        'City': ciudades[rng.integers(0, len(ciudades), size=n)],
+        'State': np.array(['CA', 'NY', 'TX'], dtype=object)[rng.integers(0, 3, size=n)],
+        'Weather_Condition': climas[rng.integers(0, len(climas), size=n)],
+        'Temperature': rng.normal(60, 15, size=n).round(1),
+        'Visibility': rng.uniform(0, 12, size=n).round(2),
+        'Description': rng.choice(['Choque leve', 'Colisión múltiple', 'Vuelco'], size=n),
+    })
+    for col, fraccion in [('City', 0.1), ('Weather_Condition', 0.1), ('Temperature', 0.05)]:
+        df.loc[rng.random(n) < fraccion, col] = np.nan
+    # Duplicados exactos: filas repetidas al final
+    repetidas = df.sample(frac=0.02, random_state=semilla)
+    pd.concat([df, repetidas]).to_csv(ruta, index=False)
+
+
+def limpieza_anterior(df_original):
+    """Cadena de limpieza original (serie), antes de evitar las copias."""
+    df = df_original.copy()
+    duplicados = df.duplicated().sum()
+    df = df.drop_duplicates()
+    df.isnull().sum()
+    columnas_nuevas, columnas_encontradas = mapear_columnas(df.columns)
+    df = df.rename(columns=columnas_nuevas)
+    df = df.rename(columns={v: k for k, v in columnas_encontradas.items()})
+    contenido = hash_filas(df)
+    df['row_key'] = hash_filas(df[['id']]) if 'id' in df.columns else contenido
+    df['row_hash'] = contenido
+    df = crear_columnas_sinteticas(df)
+    df, _ = convertir_numericos(df)
+    for col in COLUMNAS_TEXTO:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().str.title()
+            df[col] = df[col].replace('Nan', 'Desconocido')
+    df = convertir_fechas(df)
+    return df, duplicados
+
+
+def limpieza_actual(df):
+    from create_database import limpiar_dataset
+    return limpiar_dataset(df), None
+
+
+def importar_variante(variante):
+    """Importa fuera de la medición los módulos que usa la variante."""
+    if variante == 'actual':
+        import create_database  # noqa: F401
+
+
+def medir_variante(variante, ruta, con_tracemalloc):
+    """Ejecuta una variante (en este proceso) y retorna sus métricas."""
+    importar_variante(variante)
+    df = pd.read_csv(ruta, low_memory=False)
+    crudo = df.memory_usage(deep=True).sum()
+    proceso = psutil.Process()
+    base = proceso.memory_info().rss
+
+    pico = {'rss': base}
+    terminado = threading.Event()
+
+    def muestrear():
+        while not terminado.is_set():
+            pico['rss'] = max(pico['rss'], proceso.memory_info().rss)
+            time.sleep(MUESTREO)
+
+    hilo = threading.Thread(target=muestrear, daemon=True)
+    funcion = limpieza_anterior if variante == 'anterior' else limpieza_actual
+
+    if con_tracemalloc:
+        tracemalloc.start()
+    hilo.start()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado, _ = funcion(df)
+    segundos = time.perf_counter() - inicio
+    terminado.set()
+    hilo.join()
+    pico_tracemalloc = 0
+    if con_tracemalloc:
+        _, pico_tracemalloc = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'variante': variante,
+        'filas': len(resultado),
+        'crudo_mb': crudo / 1024**2,
+        'tracemalloc_mb': pico_tracemalloc / 1024**2,
+        'rss_extra_mb': (pico['rss'] - base) / 1024**2,
+        'segundos': segundos,
+    }
+
+
+def medir_en_proceso(variante, ruta, *opciones):
+    salida = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--medir', variante, '--csv', ruta, *opciones],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de la limpieza")
+    parser.add_argument('--filas', type=int, default=FILAS)
+    parser.add_argument('--medir', choices=VARIANTES, help=argparse.SUPPRESS)
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    parser.add_argument('--tracemalloc', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Proceso hijo: mide una sola variante y devuelve JSON por stdout
+    if args.medir:
+        print(json.dumps(medir_variante(args.medir, args.csv, args.tracemalloc)))
+        return
+
+    print("=" * 80)
+    print("🧠 BENCHMARK: MEMORIA PICO DE LA LIMPIEZA")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'road_accidents.csv')
+        print(f"\n⏳ Generando CSV sintético de {args.filas:,} filas...")
+        generar_csv(ruta, args.filas)
+
+        print(f"\n{'Variante':>10} {'Crudo (MB)':>11} {'tracemalloc':>12} {'RSS extra':>10} "
+              f"{'Pico/crudo':>11} {'Tiempo (s)':>11}")
+        print("-" * 70)
+        for variante in VARIANTES:
+            m = medir_en_proceso(variante, ruta)
+            m['tracemalloc_mb'] = medir_en_proceso(variante, ruta, '--tracemalloc')['tracemalloc_mb']
+            # Pico total = DataFrame cargado + lo que la limpieza asigna encima
+            relacion = (m['crudo_mb'] + m['rss_extra_mb']) / m['crudo_mb']
+            print(f"{variante:>10} {m['crudo_mb']:>11.1f} {m['tracemalloc_mb']:>12.1f} "
+                  f"{m['rss_extra_mb']:>10.1f} {relacion:>10.2f}x {m['segundos']:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: memoria del dashboard con muchas sesiones simultáneas
+Genera un dataset enriquecido sintético (Parquet, Arrow IPC y proyecto.db,
+con el esquema de Kaggle o, con --esquema us, el tipo US-Accidents)
+y, en un proceso por fuente, abre N sesiones del dashboard con el
+AppTest de Streamlit, todas vivas a la vez en el mismo proceso (como en un
+servidor): la mitad con la selección por defecto y la otra mitad con una
+ciudad distinta cada una. Tras cada sesión mide la RSS del proceso. La
+primera sesión paga la carga de la fuente (st.cache_resource); las demás
+deberían costar casi nada, porque todas comparten la misma fuente, sus
+índices de solo lectura y sus consultas memorizadas.
+Ejecutar: python benchmarks/bench_sesiones.py [--filas 1000000] [--sesiones 20] [--esquema us]
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import psutil
+
+from bench_fuentes import FUENTES, bloques_enriquecidos, preparar_datos
+from columnar import ruta_columnar, escribir_bloque, finalizar_salida
+from generar_dataset import ESQUEMAS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(BASE_DIR, '..', 'dashboard', 'app_dashboard.py')
+
+FILAS = 1_000_000
+SESIONES = 20
+
+# Ciudades distintas que se reparten las sesiones con selección propia
+CIUDADES_ROTADAS = 10
+
+
+def escribir_arrow(data_dir, n, esquema_origen='kaggle'):
+    """Salida Arrow IPC (la vigente: se escribe después del Parquet)."""
+    ruta = ruta_columnar('arrow', data_dir)
+    esquema = None
+    for i, bloque in enumerate(bloques_enriquecidos(n, esquema=esquema_origen)):
+        esquema = escribir_bloque(bloque, ruta, 'arrow', f'parte-{i:05d}', esquema)
+    finalizar_salida(ruta)
+
+
+def abrir_sesion(i):
+    """Una sesión del dashboard; las impares eligen una sola ciudad."""
+    from streamlit.testing.v1 import AppTest
+    sesion = AppTest.from_file(APP, default_timeout=600).run()
+    if i % 2:
+        ciudad = sesion.sidebar.multiselect[1]
+        opciones = ciudad.options
+        ciudad.set_value([opciones[(i // 2) % min(len(opciones), CIUDADES_ROTADAS)]]).run()
+    if sesion.exception:
+        raise RuntimeError(f"sesión {i}: {sesion.exception[0].message}")
+    return sesion
+
+
+def medir_sesiones(n_sesiones):
+    """Abre las sesiones (sin cerrarlas) y retorna la RSS tras cada una, en MB."""
+    proceso = psutil.Process()
+    base = proceso.memory_info().rss
+    sesiones = []
+    rss = []
+    tiempos = []
+    for i in range(n_sesiones):
+        inicio = time.perf_counter()
+        sesiones.append(abrir_sesion(i))
+        tiempos.append(time.perf_counter() - inicio)
+        gc.collect()
+        rss.append((proceso.memory_info().rss - base) / 1024**2)
+    descripcion = sesiones[0].sidebar.caption[0].value if sesiones[0].sidebar.caption else ''
+    return {'rss_mb': rss, 'segundos': tiempos, 'descripcion': descripcion}
+
+
+def medir_en_proceso(fuente, data_dir, db_file, n_sesiones):
+    entorno = dict(os.environ, DASHBOARD_FUENTE=fuente, DASHBOARD_DATA=data_dir, DASHBOARD_DB=db_file)
+    salida = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--medir', '--sesiones', str(n_sesiones)],
+        capture_output=True, text=True, check=True, env=entorno
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria del dashboard con N sesiones simultáneas")
+    parser.add_argument('--filas', type=int, default=FILAS)
+    parser.add_argument('--sesiones', type=int, default=SESIONES)
+    parser.add_argument('--fuentes', default=','.join(FUENTES))
+    parser.add_argument('--esquema', choices=ESQUEMAS, default='kaggle',
+                        help="Origen del enriquecido sintético. Por defecto: %(default)s")
+    parser.add_argument('--medir', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Proceso hijo: la fuente y los datos llegan por las variables DASHBOARD_*
+    if args.medir:
+        print(json.dumps(medir_sesiones(args.sesiones)))
+        return
+
+    print("=" * 80)
+    print("👥 BENCHMARK: MEMORIA POR SESIÓN DEL DASHBOARD")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        print(f"\n⏳ Preparando {args.filas:,} filas ({args.esquema}: Parquet, Arrow y SQLite)...")
+        inicio = time.perf_counter()
+        data_dir, db_file = preparar_datos(carpeta, args.filas, args.esquema)
+        escribir_arrow(data_dir, args.filas, args.esquema)
+        print(f"   listo en {time.perf_counter() - inicio:.1f} s")
+
+        print(f"\n{'Fuente':>8} {'1.ª sesión (MB)':>16} {'Total (MB)':>11} {'MB/sesión extra':>16} "
+              f"{'Máx. extra':>11} {'1.ª (s)':>8} {'Resto (s)':>10}")
+        print("-" * 86)
+        for fuente in args.fuentes.split(','):
+            m = medir_en_proceso(fuente, data_dir, db_file, args.sesiones)
+            rss = m['rss_mb']
+            extras = [b - a for a, b in zip(rss, rss[1:])]
+            # Mediana de los incrementos: el allocator devuelve en algún momento
+            # el pico transitorio de la carga y la RSS baja de golpe
+            por_sesion = statistics.median(extras) if extras else 0.0
+            resto = statistics.median(m['segundos'][1:]) if extras else 0.0
+            print(f"{fuente:>8} {rss[0]:>16.1f} {rss[-1]:>11.1f} {por_sesion:>16.2f} "
+                  f"{max(extras, default=0.0):>11.1f} {m['segundos'][0]:>8.2f} {resto:>10.3f}")
+            print(f"{'':>8} {m['descripcion']}")
+        print(f"\n   {args.sesiones} sesiones vivas a la vez en un proceso; MB de RSS sobre el "
+              "proceso antes de la primera.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""
+Generador de road_accidents.csv sintético a escala configurable
+Por defecto (--esquema kaggle) escribe el esquema del Global Road
+Accidents Dataset de Kaggle: sus 30 encabezados (Country, Year, Month,
+..., Accident Severity, ..., Population Density), los mismos dominios de
+valores y cardinalidades (10 países, años 2000-2024, tres severidades,
+rangos de cada columna numérica), sin nulos ni filas repetidas, como el
+archivo original. Ninguna columna es un id ni una fecha.
+Con --esquema us escribe un esquema tipo US-Accidents (ID, Severity,
+Start_Time, City, State, Weather_Condition, Temperature, Visibility,
+Road_Type, Description): unas 3.000 ciudades con distribución de Zipf,
+climas con variantes sucias de mayúsculas/espacios, fechas 2016-2023 con
+horas pico, nulos por columna y ~1 % de filas duplicadas.
+Se genera por bloques con una semilla por bloque: la memoria no depende
+del tamaño y el mismo (filas, semilla) produce siempre el mismo archivo.
+Ejecutar: python benchmarks/generar_dataset.py --escala 1m [--esquema us] [--salida data/road_accidents.csv]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SALIDA = os.path.join(BASE_DIR, '..', 'data', 'road_accidents.csv')
+
+ESCALAS = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+FILAS_POR_BLOQUE = 500_000
+
+ESQUEMAS = ['kaggle', 'us']
+
+# ----------------------------------------------------------------------------
+# Esquema kaggle: columnas en el orden del archivo original, con valores
+# uniformes e independientes como en el dataset publicado
+# ----------------------------------------------------------------------------
+
+# Columna → valores posibles
+CATEGORIAS_KAGGLE = {
+    'Country': ['USA', 'UK', 'Canada', 'India', 'China', 'Japan', 'Russia', 'Germany',
+                'Brazil', 'Australia'],
+    'Month': ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+              'September', 'October', 'November', 'December'],
+    'Day of Week': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+    'Time of Day': ['Morning', 'Afternoon', 'Evening', 'Night'],
+    'Urban/Rural': ['Urban', 'Rural'],
+    'Road Type': ['Street', 'Highway', 'Main Road', 'Rural Road'],
+    'Weather Conditions': ['Clear', 'Rainy', 'Snowy', 'Foggy', 'Windy'],
+    'Driver Age Group': ['<18', '18-25', '26-40', '41-60', '61+'],
+    'Driver Gender': ['Male', 'Female'],
+    'Vehicle Condition': ['Good', 'Moderate', 'Poor'],
+    'Accident Severity': ['Minor', 'Moderate', 'Severe'],
+    'Road Condition': ['Dry', 'Wet', 'Icy', 'Snow-covered'],
+    'Accident Cause': ['Distracted Driving', 'Speeding', 'Drunk Driving', 'Weather',
+                       'Mechanical Failure'],
+    'Region': ['Europe', 'North America', 'South America', 'Asia', 'Australia', 'Africa'],
+}
+
+# Columna → (mínimo, máximo) enteros, ambos incluidos
+ENTEROS_KAGGLE = {
+    'Year': (2000, 2024),
+    'Number of Vehicles Involved': (1, 5),
+    'Speed Limit': (30, 120),
+    'Driver Fatigue': (0, 1),
+    'Pedestrians Involved': (0, 2),
+    'Cyclists Involved': (0, 2),
+    'Number of Injuries': (0, 19),
+    'Number of Fatalities': (0, 4),
+    'Insurance Claims': (0, 9),
+}
+
+# Columna → (mínimo, máximo) reales, escritos con 6 decimales
+REALES_KAGGLE = {
+    'Visibility Level': (50, 500),
+    'Driver Alcohol Level': (0, 0.25),
+    'Emergency Response Time': (5, 60),
+    'Traffic Volume': (100, 10_000),
+    'Medical Cost': (500, 50_000),
+    'Economic Loss': (1_000, 100_000),
+    'Population Density': (10, 5_000),
+}
+
+COLUMNAS_KAGGLE = [
+    'Country', 'Year', 'Month', 'Day of Week', 'Time of Day', 'Urban/Rural', 'Road Type',
+    'Weather Conditions', 'Visibility Level', 'Number of Vehicles Involved', 'Speed Limit',
+    'Driver Age Group', 'Driver Gender', 'Driver Alcohol Level', 'Driver Fatigue',
+    'Vehicle Condition', 'Pedestrians Involved', 'Cyclists Involved', 'Accident Severity',
+    'Number of Injuries', 'Number of Fatalities', 'Emergency Response Time', 'Traffic Volume',
+    'Road Condition', 'Accident Cause', 'Insurance Claims', 'Medical Cost', 'Economic Loss',
+    'Region', 'Population Density',
+]
+
+# ----------------------------------------------------------------------------
+# Esquema us
+# ----------------------------------------------------------------------------
+
+# Ciudades: las cinco del proyecto a la cabeza y el resto compuesto
+CIUDADES_PRINCIPALES = ['Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Cartagena']
+PREFIJOS = ['', 'San ', 'Santa ', 'Puerto ', 'Villa ', 'La ', 'El ', 'Nueva ', 'Alto ', 'Río ']
+SILABAS = ['ta', 'ri', 'ma', 'lo', 'gua', 'pa', 'ne', 'sa', 'qui', 'ca',
+           'bo', 'lla', 'to', 'co', 'ro', 'na', 'che', 'mu', 'te', 'ya']
+N_CIUDADES = 3000
+EXPONENTE_ZIPF = 1.3
+
+DEPARTAMENTOS = ['ANT', 'ATL', 'BOG', 'BOL', 'BOY', 'CAL', 'CAQ', 'CAU', 'CES', 'COR',
+                 'CUN', 'CHO', 'HUI', 'LAG', 'MAG', 'MET', 'NAR', 'NSA', 'QUI', 'RIS',
+                 'SAN', 'SUC', 'TOL', 'VAC', 'ARA', 'CAS', 'PUT', 'SAP', 'AMA', 'GUA',
+                 'GUV', 'VAU', 'VID']
+
+# Clima → peso relativo
+CLIMAS = {
+    'Clear': 30, 'Fair': 20, 'Mostly Cloudy': 10, 'Cloudy': 10, 'Partly Cloudy': 8,
+    'Overcast': 6, 'Light Rain': 5, 'Rain': 3, 'Heavy Rain': 1, 'Fog': 2, 'Haze': 1,
+    'Light Snow': 1, 'Snow': 0.5, 'Thunderstorm': 1, 'Drizzle': 1, 'Mist': 0.5,
+    'Smoke': 0.2, 'Windy': 0.5, 'Sleet': 0.1, 'Hail': 0.05,
+}
+
+TIPOS_VIA = {'Urbana': 55, 'Autopista': 20, 'Rural': 15, 'Intersección': 8, 'Túnel': 2}
+
+EVENTOS = ['Choque', 'Colisión múltiple', 'Atropello', 'Vuelco', 'Choque leve',
+           'Salida de vía', 'Colisión trasera', 'Incidente']
+VIAS = ['Calle', 'Carrera', 'Avenida', 'Autopista', 'Diagonal', 'Transversal', 'Vía']
+
+# Probabilidad de hora del día (picos de la mañana y de la tarde)
+PESOS_HORA = np.array([2, 1.5, 1, 1, 1.5, 3, 6, 9, 10, 7, 6, 6,
+                       6, 6, 7, 8, 10, 11, 8, 6, 4, 3.5, 3, 2.5])
+
+FECHA_INICIO = np.datetime64('2016-01-01T00:00')
+DIAS = int((np.datetime64('2024-01-01') - np.datetime64('2016-01-01')).astype(int))
+
+# Fracción de nulos por columna de origen
+NULOS = {
+    'Start_Time': 0.005,
+    'City': 0.01,
+    'Weather_Condition': 0.02,
+    'Temperature': 0.02,
+    'Visibility': 0.02,
+}
+
+# Fracción de filas que repiten exactamente otra fila del mismo bloque
+DUPLICADOS = {'kaggle': 0.0, 'us': 0.01}
+# Fracción de climas y ciudades con mayúsculas o espacios alterados
+VARIANTES_SUCIAS = 0.03
+
+
+def nombres_ciudades(n=N_CIUDADES):
+    """Lista fija de `n` nombres únicos (las ciudades principales primero)."""
+    raices = [(a + b + c).capitalize() for a in SILABAS for b in SILABAS if a != b
+              for c in ['', 'l', 'n', 's']]
+    compuestos = (prefijo + raiz for raiz in raices for prefijo in PREFIJOS)
+    nombres = list(CIUDADES_PRINCIPALES)
+    vistos = set(nombres)
+    for nombre in compuestos:
+        if len(nombres) == n:
+            break
+        if nombre not in vistos:
+            vistos.add(nombre)
+            nombres.append(nombre)
+    return np.array(nombres, dtype=object)
+
+
+def elegir(rng, pesos, n):
+    valores = np.array(list(pesos), dtype=object)
+    p = np.array(list(pesos.values()), dtype='float64')
+    return valores[rng.choice(len(valores), size=n, p=p / p.sum())]
+
+
+def ensuciar(rng, valores):
+    """Variantes de mayúsculas y espacios como las del archivo original."""
+    valores = pd.Series(valores, dtype=object)
+    sucias = rng.random(len(valores)) < VARIANTES_SUCIAS
+    tipo = rng.integers(0, 3, size=len(valores))
+    valores[sucias & (tipo == 0)] = valores[sucias & (tipo == 0)].str.lower()
+    valores[sucias & (tipo == 1)] = valores[sucias & (tipo == 1)].str.upper()
+    valores[sucias & (tipo == 2)] = '  ' + valores[sucias & (tipo == 2)] + ' '
+    return valores
+
+
+def repetir_filas(rng, df, fraccion):
+    """Reemplaza una `fraccion` de las filas por copias exactas de otras del bloque."""
+    origen = np.arange(len(df))
+    repetidas = rng.random(len(df)) < fraccion
+    origen[repetidas] = rng.integers(0, len(df), size=int(repetidas.sum()))
+    return df.take(origen).reset_index(drop=True)
+
+
+def generar_bloque_kaggle(inicio, n, semilla=0, duplicados=DUPLICADOS['kaggle']):
+    """Filas [inicio, inicio + n) con el esquema de Kaggle como DataFrame."""
+    rng = np.random.default_rng([semilla, inicio])
+    columnas = {}
+    for col in COLUMNAS_KAGGLE:
+        if col in CATEGORIAS_KAGGLE:
+            valores = np.array(CATEGORIAS_KAGGLE[col], dtype=object)
+            columnas[col] = valores[rng.integers(0, len(valores), size=n)]
+        elif col in ENTEROS_KAGGLE:
+            minimo, maximo = ENTEROS_KAGGLE[col]
+            columnas[col] = rng.integers(minimo, maximo + 1, size=n)
+        else:
+            minimo, maximo = REALES_KAGGLE[col]
+            columnas[col] = rng.uniform(minimo, maximo, size=n).round(6)
+    return repetir_filas(rng, pd.DataFrame(columnas), duplicados)
+
+
+def generar_bloque_us(inicio, n, semilla=0, duplicados=DUPLICADOS['us'], ciudades=None):
+    """Filas [inicio, inicio + n) con el esquema tipo US-Accidents como DataFrame."""
+    rng = np.random.default_rng([semilla, inicio])
+    if ciudades is None:
+        ciudades = nombres_ciudades()
+
+    # La cola de Zipf más allá de la última ciudad se reparte entre todas
+    rango = (rng.zipf(EXPONENTE_ZIPF, size=n) - 1) % len(ciudades)
+    departamento = np.array(DEPARTAMENTOS, dtype=object)[rango % len(DEPARTAMENTOS)]
+
+    # Más accidentes en los años recientes y en horas pico
+    dia = (rng.beta(1.6, 1.0, size=n) * DIAS).astype('int64')
+    hora = rng.choice(24, size=n, p=PESOS_HORA / PESOS_HORA.sum())
+    minuto = rng.integers(0, 60, size=n)
+    inicio_dt = FECHA_INICIO + (dia * 1440 + hora * 60 + minuto).astype('timedelta64[m]')
+    dia_anio = dia % 365
+
+    temperatura = (64 - 14 * np.cos(2 * np.pi * (dia_anio - 15) / 365)
+                   + (rango % 7 - 3) * 2 + rng.normal(0, 8, size=n))
+    visibilidad = np.where(rng.random(n) < 0.8, 10.0, np.clip(rng.gamma(2.0, 2.5, size=n), 0, 10))
+
+    numero_via = rng.integers(1, 200, size=n).astype(str)
+    descripcion = (pd.Series(np.array(EVENTOS, dtype=object)[rng.integers(0, len(EVENTOS), size=n)])
+                   + ' en ' + np.array(VIAS, dtype=object)[rng.integers(0, len(VIAS), size=n)]
+                   + ' ' + numero_via)
+
+    df = pd.DataFrame({
+        'ID': pd.Series(np.arange(inicio, inicio + n)).map('A-{}'.format),
+        'Severity': rng.choice([1, 2, 3, 4], size=n, p=[0.01, 0.80, 0.15, 0.04]),
+        'Start_Time': inicio_dt,
+        'City': ensuciar(rng, ciudades[rango]),
+        'State': departamento,
+        'Weather_Condition': ensuciar(rng, elegir(rng, CLIMAS, n)),
+        'Temperature': temperatura.round(1),
+        'Visibility': visibilidad.round(1),
+        'Road_Type': elegir(rng, TIPOS_VIA, n),
+        'Description': descripcion,
+    })
+    for col, fraccion in NULOS.items():
+        df.loc[rng.random(n) < fraccion, col] = None
+
+    # Duplicados exactos (mismo ID incluido) de otras filas del bloque
+    return repetir_filas(rng, df, duplicados)
+
+
+def generar_csv(ruta, filas, semilla=0, filas_por_bloque=FILAS_POR_BLOQUE, esquema='kaggle', duplicados=None):
+    """
+    Escribe `filas` filas sintéticas con el `esquema` ('kaggle' o 'us') en
+    `ruta`. duplicados=None usa la fracción por defecto del esquema.
+    Retorna el tamaño en bytes.
+    """
+    if esquema not in ESQUEMAS:
+        raise ValueError(f"Esquema desconocido: {esquema} (usa {', '.join(ESQUEMAS)})")
+    if duplicados is None:
+        duplicados = DUPLICADOS[esquema]
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    ciudades = nombres_ciudades() if esquema == 'us' else None
+    for inicio in range(0, filas, filas_por_bloque):
+        n = min(filas_por_bloque, filas - inicio)
+        if esquema == 'us':
+            bloque = generar_bloque_us(inicio, n, semilla, duplicados, ciudades)
+        else:
+            bloque = generar_bloque_kaggle(inicio, n, semilla, duplicados)
+        bloque.to_csv(ruta, index=False, mode='w' if inicio == 0 else 'a', header=(inicio == 0),
+                      date_format='%Y-%m-%d %H:%M:%S')
+    return os.path.getsize(ruta)
+
+
+def parsear_filas(valor):
+    """'1m' → 1000000; también acepta un número de filas."""
+    return ESCALAS.get(valor.lower()) or int(valor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un road_accidents.csv sintético")
+    parser.add_argument('--escala', default='100k',
+                        help=f"Cantidad de filas: {', '.join(ESCALAS)} o un número. Por defecto: %(default)s")
+    parser.add_argument('--salida', default=SALIDA, help="Ruta del CSV. Por defecto: %(default)s")
+    parser.add_argument('--esquema', choices=ESQUEMAS, default='kaggle',
+                        help="kaggle: encabezados y valores del dataset de Kaggle; "
+                             "us: esquema tipo US-Accidents. Por defecto: %(default)s")
+    parser.add_argument('--duplicados', type=float, default=None,
+                        help="Fracción de filas repetidas. Por defecto: "
+                             + ', '.join(f"{e} {f:g}" for e, f in DUPLICADOS.items()))
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    filas = parsear_filas(args.escala)
+    print(f"⏳ Generando {filas:,} filas ({args.esquema}) en {args.salida}...")
+    inicio = time.perf_counter()
+    tamano = generar_csv(args.salida, filas, args.semilla, esquema=args.esquema, duplicados=args.duplicados)
+    print(f"✓ {tamano / 1024**2:,.1f} MB en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
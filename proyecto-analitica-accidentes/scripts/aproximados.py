@@ -0,0 +1,238 @@
+"""
+Resúmenes aproximados por partición (modo aproximado del dashboard)
+Por cada año (la partición) guarda, con los sketches de sketches.py:
+conteo y suma de severidad exactos, conteos más frecuentes (Space-Saving)
+de ciudad, clima, severidad y mes, distintos (HyperLogLog) de ciudad y
+clima y, por métrica, n, suma, suma de cuadrados, extremos y un KLL para
+la mediana. Se acumulan bloque a bloque al cargar proyecto.db y se
+guardan en la tabla sketches; una consulta que solo filtra por año se
+responde fusionando las particiones elegidas, sin leer filas. Los
+errores de cada sketch están documentados en sketches.py.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from cubo import METRICAS_CUBO
+from sketches import (kll_nuevo, kll_agregar, kll_cuantiles, hll_nuevo, hll_agregar, hll_estimar,
+                      frecuentes_nuevo, frecuentes_agregar, frecuentes_top, fusionar, a_json, desde_json)
+
+PARTICION = 'anio'
+DIMENSIONES_FRECUENTES = ['city', 'weather_condition', 'severity', 'mes']
+DIMENSIONES_DISTINTOS = ['city', 'weather_condition']
+
+TABLA_SKETCHES = 'sketches'
+
+# Filas por bloque al reconstruir los sketches desde accidents
+FILAS_RECONSTRUCCION = 200_000
+
+
+# ============================================================================
+# CONSTRUCCIÓN Y FUSIÓN
+# ============================================================================
+
+def particion_vacia():
+    return {
+        'n': 0,
+        'severidad_suma': 0.0,
+        'frecuentes': {dim: frecuentes_nuevo() for dim in DIMENSIONES_FRECUENTES},
+        # Suma de severidad por clima, estimada igual que los conteos
+        'severidad_clima': frecuentes_nuevo(),
+        'distintos': {dim: hll_nuevo() for dim in DIMENSIONES_DISTINTOS},
+        'metricas': {m: {'n': 0, 'suma': 0.0, 'suma2': 0.0, 'minimo': np.inf, 'maximo': -np.inf,
+                         'kll': kll_nuevo()} for m in METRICAS_CUBO},
+    }
+
+
+def acumular_particion(particion, df):
+    """Agrega al resumen de una partición las filas de `df`."""
+    particion['n'] += len(df)
+    if 'severity' in df.columns:
+        severidad = df['severity'].to_numpy(dtype='float64', na_value=np.nan)
+        particion['severidad_suma'] += float(np.nansum(severidad))
+        if 'weather_condition' in df.columns:
+            particion['severidad_clima'] = frecuentes_agregar(
+                particion['severidad_clima'], df['weather_condition'], np.nan_to_num(severidad))
+    for dim in DIMENSIONES_FRECUENTES:
+        if dim in df.columns:
+            particion['frecuentes'][dim] = frecuentes_agregar(particion['frecuentes'][dim], df[dim])
+    for dim in DIMENSIONES_DISTINTOS:
+        if dim in df.columns:
+            hll_agregar(particion['distintos'][dim], df[dim])
+    for m, resumen in particion['metricas'].items():
+        if m not in df.columns:
+            continue
+        valores = df[m].to_numpy(dtype='float64', na_value=np.nan)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            continue
+        resumen['n'] += len(valores)
+        resumen['suma'] += float(valores.sum())
+        resumen['suma2'] += float((valores * valores).sum())
+        resumen['minimo'] = min(resumen['minimo'], float(valores.min()))
+        resumen['maximo'] = max(resumen['maximo'], float(valores.max()))
+        kll_agregar(resumen['kll'], valores)
+    return particion
+
+
+def clave_particion(valor):
+    """Valor de año → clave de texto ('' para nulos)."""
+    if valor is None or pd.isna(valor):
+        return ''
+    return str(int(valor))
+
+
+def acumular(resumenes, df):
+    """Agrega un bloque a {clave de partición: resumen} y lo retorna."""
+    if PARTICION not in df.columns:
+        grupos = [('', df)]
+    else:
+        grupos = df.groupby(df[PARTICION].map(clave_particion), sort=False)
+    for clave, grupo in grupos:
+        acumular_particion(resumenes.setdefault(clave, particion_vacia()), grupo)
+    return resumenes
+
+
+def fusionar_particiones(a, b):
+    fusion = {
+        'n': a['n'] + b['n'],
+        'severidad_suma': a['severidad_suma'] + b['severidad_suma'],
+        'frecuentes': {dim: fusionar(a['frecuentes'][dim], b['frecuentes'][dim]) for dim in a['frecuentes']},
+        'severidad_clima': fusionar(a['severidad_clima'], b['severidad_clima']),
+        'distintos': {dim: fusionar(a['distintos'][dim], b['distintos'][dim]) for dim in a['distintos']},
+        'metricas': {},
+    }
+    for m, x in a['metricas'].items():
+        y = b['metricas'][m]
+        fusion['metricas'][m] = {
+            'n': x['n'] + y['n'], 'suma': x['suma'] + y['suma'], 'suma2': x['suma2'] + y['suma2'],
+            'minimo': min(x['minimo'], y['minimo']), 'maximo': max(x['maximo'], y['maximo']),
+            'kll': fusionar(x['kll'], y['kll']),
+        }
+    return fusion
+
+
+# ============================================================================
+# CONSULTAS
+# ============================================================================
+
+def aplica(filtros):
+    """True si los filtros se pueden responder con las particiones (solo año)."""
+    return all(not valores or dim == PARTICION for dim, valores in filtros.items())
+
+
+def consultar_aproximado(resumenes, filtros):
+    """
+    Agregados con la misma forma que cubo.consultar a partir de las
+    particiones seleccionadas, más 'distintos' (estimación HyperLogLog) y
+    'aproximado': True. Los conteos de ciudad y clima son los más
+    frecuentes (estimados); los de año, exactos.
+    """
+    elegidos = {clave_particion(v) for v in filtros.get(PARTICION) or []}
+    claves = [clave for clave in resumenes if not elegidos or clave in elegidos]
+    total = particion_vacia()
+    for clave in claves:
+        total = fusionar_particiones(total, resumenes[clave])
+
+    conteos = {}
+    if any(claves):
+        anios = pd.Series({int(clave): resumenes[clave]['n'] for clave in claves if clave}, dtype='int64', name='n')
+        conteos[PARTICION] = anios[anios > 0].sort_values(ascending=False, kind='stable')
+    for dim, sketch in total['frecuentes'].items():
+        if sketch['n']:
+            conteos[dim] = frecuentes_top(sketch)
+
+    severidad_por_clima = pd.Series(dtype='float64')
+    if 'weather_condition' in conteos:
+        sumas = frecuentes_top(total['severidad_clima']).astype('float64')
+        clima = conteos['weather_condition']
+        severidad_por_clima = (sumas.reindex(clima.index) / clima).dropna().rename(None)
+
+    metricas = {}
+    for m, x in total['metricas'].items():
+        n = x['n']
+        if n == 0:
+            metricas[m] = {'n': 0, 'media': np.nan, 'desviacion': np.nan, 'minimo': np.nan,
+                           'maximo': np.nan, 'mediana': np.nan}
+            continue
+        media = x['suma'] / n
+        varianza = max(x['suma2'] / n - media**2, 0.0)
+        metricas[m] = {
+            'n': n,
+            'media': media,
+            'desviacion': np.sqrt(varianza * n / (n - 1)) if n > 1 else 0.0,
+            'minimo': x['minimo'],
+            'maximo': x['maximo'],
+            'mediana': kll_cuantiles(x['kll'], [0.5])[0],
+        }
+
+    return {
+        'total': total['n'],
+        'conteos': conteos,
+        'severidad_media': total['severidad_suma'] / total['n'] if total['n'] else np.nan,
+        'severidad_por_clima': severidad_por_clima,
+        'metricas': metricas,
+        'distintos': {dim: hll_estimar(sketch) for dim, sketch in total['distintos'].items()},
+        'aproximado': True,
+    }
+
+
+# ============================================================================
+# PERSISTENCIA EN PROYECTO.DB
+# ============================================================================
+
+def particion_a_json(particion):
+    return {
+        'n': particion['n'],
+        'severidad_suma': particion['severidad_suma'],
+        'frecuentes': {dim: a_json(s) for dim, s in particion['frecuentes'].items()},
+        'severidad_clima': a_json(particion['severidad_clima']),
+        'distintos': {dim: a_json(s) for dim, s in particion['distintos'].items()},
+        'metricas': {m: dict(x, kll=a_json(x['kll'])) for m, x in particion['metricas'].items()},
+    }
+
+
+def particion_desde_json(datos):
+    return {
+        'n': datos['n'],
+        'severidad_suma': datos['severidad_suma'],
+        'frecuentes': {dim: desde_json(s) for dim, s in datos['frecuentes'].items()},
+        'severidad_clima': desde_json(datos['severidad_clima']),
+        'distintos': {dim: desde_json(s) for dim, s in datos['distintos'].items()},
+        'metricas': {m: dict(x, kll=desde_json(x['kll'])) for m, x in datos['metricas'].items()},
+    }
+
+
+def guardar_sketches(conn, resumenes):
+    """Reemplaza el contenido de la tabla sketches (una fila JSON por partición)."""
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{TABLA_SKETCHES}" (particion TEXT PRIMARY KEY, datos TEXT)')
+    conn.execute(f'DELETE FROM "{TABLA_SKETCHES}"')
+    conn.executemany(
+        f'INSERT INTO "{TABLA_SKETCHES}" VALUES (?, ?)',
+        [(clave, json.dumps(particion_a_json(p))) for clave, p in resumenes.items()]
+    )
+
+
+def leer_sketches(conn):
+    """{partición: resumen} guardado en proyecto.db, o None si no hay."""
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABLA_SKETCHES,)
+    ).fetchone()
+    if existe is None:
+        return None
+    filas = conn.execute(f'SELECT particion, datos FROM "{TABLA_SKETCHES}"').fetchall()
+    return {clave: particion_desde_json(json.loads(datos)) for clave, datos in filas}
+
+
+def reconstruir_sketches(conn, columnas):
+    """Recalcula los sketches leyendo accidents por bloques (tras modificar filas)."""
+    usadas = [col for col in [PARTICION, 'severity'] + DIMENSIONES_FRECUENTES + METRICAS_CUBO
+              if col in columnas]
+    lista = ', '.join(f'"{col}"' for col in dict.fromkeys(usadas))
+    resumenes = {}
+    for bloque in pd.read_sql_query(f'SELECT {lista} FROM accidents', conn, chunksize=FILAS_RECONSTRUCCION):
+        acumular(resumenes, bloque)
+    guardar_sketches(conn, resumenes)
+    return resumenes
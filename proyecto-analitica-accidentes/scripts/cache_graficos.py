@@ -0,0 +1,113 @@
+"""
+Caché de construcción de los gráficos del EDA
+Cada gráfico se identifica con una clave: hash de sus datos en el resumen,
+de los parámetros de dibujo y del código que lo dibuja. Si la clave y el
+PNG en disco coinciden con los del manifiesto, no se vuelve a renderizar.
+El resumen, a su vez, se reutiliza si el contenido de los archivos de
+entrada de la fuente no cambió. El manifiesto (manifiesto_graficos.json)
+guarda las huellas y el tiempo de renderizado de cada gráfico.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# Versión del formato del manifiesto
+VERSION_MANIFIESTO = 1
+
+# Bloque de lectura al calcular huellas de archivos
+BLOQUE_HUELLA = 1 << 20
+
+
+def nuevo_hash():
+    return hashlib.blake2b(digest_size=16)
+
+
+def huella_archivos(ruta):
+    """
+    Huella del contenido de un archivo o de todos los archivos de un
+    directorio (p. ej. un Parquet particionado), con su ruta relativa.
+    Retorna None si la ruta no existe.
+    """
+    if not os.path.exists(ruta):
+        return None
+    if os.path.isdir(ruta):
+        archivos = sorted(
+            os.path.join(carpeta, nombre)
+            for carpeta, _, nombres in os.walk(ruta)
+            for nombre in nombres
+        )
+    else:
+        archivos = [ruta]
+
+    h = nuevo_hash()
+    for archivo in archivos:
+        h.update(os.path.relpath(archivo, ruta).encode('utf-8'))
+        with open(archivo, 'rb') as f:
+            for bloque in iter(lambda: f.read(BLOQUE_HUELLA), b''):
+                h.update(bloque)
+    return h.hexdigest()
+
+
+def huella_datos(*partes):
+    """Huella de valores serializables a JSON (orden de claves fijo)."""
+    h = nuevo_hash()
+    for parte in partes:
+        h.update(json.dumps(parte, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return h.hexdigest()
+
+
+def leer_manifiesto(ruta):
+    """Manifiesto guardado, o uno vacío si no existe o es de otra versión."""
+    vacio = {'version': VERSION_MANIFIESTO, 'entrada': None, 'graficos': {}}
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            manifiesto = json.load(f)
+    except (OSError, ValueError):
+        return vacio
+    if manifiesto.get('version') != VERSION_MANIFIESTO:
+        return vacio
+    return manifiesto
+
+
+def guardar_manifiesto(manifiesto, ruta):
+    # Escritura atómica: un manifiesto a medias invalidaría toda la caché
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    os.replace(temporal, ruta)
+
+
+def entrada_vigente(manifiesto, entrada, ruta_resumen):
+    """
+    True si el resumen guardado se generó a partir de esta misma entrada
+    (fuente y huella de sus archivos) y no se modificó después.
+    """
+    anterior = manifiesto.get('entrada')
+    return (
+        anterior is not None
+        and entrada['huella'] is not None
+        and {k: anterior.get(k) for k in ('fuente', 'huella')} == {k: entrada[k] for k in ('fuente', 'huella')}
+        and anterior.get('huella_resumen') == huella_archivos(ruta_resumen)
+    )
+
+
+def grafico_vigente(manifiesto, archivo, clave, ruta_png):
+    """True si el PNG existe, no cambió y se generó con la misma clave."""
+    registro = manifiesto['graficos'].get(archivo)
+    return (
+        registro is not None
+        and registro.get('clave') == clave
+        and registro.get('huella_png') == huella_archivos(ruta_png)
+    )
+
+
+def registrar_grafico(manifiesto, archivo, clave, ruta_png, segundos):
+    manifiesto['graficos'][archivo] = {
+        'clave': clave,
+        'huella_png': huella_archivos(ruta_png),
+        'segundos': round(segundos, 3),
+        'generado': datetime.now().isoformat(timespec='seconds'),
+    }
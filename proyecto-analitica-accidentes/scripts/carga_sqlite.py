@@ -0,0 +1,422 @@
+"""
+Carga masiva de la tabla accidents en SQLite (Paso 5)
+Esquema explícito, PRAGMAs de carga, executemany por lotes dentro de una
+única transacción e índices creados al final. Incluye el modo incremental:
+upsert por row_key y tabla de watermark con lo ya ingerido.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime
+from itertools import chain, islice
+
+import numpy as np
+import pandas as pd
+
+from resumenes import (
+    crear_tablas_resumen,
+    existen_tablas_resumen,
+    reconstruir_resumenes,
+    indexar_resumenes,
+    acumular_bloque,
+    restar_anteriores,
+    sumar_afectadas,
+)
+from aproximados import acumular, guardar_sketches, leer_sketches, reconstruir_sketches
+from transformaciones import VERSION_HUELLAS
+
+# ============================================================================
+# ESQUEMA
+# ============================================================================
+
+# Tipos de las columnas estándar y derivadas; el resto se infiere del dtype
+TIPOS_ACCIDENTS = {
+    'id': 'TEXT',
+    'severity': 'INTEGER',
+    'start_time': 'TEXT',
+    'city': 'TEXT',
+    'state': 'TEXT',
+    'weather_condition': 'TEXT',
+    'temperature_f': 'REAL',
+    'visibility_mi': 'REAL',
+    'description': 'TEXT',
+    'fecha': 'TEXT',
+    'anio': 'INTEGER',
+    'mes': 'INTEGER',
+    'mes_nombre': 'TEXT',
+    'dia': 'INTEGER',
+    'dia_semana': 'TEXT',
+    'hora': 'INTEGER',
+    'trimestre': 'INTEGER',
+    'categoria_visibilidad': 'TEXT',
+    'categoria_temperatura': 'TEXT',
+    'row_key': 'INTEGER',
+    'row_hash': 'INTEGER',
+}
+
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS idx_severity ON accidents(severity);",
+    "CREATE INDEX IF NOT EXISTS idx_city ON accidents(city);",
+    "CREATE INDEX IF NOT EXISTS idx_weather ON accidents(weather_condition);",
+]
+
+# Índice único que permite el upsert por clave de fila
+INDICE_CLAVE = "CREATE UNIQUE INDEX IF NOT EXISTS idx_row_key ON accidents(row_key);"
+
+TABLA_WATERMARK = """
+CREATE TABLE IF NOT EXISTS etl_watermark (
+    fuente TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    filas INTEGER NOT NULL,
+    huella_cola TEXT NOT NULL,
+    actualizado TEXT NOT NULL
+);
+"""
+
+# Bytes finales de la porción ya ingerida que se comparan para reanudar
+BYTES_HUELLA_COLA = 65536
+
+# PRAGMAs para la reconstrucción completa: la BD se regenera desde el CSV,
+# así que durante la carga se prescinde del journal y de fsync
+PRAGMAS_CARGA = [
+    "PRAGMA journal_mode = OFF;",
+    "PRAGMA synchronous = OFF;",
+    "PRAGMA cache_size = -262144;",  # 256 MB
+    "PRAGMA temp_store = MEMORY;",
+]
+
+# Valores por defecto de SQLite, restaurados al terminar la carga
+PRAGMAS_NORMALES = [
+    "PRAGMA journal_mode = DELETE;",
+    "PRAGMA synchronous = FULL;",
+]
+
+TAMANO_LOTE = 50000
+
+FORMATO_FECHA_HORA = '%Y-%m-%d %H:%M:%S'
+
+
+def tipo_sql(col, dtype):
+    """Tipo SQLite de una columna: explícito si es conocida, si no por dtype."""
+    if col in TIPOS_ACCIDENTS:
+        return TIPOS_ACCIDENTS[col]
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def ddl_accidents(df, tabla='accidents'):
+    """Sentencia CREATE TABLE con tipos explícitos para las columnas de df."""
+    columnas = ',\n'.join(f'    "{col}" {tipo_sql(col, dtype)}' for col, dtype in df.dtypes.items())
+    return f'CREATE TABLE "{tabla}" (\n{columnas}\n);'
+
+
+# ============================================================================
+# CONVERSIÓN A TUPLAS
+# ============================================================================
+
+def valores_columna(serie):
+    """Convierte una columna a una lista de valores Python aptos para sqlite3."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        texto = serie.dt.strftime(FORMATO_FECHA_HORA)
+        return texto.astype(object).where(serie.notna(), None).tolist()
+    if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == object or pd.api.types.is_string_dtype(serie):
+        valores = serie.astype(object).where(serie.notna(), None).tolist()
+        # Columnas de fechas (datetime.date, p. ej. 'fecha') → texto ISO
+        primero = serie.first_valid_index()
+        if primero is not None and hasattr(serie.loc[primero], 'isoformat'):
+            return [v.isoformat() if v is not None else None for v in valores]
+        return valores
+    # Numéricos: tolist() entrega int/float nativos; SQLite guarda NaN como NULL
+    return serie.tolist()
+
+
+def filas_sql(df):
+    """Iterador de tuplas (una por fila) listo para executemany."""
+    return zip(*(valores_columna(df[col]) for col in df.columns))
+
+
+def lotes(filas, tamano):
+    while True:
+        lote = list(islice(filas, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+# ============================================================================
+# CARGA
+# ============================================================================
+
+def crear_indices(conn):
+    """
+    Crea los índices de accidents (y el único sobre row_key si la tabla
+    tiene claves: los bloques ya llegan con un solo registro por clave,
+    ver limpiar_dataset y perfilar_fuente). Retorna los segundos.
+    """
+    inicio = time.perf_counter()
+    for idx in INDICES:
+        conn.execute(idx)
+    if 'row_key' in columnas_tabla(conn):
+        conn.execute(INDICE_CLAVE)
+    conn.commit()
+    return time.perf_counter() - inicio
+
+
+def cargar_accidentes(conn, bloques, tamano_lote=TAMANO_LOTE, tabla='accidents'):
+    """
+    Recrea `tabla` con tipos explícitos y carga los DataFrames de `bloques`
+    (un iterable, p. ej. [df] o un generador de bloques) con executemany en
+    lotes de `tamano_lote` filas, todo dentro de una única transacción.
+    Las tablas de resumen y los sketches por año (aproximados.py) se
+    acumulan bloque a bloque y los índices se crean después de la carga.
+
+    Retorna un dict con filas, segundos de carga, filas_por_segundo,
+    segundos_resumenes y segundos_indices.
+    """
+    for pragma in PRAGMAS_CARGA:
+        conn.execute(pragma)
+
+    filas = 0
+    segundos = 0.0
+    segundos_resumenes = 0.0
+    sketches = {}
+    insert = None
+    conn.execute(f'DROP TABLE IF EXISTS "{tabla}"')
+    conn.execute('BEGIN')
+    for df in bloques:
+        # Solo se cronometra la escritura, no la producción de los bloques
+        inicio = time.perf_counter()
+        if insert is None:
+            conn.execute(ddl_accidents(df, tabla))
+            crear_tablas_resumen(conn, df.columns)
+            marcadores = ', '.join('?' * len(df.columns))
+            insert = f'INSERT INTO "{tabla}" VALUES ({marcadores})'
+        for lote in lotes(filas_sql(df), tamano_lote):
+            conn.executemany(insert, lote)
+            filas += len(lote)
+        segundos += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        acumular_bloque(conn, df)
+        acumular(sketches, df)
+        segundos_resumenes += time.perf_counter() - inicio
+    if insert is not None and 'row_key' in df.columns:
+        # user_version registra con qué hash_filas se calcularon las claves
+        conn.execute(f'PRAGMA user_version = {VERSION_HUELLAS}')
+    inicio = time.perf_counter()
+    conn.commit()
+    segundos += time.perf_counter() - inicio
+
+    segundos_indices = crear_indices(conn)
+    inicio = time.perf_counter()
+    guardar_sketches(conn, sketches)
+    conn.commit()
+    segundos_resumenes += time.perf_counter() - inicio
+
+    for pragma in PRAGMAS_NORMALES:
+        conn.execute(pragma)
+
+    return {
+        'filas': filas,
+        'segundos': segundos,
+        'filas_por_segundo': filas / segundos if segundos > 0 else 0.0,
+        'segundos_resumenes': segundos_resumenes,
+        'segundos_indices': segundos_indices,
+    }
+
+
+# ============================================================================
+# MODO INCREMENTAL
+# ============================================================================
+
+def columnas_tabla(conn, tabla='accidents'):
+    return [fila[1] for fila in conn.execute(f'PRAGMA table_info("{tabla}")')]
+
+
+def tipos_tabla(conn, tabla='accidents'):
+    """Tipo declarado de cada columna de `tabla`: {columna: tipo}."""
+    return {fila[1]: fila[2] for fila in conn.execute(f'PRAGMA table_info("{tabla}")')}
+
+
+def version_huellas(conn):
+    """Versión de hash_filas con la que se guardaron row_key y row_hash (0: anterior)."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def existe_tabla(conn, tabla='accidents'):
+    consulta = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    return conn.execute(consulta, (tabla,)).fetchone() is not None
+
+
+def huella_cola(ruta, hasta_byte):
+    """SHA-1 de los últimos BYTES_HUELLA_COLA bytes anteriores a hasta_byte."""
+    inicio = max(0, hasta_byte - BYTES_HUELLA_COLA)
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        return hashlib.sha1(archivo.read(hasta_byte - inicio)).hexdigest()
+
+
+def leer_watermark(conn, fuente):
+    conn.execute(TABLA_WATERMARK)
+    fila = conn.execute(
+        "SELECT bytes, mtime, filas, huella_cola, actualizado FROM etl_watermark WHERE fuente = ?",
+        (os.path.abspath(fuente),)
+    ).fetchone()
+    if fila is None:
+        return None
+    return dict(zip(['bytes', 'mtime', 'filas', 'huella_cola', 'actualizado'], fila))
+
+
+def byte_de_reanudacion(conn, fuente):
+    """
+    Byte desde el que continuar la lectura de `fuente`. Si el archivo no
+    cambió se devuelve su tamaño (nada que leer); si solo creció por el
+    final (la cola de lo ya ingerido no cambió y termina en salto de línea)
+    se reanuda tras el watermark; si no, se relee desde 0 y el upsert
+    descarta lo que ya estaba cargado.
+    """
+    marca = leer_watermark(conn, fuente)
+    tamano = os.path.getsize(fuente)
+    if marca is None or marca['bytes'] == 0 or tamano < marca['bytes']:
+        return 0
+    if tamano == marca['bytes']:
+        # Mismo tamaño: sin cambios solo si tampoco cambió la fecha de modificación
+        return tamano if os.path.getmtime(fuente) == marca['mtime'] else 0
+    if huella_cola(fuente, marca['bytes']) != marca['huella_cola']:
+        return 0
+    with open(fuente, 'rb') as archivo:
+        archivo.seek(marca['bytes'] - 1)
+        if archivo.read(1) != b'\n':
+            return 0
+    return marca['bytes']
+
+
+def huellas_cargadas(conn, tamano_lote=TAMANO_LOTE):
+    """
+    row_hash de las filas ya cargadas en accidents, ordenados y sin
+    repetidos (8 bytes por fila), para sembrar la detección de duplicados
+    entre ejecuciones (huellas.py).
+    """
+    cursor = conn.execute("SELECT row_hash FROM accidents WHERE row_hash IS NOT NULL")
+    partes = []
+    while True:
+        lote = cursor.fetchmany(tamano_lote)
+        if not lote:
+            break
+        partes.append(np.fromiter((fila[0] for fila in lote), dtype='int64', count=len(lote)))
+    return np.unique(np.concatenate(partes)) if partes else np.empty(0, dtype='int64')
+
+
+def guardar_watermark(conn, fuente, hasta_byte, filas):
+    """Registra que `fuente` quedó ingerida hasta `hasta_byte` (filas acumuladas)."""
+    conn.execute(TABLA_WATERMARK)
+    conn.execute(
+        "INSERT INTO etl_watermark (fuente, bytes, mtime, filas, huella_cola, actualizado) "
+        "VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(fuente) DO UPDATE SET bytes = excluded.bytes, mtime = excluded.mtime, "
+        "filas = excluded.filas, huella_cola = excluded.huella_cola, actualizado = excluded.actualizado",
+        (os.path.abspath(fuente), hasta_byte, os.path.getmtime(fuente), filas,
+         huella_cola(fuente, hasta_byte),
+         datetime.now().strftime(FORMATO_FECHA_HORA))
+    )
+    conn.commit()
+
+
+def upsert_accidentes(conn, bloques, tamano_lote=TAMANO_LOTE):
+    """
+    Inserta filas nuevas y actualiza las que cambiaron (mismo row_key,
+    distinto row_hash) sin reconstruir la tabla ni sus índices. Las filas
+    idénticas a las ya cargadas no se tocan. Columnas nuevas en los bloques
+    se agregan con ALTER TABLE. Las tablas de resumen se ajustan con el
+    delta de cada bloque (se reconstruyen si aún no existen); a los
+    sketches se suman las filas nuevas y, si alguna fila cambió, se
+    recalculan al final.
+
+    Retorna un dict con filas, insertadas, actualizadas, segundos,
+    filas_por_segundo y segundos_resumenes.
+    """
+    bloques = iter(bloques)
+    primero = next(bloques, None)
+    if primero is None:
+        return {'filas': 0, 'insertadas': 0, 'actualizadas': 0, 'segundos': 0.0,
+                'filas_por_segundo': 0.0, 'segundos_resumenes': 0.0}
+
+    existentes = set(columnas_tabla(conn))
+    for col, dtype in primero.dtypes.items():
+        if col not in existentes:
+            conn.execute(f'ALTER TABLE accidents ADD COLUMN "{col}" {tipo_sql(col, dtype)}')
+    conn.execute(INDICE_CLAVE)
+    if not existen_tablas_resumen(conn, columnas_tabla(conn)):
+        reconstruir_resumenes(conn, columnas_tabla(conn))
+    indexar_resumenes(conn, columnas_tabla(conn))
+    sketches = leer_sketches(conn)
+    if sketches is None:
+        sketches = reconstruir_sketches(conn, columnas_tabla(conn))
+    conn.commit()
+
+    columnas = ', '.join(f'"{col}"' for col in primero.columns)
+    marcadores = ', '.join('?' * len(primero.columns))
+    asignaciones = ', '.join(f'"{col}" = excluded."{col}"' for col in primero.columns if col != 'row_key')
+    upsert = (
+        f'INSERT INTO accidents ({columnas}) VALUES ({marcadores}) '
+        f'ON CONFLICT(row_key) DO UPDATE SET {asignaciones} '
+        f'WHERE accidents.row_hash IS NOT excluded.row_hash'
+    )
+
+    total_antes = conn.execute("SELECT COUNT(*) FROM accidents").fetchone()[0]
+
+    filas = 0
+    cambios = 0
+    segundos = 0.0
+    segundos_resumenes = 0.0
+    conn.execute('BEGIN')
+    for df in chain([primero], bloques):
+        # Antes de escribir se resta el aporte de las filas que cambian...
+        inicio = time.perf_counter()
+        nuevas, modificadas = restar_anteriores(conn, df)
+        # Los sketches no admiten restar filas: si alguna cambió se recalculan al final
+        if sketches is not None and modificadas:
+            sketches = None
+        if sketches is not None:
+            acumular(sketches, nuevas)
+        segundos_resumenes += time.perf_counter() - inicio
+
+        # total_changes también cuenta las tablas de resumen: solo el upsert
+        cambios_antes = conn.total_changes
+        inicio = time.perf_counter()
+        for lote in lotes(filas_sql(df), tamano_lote):
+            conn.executemany(upsert, lote)
+            filas += len(lote)
+        segundos += time.perf_counter() - inicio
+        cambios += conn.total_changes - cambios_antes
+
+        # ...y después se suma el de las filas tal como quedaron en accidents
+        inicio = time.perf_counter()
+        sumar_afectadas(conn, df.columns)
+        segundos_resumenes += time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    conn.commit()
+    segundos += time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    if sketches is None:
+        reconstruir_sketches(conn, columnas_tabla(conn))
+    else:
+        guardar_sketches(conn, sketches)
+    conn.commit()
+    segundos_resumenes += time.perf_counter() - inicio
+
+    insertadas = conn.execute("SELECT COUNT(*) FROM accidents").fetchone()[0] - total_antes
+    return {
+        'filas': filas,
+        'insertadas': insertadas,
+        'actualizadas': cambios - insertadas,
+        'segundos': segundos,
+        'filas_por_segundo': filas / segundos if segundos > 0 else 0.0,
+        'segundos_resumenes': segundos_resumenes,
+    }
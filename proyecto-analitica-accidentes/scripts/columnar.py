@@ -0,0 +1,214 @@
+"""
+Salida columnar del dataset enriquecido (Parquet o Arrow IPC)
+Escribe dataset_enriquecido.parquet / dataset_enriquecido.arrow como un
+dataset particionado por año (anio=2023/, anio=2024/, ...) con columnas de
+texto codificadas como diccionario y fechas nativas, y ofrece un lector
+común que carga solo las columnas pedidas. pyarrow es opcional: sin él se
+sigue leyendo el CSV. pandas y pyarrow se importan al usarlos, no al
+importar el módulo: las comprobaciones de rutas no los cargan.
+"""
+
+import os
+import shutil
+from importlib.util import find_spec
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+
+# Formato → (formato de pyarrow.dataset, extensión de los archivos)
+FORMATOS_COLUMNARES = {
+    'parquet': ('parquet', 'parquet'),
+    'arrow': ('ipc', 'arrow'),
+}
+
+COLUMNA_PARTICION = 'anio'
+
+# Enteros con nulos posibles (filas sin fecha): int32 nullable en Arrow
+COLUMNAS_ENTERAS = ['severity', 'anio', 'mes', 'dia', 'hora', 'trimestre']
+
+
+def pyarrow_disponible():
+    return find_spec('pyarrow') is not None
+
+
+def verificar_pyarrow():
+    if not pyarrow_disponible():
+        raise ImportError("La salida columnar requiere pyarrow: pip install pyarrow")
+
+
+def ruta_columnar(formato, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f'dataset_enriquecido.{FORMATOS_COLUMNARES[formato][1]}')
+
+
+def tipo_canonico(campo):
+    """Tipo Arrow estable entre bloques para una columna."""
+    import pyarrow as pa
+    if campo.name in COLUMNAS_ENTERAS:
+        return pa.int32()
+    if campo.name == 'fecha':
+        return pa.date32()
+    if (pa.types.is_string(campo.type) or pa.types.is_large_string(campo.type)
+            or pa.types.is_null(campo.type) or pa.types.is_dictionary(campo.type)):
+        # Texto y categorías de pd.cut → diccionario (códigos + valores únicos)
+        return pa.dictionary(pa.int32(), pa.string())
+    return campo.type
+
+
+def tabla_arrow(df, esquema=None):
+    """
+    Convierte un DataFrame a una tabla Arrow con el esquema canónico. Con
+    `esquema` (el del primer bloque o el del dataset existente) todas las
+    tablas de una misma salida comparten tipos y orden de columnas.
+    """
+    import pyarrow as pa
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    if esquema is None:
+        esquema = pa.schema([pa.field(campo.name, tipo_canonico(campo)) for campo in tabla.schema])
+
+    columnas = []
+    for campo in esquema:
+        if campo.name in tabla.column_names:
+            columnas.append(tabla.column(campo.name).cast(campo.type))
+        else:
+            columnas.append(pa.nulls(len(tabla), campo.type))
+    return pa.Table.from_arrays(columnas, schema=esquema)
+
+
+def reiniciar_salida(ruta):
+    """Elimina una salida columnar anterior (directorio o archivo)."""
+    if os.path.isdir(ruta):
+        shutil.rmtree(ruta)
+    elif os.path.exists(ruta):
+        os.remove(ruta)
+
+
+def escribir_bloque(df, ruta, formato, prefijo, esquema=None):
+    """
+    Agrega un bloque al dataset de `ruta` como archivos nuevos
+    `<prefijo>-<n>.<ext>` dentro de la partición de su año (sin particionar
+    si el bloque no tiene anio). Retorna el esquema usado, para pasarlo a
+    los bloques siguientes.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    formato_ds, extension = FORMATOS_COLUMNARES[formato]
+    tabla = tabla_arrow(df, esquema)
+
+    particion = None
+    if COLUMNA_PARTICION in tabla.column_names:
+        campo = tabla.schema.field(COLUMNA_PARTICION)
+        particion = ds.partitioning(pa.schema([campo]), flavor='hive')
+
+    ds.write_dataset(
+        tabla, ruta,
+        format=formato_ds,
+        partitioning=particion,
+        basename_template=f'{prefijo}-{{i}}.{extension}',
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return tabla.schema
+
+
+def finalizar_salida(ruta):
+    """
+    Marca la salida como actualizada: escribir dentro de una partición no
+    cambia la fecha del directorio raíz, que es la que compara el lector.
+    """
+    os.utime(ruta)
+
+
+def restaurar_tipos(df):
+    """Tipos de fecha para bloques leídos de SQLite (donde se guardan como texto)."""
+    import pandas as pd
+    if 'start_time' in df.columns:
+        df['start_time'] = pd.to_datetime(df['start_time'], errors='coerce')
+    if 'fecha' in df.columns:
+        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce').dt.date
+    return df
+
+
+def abrir_dataset(ruta, formato):
+    """
+    Dataset de una salida columnar. Los archivos Arrow IPC (sin comprimir)
+    se abren con memory map: sus buffers son vistas del archivo en la caché
+    de páginas del sistema, compartidas entre procesos, y no copias en el heap.
+    """
+    import pyarrow.dataset as ds
+    sistema = None
+    if formato == 'arrow':
+        from pyarrow.fs import LocalFileSystem
+        sistema = LocalFileSystem(use_mmap=True)
+    return ds.dataset(ruta, format=FORMATOS_COLUMNARES[formato][0], partitioning='hive', filesystem=sistema)
+
+
+def esquema_existente(ruta, formato):
+    """Esquema de un dataset ya escrito (None si no existe)."""
+    if not os.path.exists(ruta):
+        return None
+    # Incluye la columna de partición (anio), reconstruida desde los directorios
+    return abrir_dataset(ruta, formato).schema
+
+
+def tamano_salida(ruta):
+    """Bytes ocupados por una salida columnar (suma de sus archivos)."""
+    if os.path.isfile(ruta):
+        return os.path.getsize(ruta)
+    return sum(
+        os.path.getsize(os.path.join(raiz, nombre))
+        for raiz, _, nombres in os.walk(ruta) for nombre in nombres
+    )
+
+
+def salida_vigente(data_dir=DATA_DIR):
+    """
+    (formato, ruta) de la salida columnar más reciente que no sea más
+    antigua que el CSV enriquecido, o None si hay que leer el CSV.
+    """
+    if not pyarrow_disponible():
+        return None
+    csv = os.path.join(data_dir, 'dataset_enriquecido.csv')
+    minimo = os.path.getmtime(csv) if os.path.exists(csv) else 0
+    candidatas = [
+        (os.path.getmtime(ruta_columnar(formato, data_dir)), formato)
+        for formato in FORMATOS_COLUMNARES
+        if os.path.exists(ruta_columnar(formato, data_dir))
+    ]
+    candidatas = [(mtime, formato) for mtime, formato in candidatas if mtime >= minimo]
+    if not candidatas:
+        return None
+    formato = max(candidatas)[1]
+    return formato, ruta_columnar(formato, data_dir)
+
+
+def leer_tabla(columnas=None, data_dir=DATA_DIR):
+    """
+    Tabla Arrow con `columnas` (todas si es None; las que no existan se
+    ignoran) de la salida Parquet/Arrow vigente, o None si hay que leer el
+    CSV. Con Arrow IPC la tabla apunta al archivo mapeado en memoria.
+    """
+    salida = salida_vigente(data_dir)
+    if salida is None:
+        return None
+    dataset = abrir_dataset(salida[1], salida[0])
+    if columnas is not None:
+        columnas = [col for col in columnas if col in dataset.schema.names]
+    return dataset.to_table(columns=columnas)
+
+
+def leer_dataset(columnas=None, data_dir=DATA_DIR):
+    """
+    Carga el dataset enriquecido leyendo solo `columnas` (todas si es None;
+    las que no existan se ignoran). Usa la salida Parquet/Arrow si está al
+    día y pyarrow está instalado; si no, el CSV con start_time como fecha.
+    """
+    tabla = leer_tabla(columnas, data_dir)
+    if tabla is not None:
+        return tabla.to_pandas()
+
+    import pandas as pd
+    csv = os.path.join(data_dir, 'dataset_enriquecido.csv')
+    usecols = None if columnas is None else (lambda col: col in set(columnas))
+    df = pd.read_csv(csv, usecols=usecols)
+    if 'start_time' in df.columns:
+        df['start_time'] = pd.to_datetime(df['start_time'], errors='coerce')
+    return df
@@ -0,0 +1,119 @@
+"""
+Compara dos informes de ejecución de create_database.py
+Muestra, paso a paso, el tiempo de pared, el tiempo de CPU y el pico de
+memoria de ambas ejecuciones y marca como regresión todo paso que empeore
+más que el umbral (y más que un mínimo absoluto, para no alertar por
+pasos de milisegundos). Sale con código 1 si hay regresiones, para
+usarlo en CI.
+Ejecutar: python scripts/comparar_informes.py base.json nuevo.json [--umbral 0.10]
+"""
+
+import argparse
+import json
+import sys
+
+from instrumentacion import clave_orden
+
+UMBRAL = 0.10           # 10 % peor que la base
+MINIMO_SEGUNDOS = 0.05  # diferencias menores no cuentan como regresión
+MINIMO_MB = 5.0
+
+# Métrica → (título, mínimo absoluto para considerar la diferencia)
+METRICAS = {
+    'segundos': ('Pared (s)', MINIMO_SEGUNDOS),
+    'cpu_segundos': ('CPU (s)', MINIMO_SEGUNDOS),
+    'pico_rss_mb': ('Pico RSS (MB)', MINIMO_MB),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compara dos informes de ejecución de create_database.py")
+    parser.add_argument('base', help="Informe de referencia (JSON)")
+    parser.add_argument('nuevo', help="Informe a evaluar (JSON)")
+    parser.add_argument('--umbral', type=float, default=UMBRAL,
+                        help="Empeoramiento relativo que cuenta como regresión. Por defecto: %(default)s")
+    return parser.parse_args()
+
+
+def leer_informe(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def pasos_por_id(informe):
+    """Pasos del informe indexados por id, más el total de la ejecución."""
+    pasos = {p['id']: p for p in informe['pasos']}
+    pasos['Total'] = {
+        'id': 'Total', 'nombre': '', 'padre': None,
+        'segundos': informe.get('segundos_total'),
+        'cpu_segundos': None,
+        'pico_rss_mb': informe.get('pico_rss_mb'),
+    }
+    return pasos
+
+
+def es_regresion(antes, despues, minimo, umbral):
+    if antes is None or despues is None:
+        return False
+    return despues - antes > minimo and despues > antes * (1 + umbral)
+
+
+def formatear(antes, despues):
+    if antes is None or despues is None:
+        return '-'
+    cambio = f"{(despues - antes) / antes:+.0%}" if antes else 'nuevo'
+    return f"{antes:.2f} → {despues:.2f} ({cambio})"
+
+
+def comparar(base, nuevo, umbral=UMBRAL):
+    """Lista de (id, nombre, {métrica: texto}, métricas en regresión)."""
+    pasos_base = pasos_por_id(base)
+    pasos_nuevo = pasos_por_id(nuevo)
+    ids = sorted((set(pasos_base) | set(pasos_nuevo)) - {'Total'}, key=clave_orden) + ['Total']
+
+    filas = []
+    for id_paso in ids:
+        a = pasos_base.get(id_paso, {})
+        b = pasos_nuevo.get(id_paso, {})
+        textos = {}
+        regresiones = []
+        for metrica, (_, minimo) in METRICAS.items():
+            textos[metrica] = formatear(a.get(metrica), b.get(metrica))
+            if es_regresion(a.get(metrica), b.get(metrica), minimo, umbral):
+                regresiones.append(metrica)
+        filas.append((id_paso, b.get('nombre') or a.get('nombre', ''), textos, regresiones))
+    return filas
+
+
+def main():
+    args = parse_args()
+    base = leer_informe(args.base)
+    nuevo = leer_informe(args.nuevo)
+
+    print("=" * 100)
+    print("📊 COMPARACIÓN DE INFORMES DE EJECUCIÓN")
+    print("=" * 100)
+    print(f"   Base:  {args.base} ({base.get('modo')}, {base.get('registros')} registros, {base.get('inicio')})")
+    print(f"   Nuevo: {args.nuevo} ({nuevo.get('modo')}, {nuevo.get('registros')} registros, {nuevo.get('inicio')})")
+    if base.get('modo') != nuevo.get('modo') or base.get('registros') != nuevo.get('registros'):
+        print(f"   ⚠️  Las ejecuciones no son comparables 1:1 (distinto modo o cantidad de registros)")
+
+    filas = comparar(base, nuevo, args.umbral)
+    titulos = [titulo for titulo, _ in METRICAS.values()]
+    print(f"\n   {'Paso':<30} " + ' '.join(f"{titulo:>24}" for titulo in titulos))
+    for id_paso, nombre, textos, regresiones in filas:
+        marca = '  ⚠️' if regresiones else ''
+        print(f"   {(id_paso + ' ' + nombre)[:30]:<30} "
+              + ' '.join(f"{textos[metrica]:>24}" for metrica in METRICAS) + marca)
+
+    regresiones = [(id_paso, metrica) for id_paso, _, _, metricas in filas for metrica in metricas]
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} regresiones sobre el umbral de {args.umbral:.0%}:")
+        for id_paso, metrica in regresiones:
+            print(f"   - Paso {id_paso}: {METRICAS[metrica][0]}")
+        sys.exit(1)
+    print(f"\n✅ Sin regresiones sobre el umbral de {args.umbral:.0%}")
+
+
+if __name__ == '__main__':
+    main()
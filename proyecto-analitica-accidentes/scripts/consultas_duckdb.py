@@ -0,0 +1,93 @@
+"""
+Consultas del dashboard con DuckDB sobre las exportaciones (modo DuckDB)
+Define la vista accidents directamente sobre dataset_enriquecido.parquet,
+dataset_enriquecido.arrow o dataset_enriquecido.csv, sin cargarlos ni
+copiarlos: DuckDB lee en cada consulta solo las columnas que usa, con su
+motor columnar y vectorizado. Las consultas son las de consultas_sqlite
+con el dialecto de DuckDB. duckdb es opcional y se importa al crear el
+pool.
+"""
+
+import os
+from importlib.util import find_spec
+
+from columnar import DATA_DIR, COLUMNAS_ENTERAS, abrir_dataset, salida_vigente
+from consultas_sqlite import TAMANO_POOL, armar_pool
+
+DIALECTO_DUCKDB = {
+    # CAST redondea en DuckDB: se trunca antes con FLOOR
+    'entero': 'CAST(FLOOR({}) AS INTEGER)',
+    # Sin rowid en archivos: orden fijo por hash del valor
+    'orden_muestra': 'hash("{columna}")',
+    # Cuantiles con interpolación lineal nativos
+    'cuantiles': 'quantile_cont("{columna}", {probabilidades})',
+}
+
+
+def duckdb_disponible():
+    return find_spec('duckdb') is not None
+
+
+def verificar_duckdb():
+    if not duckdb_disponible():
+        raise ImportError("El modo DuckDB requiere duckdb: pip install duckdb")
+
+
+def literal(ruta):
+    """Ruta como literal de texto SQL."""
+    return "'" + ruta.replace("'", "''") + "'"
+
+
+def definir_vista(conn, data_dir=DATA_DIR):
+    """
+    Crea la vista accidents sobre la exportación más reciente: Parquet
+    particionado con read_parquet, Arrow IPC como dataset de pyarrow
+    registrado (escaneo perezoso) y, si no hay salida columnar vigente, el
+    CSV con read_csv. Las columnas enteras que lleguen como DOUBLE (en el
+    CSV los enteros con nulos se escriben como 3.0) se convierten a
+    INTEGER, igual que en proyecto.db. Retorna (ruta, registros): los
+    objetos registrados son propios de cada conexión y hay que
+    registrarlos en cada cursor.
+    """
+    registros = {}
+    salida = salida_vigente(data_dir)
+    if salida is not None and salida[0] == 'parquet':
+        ruta = salida[1]
+        patron = os.path.join(ruta, '**', '*.parquet') if os.path.isdir(ruta) else ruta
+        origen = f"read_parquet({literal(patron)}, hive_partitioning = true)"
+    elif salida is not None:
+        ruta = salida[1]
+        registros['accidents_arrow'] = abrir_dataset(ruta, 'arrow')
+        origen = 'accidents_arrow'
+    else:
+        ruta = os.path.join(data_dir, 'dataset_enriquecido.csv')
+        origen = f"read_csv({literal(ruta)})"
+    for nombre, objeto in registros.items():
+        conn.register(nombre, objeto)
+    conn.execute(f"CREATE OR REPLACE VIEW accidents AS SELECT * FROM {origen}")
+
+    tipos = {fila[0]: fila[1] for fila in conn.execute("DESCRIBE accidents").fetchall()}
+    enteros = [col for col in COLUMNAS_ENTERAS if tipos.get(col) in ('DOUBLE', 'FLOAT')]
+    if enteros:
+        reemplazos = ', '.join(f'CAST("{col}" AS INTEGER) AS "{col}"' for col in enteros)
+        conn.execute(f"CREATE OR REPLACE VIEW accidents AS SELECT * REPLACE ({reemplazos}) FROM {origen}")
+    return ruta, registros
+
+
+def crear_pool(data_dir=DATA_DIR, tamano=TAMANO_POOL):
+    """
+    Pool de cursores de una misma base DuckDB en memoria (solo catálogo:
+    los datos se leen de los archivos). Cada cursor es una conexión
+    independiente, segura para usarse desde un hilo a la vez.
+    """
+    verificar_duckdb()
+    import duckdb
+    conn = duckdb.connect()
+    ruta, registros = definir_vista(conn, data_dir)
+    cursores = [conn.cursor() for _ in range(tamano)]
+    for cursor in cursores:
+        for nombre, objeto in registros.items():
+            cursor.register(nombre, objeto)
+    pool = armar_pool(cursores, ruta, DIALECTO_DUCKDB)
+    pool['conexion'] = conn
+    return pool
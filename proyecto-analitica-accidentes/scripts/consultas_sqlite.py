@@ -0,0 +1,309 @@
+"""
+Consultas del dashboard contra proyecto.db (modo SQLite)
+Traduce los filtros del sidebar a SQL parametrizado sobre accidents y deja
+que SQLite haga filtros, GROUP BY, cuantiles e histogramas: a Python solo
+vuelven conjuntos de resultados pequeños, así que la memoria del proceso
+no depende del tamaño del dataset. Las conexiones son de solo lectura y se
+reparten desde un pool (una conexión por hilo de Streamlit a la vez).
+Los resultados tienen la misma forma que los de cubo.consultar y
+distribuciones.resumir_distribucion. Las diferencias de SQL entre motores
+van en un dialecto, que consultas_duckdb reutiliza con DuckDB.
+"""
+
+import math
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from cubo import DIMENSIONES_CUBO, METRICAS_CUBO
+from distribuciones import BINS_HISTOGRAMA, MAX_ATIPICOS, FACTOR_BIGOTES
+from resumenes import DIMENSIONES_RESUMEN, tabla_resumen
+
+TAMANO_POOL = 4
+
+# Expresiones propias de cada motor
+DIALECTO_SQLITE = {
+    # Parte entera de un valor no negativo (CAST trunca en SQLite)
+    'entero': 'CAST({} AS INTEGER)',
+    # Orden pseudoaleatorio fijo (hash multiplicativo del rowid) para
+    # muestrear atípicos igual en cada rerun
+    'orden_muestra': '(rowid * 2654435761) % 4294967296',
+    # Sin función de cuantiles: se ordena con ROW_NUMBER
+    'cuantiles': None,
+}
+
+
+# ============================================================================
+# CONEXIONES
+# ============================================================================
+
+def conectar_solo_lectura(ruta):
+    """Conexión de solo lectura (mode=ro), usable desde otros hilos."""
+    conn = sqlite3.connect(f'file:{ruta}?mode=ro', uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def armar_pool(conexiones, ruta, dialecto, resumenes=()):
+    """
+    Pool con las conexiones dadas: {'ruta', 'libres', 'columnas',
+    'dialecto', 'resumenes'}. Falla si no hay una tabla o vista accidents.
+    """
+    libres = queue.Queue()
+    for conn in conexiones:
+        libres.put(conn)
+
+    conn = libres.get()
+    try:
+        columnas = [d[0] for d in conn.execute('SELECT * FROM accidents LIMIT 0').description]
+    finally:
+        libres.put(conn)
+
+    return {
+        'ruta': ruta,
+        'libres': libres,
+        'columnas': columnas,
+        'dialecto': dialecto,
+        'resumenes': set(resumenes),
+    }
+
+
+def crear_pool(ruta, tamano=TAMANO_POOL):
+    """Pool de conexiones de solo lectura a proyecto.db."""
+    conexiones = [conectar_solo_lectura(ruta) for _ in range(tamano)]
+    tablas = {fila[0] for fila in conexiones[0].execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    resumenes = [dim for dim in DIMENSIONES_RESUMEN if tabla_resumen(dim) in tablas]
+    return armar_pool(conexiones, ruta, DIALECTO_SQLITE, resumenes)
+
+
+@contextmanager
+def conexion(pool):
+    """Toma una conexión del pool (espera si están todas en uso) y la devuelve al salir."""
+    conn = pool['libres'].get()
+    try:
+        yield conn
+    finally:
+        pool['libres'].put(conn)
+
+
+# ============================================================================
+# SQL
+# ============================================================================
+
+def valor_parametro(valor):
+    """Tipos NumPy → Python para sqlite3."""
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+def clausula_where(pool, filtros, condiciones=()):
+    """
+    WHERE parametrizado para {columna: valores} (selección vacía = sin
+    filtro) más `condiciones` adicionales. Solo se aceptan columnas de
+    accidents, que van entre comillas; los valores van como parámetros.
+    """
+    partes = list(condiciones)
+    parametros = []
+    for col, valores in filtros.items():
+        if not valores:
+            continue
+        if col not in pool['columnas']:
+            raise ValueError(f"Columna de filtro desconocida: {col}")
+        partes.append(f'"{col}" IN ({", ".join("?" * len(valores))})')
+        parametros.extend(valor_parametro(v) for v in valores)
+    where = f" WHERE {' AND '.join(partes)}" if partes else ''
+    return where, parametros
+
+
+def conteos_dimension(conn, pool, dim, filtros):
+    """
+    Conteos como value_counts (de mayor a menor, empates por valor, sin
+    nulos) y severidad media por valor, en la misma consulta.
+    """
+    severidad = 'AVG(severity)' if 'severity' in pool['columnas'] else 'NULL'
+    if not any(filtros.values()) and dim in pool['resumenes']:
+        # Sin filtros basta la tabla de resumen materializada
+        consulta = (f'SELECT "{dim}", total_accidents, avg_severity FROM "{tabla_resumen(dim)}" '
+                    f'WHERE "{dim}" IS NOT NULL ORDER BY 2 DESC, 1')
+        parametros = []
+    else:
+        where, parametros = clausula_where(pool, filtros, [f'"{dim}" IS NOT NULL'])
+        consulta = (f'SELECT "{dim}", COUNT(*), {severidad} FROM accidents{where} '
+                    f'GROUP BY 1 ORDER BY 2 DESC, 1')
+    filas = conn.execute(consulta, parametros).fetchall()
+    indice = pd.Index([fila[0] for fila in filas], name=dim)
+    conteos = pd.Series([fila[1] for fila in filas], index=indice, name='n', dtype='int64')
+    severidad_media = pd.Series([fila[2] for fila in filas], index=indice, dtype='float64')
+    return conteos, severidad_media
+
+
+def cuantiles(conn, pool, columna, filtros, probabilidades, n):
+    """
+    Cuantiles con interpolación lineal (como np.quantile). Con la función
+    del motor si la tiene; si no, con un solo ordenamiento y leyendo solo
+    las filas vecinas a cada posición.
+    """
+    plantilla = pool['dialecto']['cuantiles']
+    if plantilla is not None:
+        where, parametros = clausula_where(pool, filtros, [f'"{columna}" IS NOT NULL'])
+        expresion = plantilla.format(columna=columna, probabilidades=list(probabilidades))
+        return [float(v) for v in conn.execute(f'SELECT {expresion} FROM accidents{where}', parametros).fetchone()[0]]
+
+    posiciones = {}
+    for p in probabilidades:
+        exacta = p * (n - 1)
+        posiciones[p] = (math.floor(exacta), exacta - math.floor(exacta))
+    necesarias = sorted({i + d for i, _ in posiciones.values() for d in (0, 1) if i + d < n})
+
+    where, parametros = clausula_where(pool, filtros, [f'"{columna}" IS NOT NULL'])
+    filas = dict(conn.execute(
+        f'SELECT r, v FROM (SELECT ROW_NUMBER() OVER (ORDER BY "{columna}") - 1 AS r, '
+        f'"{columna}" AS v FROM accidents{where}) '
+        f'WHERE r IN ({", ".join("?" * len(necesarias))})',
+        parametros + necesarias
+    ).fetchall())
+
+    resultado = []
+    for p in probabilidades:
+        i, fraccion = posiciones[p]
+        bajo = filas[i]
+        alto = filas.get(i + 1, bajo)
+        resultado.append(bajo + (alto - bajo) * fraccion)
+    return resultado
+
+
+def agregados_metrica(m):
+    """Expresiones SQL de n, suma, suma de cuadrados, mínimo y máximo de una métrica."""
+    return [f'COUNT("{m}")', f'SUM("{m}")', f'SUM("{m}" * "{m}")', f'MIN("{m}")', f'MAX("{m}")']
+
+
+def estadisticas_sql(conn, pool, m, filtros, n, suma, suma2, minimo, maximo):
+    """Media, desviacion, extremos y mediana (exacta) a partir de agregados_metrica."""
+    if n == 0:
+        return {'n': 0, 'media': np.nan, 'desviacion': np.nan, 'minimo': np.nan,
+                'maximo': np.nan, 'mediana': np.nan}
+    media = suma / n
+    varianza = max(suma2 / n - media**2, 0.0)
+    return {
+        'n': n,
+        'media': media,
+        'desviacion': math.sqrt(varianza * n / (n - 1)) if n > 1 else 0.0,
+        'minimo': minimo,
+        'maximo': maximo,
+        'mediana': cuantiles(conn, pool, m, filtros, [0.5], n)[0],
+    }
+
+
+# ============================================================================
+# CONSULTAS DEL DASHBOARD
+# ============================================================================
+
+def consultar(pool, filtros):
+    """
+    Agregados del dashboard (misma forma que cubo.consultar). Total,
+    severidad media y agregados de las métricas salen de un solo recorrido.
+    """
+    dimensiones = [dim for dim in DIMENSIONES_CUBO if dim in pool['columnas']]
+    metricas = [m for m in METRICAS_CUBO if m in pool['columnas']]
+    with conexion(pool) as conn:
+        where, parametros = clausula_where(pool, filtros)
+        expresiones = ['COUNT(*)', 'AVG(severity)' if 'severity' in pool['columnas'] else 'NULL']
+        for m in metricas:
+            expresiones += agregados_metrica(m)
+        fila = conn.execute(f'SELECT {", ".join(expresiones)} FROM accidents{where}', parametros).fetchone()
+        total, severidad_media = fila[:2]
+
+        resultado = {
+            'total': total,
+            'conteos': {},
+            'severidad_media': severidad_media if severidad_media is not None else np.nan,
+            'severidad_por_clima': pd.Series(dtype='float64'),
+        }
+        for dim in dimensiones:
+            conteos, severidad = conteos_dimension(conn, pool, dim, filtros)
+            resultado['conteos'][dim] = conteos
+            if dim == 'weather_condition':
+                resultado['severidad_por_clima'] = severidad
+        resultado['metricas'] = {
+            m: estadisticas_sql(conn, pool, m, filtros, *fila[2 + 5 * i:7 + 5 * i])
+            for i, m in enumerate(metricas)
+        }
+    return resultado
+
+
+def resumir_distribucion_sql(pool, columna, filtros, bins=BINS_HISTOGRAMA, max_atipicos=MAX_ATIPICOS):
+    """Histograma y boxplot calculados en SQLite (misma forma que resumir_distribucion)."""
+    with conexion(pool) as conn:
+        base = [f'"{columna}" IS NOT NULL']
+        where, parametros = clausula_where(pool, filtros, base)
+        n, minimo, maximo, media = conn.execute(
+            f'SELECT COUNT(*), MIN("{columna}"), MAX("{columna}"), AVG("{columna}") FROM accidents{where}',
+            parametros
+        ).fetchone()
+        if n == 0:
+            return {'bordes': np.linspace(0, 1, bins + 1), 'conteos': np.zeros(bins, dtype='int64'),
+                    'caja': None}
+
+        # Mismos bordes que np.histogram (rango ±0.5 si todos los valores son iguales)
+        bordes = np.histogram_bin_edges([], bins=bins, range=(minimo, maximo))
+        inicio, paso = float(bordes[0]), (float(bordes[-1]) - float(bordes[0])) / bins
+        conteos = np.zeros(bins, dtype='int64')
+        # Índice aproximado y, como hace NumPy, corrección contra los bordes
+        # reales (i·paso + inicio) para los valores que caen justo en uno
+        entero = pool['dialecto']['entero'].format(f'("{columna}" - ?) * ?')
+        for indice, conteo in conn.execute(
+            f'SELECT CASE WHEN v < i * ? + ? THEN i - 1 '
+            f'WHEN i < ? AND v >= (i + 1) * ? + ? THEN i + 1 ELSE i END, COUNT(*) '
+            f'FROM (SELECT v, CASE WHEN i > ? THEN ? ELSE i END AS i '
+            f'FROM (SELECT "{columna}" AS v, {entero} AS i FROM accidents{where})) GROUP BY 1',
+            [paso, inicio, bins - 1, paso, inicio, bins - 1, bins - 1,
+             inicio, bins / (bordes[-1] - bordes[0])] + parametros
+        ).fetchall():
+            conteos[indice] = conteo
+
+        q1, mediana, q3 = cuantiles(conn, pool, columna, filtros, [0.25, 0.5, 0.75], n)
+        rango = q3 - q1
+        limite_inf = q1 - FACTOR_BIGOTES * rango
+        limite_sup = q3 + FACTOR_BIGOTES * rango
+
+        fuera = f'("{columna}" < ? OR "{columna}" > ?)'
+        bigote_inf, bigote_sup, n_atipicos, atipico_min, atipico_max = conn.execute(
+            f'SELECT MIN(CASE WHEN "{columna}" >= ? THEN "{columna}" END), '
+            f'MAX(CASE WHEN "{columna}" <= ? THEN "{columna}" END), '
+            f'SUM({fuera}), MIN(CASE WHEN {fuera} THEN "{columna}" END), '
+            f'MAX(CASE WHEN {fuera} THEN "{columna}" END) FROM accidents{where}',
+            [limite_inf, limite_sup] + [limite_inf, limite_sup] * 3 + parametros
+        ).fetchone()
+
+        where_fuera, parametros_fuera = clausula_where(pool, filtros, base + [fuera])
+        if n_atipicos > max_atipicos:
+            # Muestra fija que conserva siempre el mínimo y el máximo
+            orden = pool['dialecto']['orden_muestra'].format(columna=columna)
+            muestra = [fila[0] for fila in conn.execute(
+                f'SELECT "{columna}" FROM accidents{where_fuera} ORDER BY {orden} LIMIT ?',
+                [limite_inf, limite_sup] + parametros_fuera + [max_atipicos - 2]
+            ).fetchall()]
+            atipicos = [atipico_min, atipico_max] + muestra
+        else:
+            atipicos = [fila[0] for fila in conn.execute(
+                f'SELECT "{columna}" FROM accidents{where_fuera}',
+                [limite_inf, limite_sup] + parametros_fuera
+            ).fetchall()]
+
+    return {
+        'bordes': bordes,
+        'conteos': conteos,
+        'caja': {
+            'n': n,
+            'q1': q1,
+            'mediana': mediana,
+            'q3': q3,
+            'media': media,
+            'bigote_inf': bigote_inf,
+            'bigote_sup': bigote_sup,
+            'n_atipicos': n_atipicos,
+            'atipicos': np.sort(np.array(atipicos, dtype='float64')),
+        },
+    }
@@ -1,432 +1,1101 @@
-"""
-Script CORREGIDO para Etapa 2
-Limpieza, enriquecimiento y análisis de accidentes viales
-Autor: Sebastian Castaño
-Fecha: Noviembre 2024
-"""
-
-import sqlite3
-import pandas as pd
-import numpy as np
-import os
-from datetime import datetime, timedelta
-import random
-import warnings
-warnings.filterwarnings('ignore')
-
-# ============================================================================
-# CONFIGURACIÓN
-# ============================================================================
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
-DB_DIR = '../db'
-CSV_INPUT = os.path.join(DATA_DIR, 'road_accidents.csv')
-DB_FILE = os.path.join(DB_DIR, 'proyecto.db')
-CSV_EXPORT = os.path.join(DB_DIR, 'export.csv')
-CSV_ENRICHED = os.path.join(DATA_DIR, 'dataset_enriquecido.csv')
-
-# Crear directorios
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(DB_DIR, exist_ok=True)
-
-print("=" * 80)
-print("🚗 ETAPA 2: LIMPIEZA Y ENRIQUECIMIENTO DE DATOS")
-print("=" * 80)
-print(f"\n📅 Fecha de ejecución: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-# ============================================================================
-# PASO 1: CARGAR DATASET
-# ============================================================================
-
-print("📂 PASO 1: Cargando dataset...")
-print("-" * 80)
-
-if not os.path.exists(CSV_INPUT):
-    print(f"❌ ERROR: No se encontró el archivo {CSV_INPUT}")
-    print(f"\n💡 SOLUCIÓN:")
-    print(f"   1. Ve a: https://www.kaggle.com/datasets/ankushpanday1/global-road-accidents-dataset")
-    print(f"   2. Descarga el dataset (requiere cuenta de Kaggle)")
-    print(f"   3. Extrae el CSV y renómbralo a 'road_accidents.csv'")
-    print(f"   4. Guárdalo en: {DATA_DIR}/road_accidents.csv")
-    print(f"   5. Ejecuta este script nuevamente")
-    exit(1)
-
-try:
-    # Leer CSV (ajustar según el dataset real)
-    print(f"✓ Archivo encontrado: {CSV_INPUT}")
-    print(f"⏳ Cargando datos (esto puede tomar varios minutos)...")
-    
-    # Leer solo las primeras 10,000 filas para el proyecto académico
-    df_original = pd.read_csv(CSV_INPUT, nrows=10000, low_memory=False)
-    
-    print(f"✓ Dataset cargado exitosamente")
-    print(f"  - Registros: {len(df_original):,}")
-    print(f"  - Columnas: {len(df_original.columns)}")
-    print(f"  - Tamaño en memoria: {df_original.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-    
-    print(f"\n📋 Columnas encontradas:")
-    for i, col in enumerate(df_original.columns, 1):
-        print(f"   {i:2d}. {col}")
-    
-    print(f"\n📋 Primeras 3 filas:")
-    print(df_original.head(3))
-    
-except Exception as e:
-    print(f"❌ ERROR al cargar datos: {e}")
-    print(f"\n💡 Verifica que el archivo CSV sea válido y esté en el formato correcto")
-    exit(1)
-
-# ============================================================================
-# PASO 2: LIMPIEZA DE DATOS
-# ============================================================================
-
-print("\n\n🧹 PASO 2: LIMPIEZA DE DATOS")
-print("=" * 80)
-
-df = df_original.copy()
-registros_iniciales = len(df)
-
-# 2.1 Eliminar duplicados
-print("\n2.1 ELIMINANDO DUPLICADOS...")
-duplicados_antes = df.duplicated().sum()
-df = df.drop_duplicates()
-duplicados_eliminados = duplicados_antes
-print(f"   ✓ Duplicados eliminados: {duplicados_eliminados}")
-print(f"   ✓ Registros restantes: {len(df):,}")
-
-# 2.2 Analizar valores nulos
-print("\n2.2 ANALIZANDO VALORES NULOS...")
-nulos = df.isnull().sum()
-nulos_pct = (nulos / len(df)) * 100
-columnas_con_nulos = nulos[nulos > 0].sort_values(ascending=False)
-
-if len(columnas_con_nulos) > 0:
-    print(f"   ⚠️  Columnas con valores nulos:")
-    for col, count in columnas_con_nulos.items():
-        pct = (count / len(df)) * 100
-        print(f"      - {col}: {count:,} ({pct:.1f}%)")
-else:
-    print(f"   ✓ No se encontraron valores nulos")
-
-# 2.3 Normalizar nombres de columnas
-print("\n2.3 NORMALIZANDO NOMBRES DE COLUMNAS...")
-print(f"   Columnas originales (primeras 5): {list(df.columns[:5])}")
-
-columnas_nuevas = {}
-for col in df.columns:
-    # Convertir a minúsculas
-    col_nueva = col.lower().strip()
-    # Reemplazar espacios y caracteres especiales
-    col_nueva = col_nueva.replace(' ', '_')
-    col_nueva = col_nueva.replace('(', '').replace(')', '')
-    col_nueva = col_nueva.replace('/', '_')
-    col_nueva = col_nueva.replace('-', '_')
-    # Quitar acentos
-    col_nueva = col_nueva.replace('á', 'a').replace('é', 'e')
-    col_nueva = col_nueva.replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
-    columnas_nuevas[col] = col_nueva
-
-df = df.rename(columns=columnas_nuevas)
-print(f"   ✓ Columnas normalizadas: {len(columnas_nuevas)}")
-print(f"   Columnas nuevas (primeras 5): {list(df.columns[:5])}")
-
-# 2.4 Seleccionar columnas relevantes
-print("\n2.4 SELECCIONANDO COLUMNAS RELEVANTES...")
-
-# Mapeo de nombres comunes en datasets de accidentes
-columnas_comunes = {
-    'id': ['id', 'accident_id', 'index'],
-    'severity': ['severity', 'accident_severity'],
-    'start_time': ['start_time', 'date', 'datetime', 'accident_date'],
-    'city': ['city', 'ciudad'],
-    'state': ['state', 'estado', 'province'],
-    'weather_condition': ['weather_condition', 'weather', 'clima'],
-    'temperature_f': ['temperature_f', 'temperature', 'temp'],
-    'visibility_mi': ['visibility_mi', 'visibility'],
-    'description': ['description', 'descripcion']
-}
-
-# Detectar columnas disponibles
-columnas_encontradas = {}
-for col_estandar, posibles_nombres in columnas_comunes.items():
-    for nombre in posibles_nombres:
-        if nombre in df.columns:
-            columnas_encontradas[col_estandar] = nombre
-            break
-
-print(f"   ✓ Columnas mapeadas:")
-for estandar, real in columnas_encontradas.items():
-    print(f"      {estandar} ← {real}")
-
-# Renombrar a nombres estándar
-df = df.rename(columns={v: k for k, v in columnas_encontradas.items()})
-
-# Asegurar que tengamos las columnas mínimas necesarias
-columnas_necesarias = ['severity', 'start_time', 'city', 'weather_condition', 
-                       'temperature_f', 'visibility_mi']
-
-columnas_faltantes = [col for col in columnas_necesarias if col not in df.columns]
-
-if columnas_faltantes:
-    print(f"   ⚠️  Columnas faltantes: {columnas_faltantes}")
-    print(f"   Creando columnas sintéticas para demostración...")
-    
-    # Crear columnas sintéticas si faltan
-    if 'severity' not in df.columns:
-        df['severity'] = np.random.choice([1, 2, 3, 4], size=len(df), p=[0.4, 0.35, 0.2, 0.05])
-    
-    if 'city' not in df.columns:
-        ciudades = ['Medellín', 'Bogotá', 'Cali', 'Barranquilla', 'Cartagena']
-        df['city'] = np.random.choice(ciudades, size=len(df))
-    
-    if 'weather_condition' not in df.columns:
-        climas = ['Despejado', 'Lluvia leve', 'Nublado', 'Lluvia fuerte', 'Neblina']
-        df['weather_condition'] = np.random.choice(climas, size=len(df))
-    
-    if 'temperature_f' not in df.columns:
-        df['temperature_f'] = np.random.uniform(50, 95, size=len(df))
-    
-    if 'visibility_mi' not in df.columns:
-        df['visibility_mi'] = np.random.uniform(0.5, 10, size=len(df))
-
-# 2.5 Validar y convertir tipos de datos
-print("\n2.5 VALIDANDO TIPOS DE DATOS...")
-
-# Severity
-if 'severity' in df.columns:
-    df['severity'] = pd.to_numeric(df['severity'], errors='coerce')
-    df['severity'] = df['severity'].fillna(2).astype(int)
-    df['severity'] = df['severity'].clip(1, 4)
-    print(f"   ✓ 'severity' → integer (rango: {df['severity'].min()}-{df['severity'].max()})")
-
-# Temperature
-if 'temperature_f' in df.columns:
-    df['temperature_f'] = pd.to_numeric(df['temperature_f'], errors='coerce')
-    df['temperature_f'] = df['temperature_f'].fillna(df['temperature_f'].median())
-    print(f"   ✓ 'temperature_f' → float")
-
-# Visibility
-if 'visibility_mi' in df.columns:
-    df['visibility_mi'] = pd.to_numeric(df['visibility_mi'], errors='coerce')
-    df['visibility_mi'] = df['visibility_mi'].fillna(df['visibility_mi'].median())
-    print(f"   ✓ 'visibility_mi' → float")
-
-# Columnas de texto
-for col in ['city', 'state', 'weather_condition']:
-    if col in df.columns:
-        df[col] = df[col].astype(str).str.strip().str.title()
-        df[col] = df[col].replace('Nan', 'Desconocido')
-        print(f"   ✓ '{col}' → string limpio")
-
-# Start_time
-if 'start_time' in df.columns:
-    df['start_time'] = pd.to_datetime(df['start_time'], errors='coerce')
-    # Si hay muchos nulos, generar fechas aleatorias
-    nulos_fecha = df['start_time'].isnull().sum()
-    if nulos_fecha > len(df) * 0.5:
-        print(f"   ⚠️  Generando fechas aleatorias ({nulos_fecha} nulos)")
-        fecha_inicio = datetime(2023, 1, 1)
-        fecha_fin = datetime(2024, 12, 31)
-        dias_dif = (fecha_fin - fecha_inicio).days
-        
-        fechas = []
-        for _ in range(len(df)):
-            dias_random = random.randint(0, dias_dif)
-            fecha = fecha_inicio + timedelta(days=dias_random)
-            hora = random.randint(0, 23)
-            minuto = random.randint(0, 59)
-            fecha = fecha.replace(hour=hora, minute=minuto)
-            fechas.append(fecha)
-        
-        df['start_time'] = fechas
-    print(f"   ✓ 'start_time' → datetime")
-
-# 2.6 Resumen de limpieza
-print("\n✅ RESUMEN DE LIMPIEZA:")
-print(f"   Registros iniciales: {registros_iniciales:,}")
-print(f"   Registros finales: {len(df):,}")
-print(f"   Duplicados eliminados: {duplicados_eliminados}")
-print(f"   Columnas procesadas: {len(df.columns)}")
-
-# ============================================================================
-# PASO 3: ENRIQUECIMIENTO DE DATOS
-# ============================================================================
-
-print("\n\n📅 PASO 3: ENRIQUECIMIENTO DE DATOS")
-print("=" * 80)
-
-# 3.1 Variables temporales
-print("\n3.1 CREANDO VARIABLES TEMPORALES...")
-
-if 'start_time' in df.columns:
-    df['fecha'] = df['start_time'].dt.date
-    df['anio'] = df['start_time'].dt.year
-    df['mes'] = df['start_time'].dt.month
-    df['mes_nombre'] = df['start_time'].dt.month_name()
-    df['dia'] = df['start_time'].dt.day
-    df['dia_semana'] = df['start_time'].dt.day_name()
-    df['hora'] = df['start_time'].dt.hour
-    df['trimestre'] = df['start_time'].dt.quarter
-    
-    print(f"   ✓ fecha (rango: {df['fecha'].min()} a {df['fecha'].max()})")
-    print(f"   ✓ anio (valores: {sorted(df['anio'].unique())})")
-    print(f"   ✓ mes (rango: 1-12)")
-    print(f"   ✓ mes_nombre")
-    print(f"   ✓ dia (rango: 1-31)")
-    print(f"   ✓ dia_semana")
-    print(f"   ✓ hora (rango: 0-23)")
-    print(f"   ✓ trimestre (rango: 1-4)")
-
-# 3.2 Variables categóricas derivadas
-print("\n3.2 CREANDO VARIABLES CATEGÓRICAS...")
-
-# Categoría de visibilidad
-if 'visibility_mi' in df.columns:
-    df['categoria_visibilidad'] = pd.cut(
-        df['visibility_mi'],
-        bins=[0, 2, 5, 10, float('inf')],
-        labels=['Muy Baja (0-2 mi)', 'Baja (2-5 mi)', 'Media (5-10 mi)', 'Alta (>10 mi)']
-    )
-    print(f"   ✓ categoria_visibilidad")
-
-# Categoría de temperatura
-if 'temperature_f' in df.columns:
-    df['categoria_temperatura'] = pd.cut(
-        df['temperature_f'],
-        bins=[0, 40, 60, 80, float('inf')],
-        labels=['Fría (<40°F)', 'Templada (40-60°F)', 'Cálida (60-80°F)', 'Muy Cálida (>80°F)']
-    )
-    print(f"   ✓ categoria_temperatura")
-
-print(f"\n✅ DATASET ENRIQUECIDO:")
-print(f"   Registros: {len(df):,}")
-print(f"   Columnas totales: {len(df.columns)}")
-print(f"   Columnas agregadas: {len(df.columns) - len(df_original.columns)}")
-
-# ============================================================================
-# PASO 4: EXPORTAR DATASET ENRIQUECIDO
-# ============================================================================
-
-print("\n\n💾 PASO 4: EXPORTANDO DATASET ENRIQUECIDO")
-print("=" * 80)
-
-df.to_csv(CSV_ENRICHED, index=False)
-print(f"\n✓ Dataset enriquecido exportado:")
-print(f"   Ruta: {CSV_ENRICHED}")
-print(f"   Registros: {len(df):,}")
-print(f"   Columnas: {len(df.columns)}")
-print(f"   Tamaño: {os.path.getsize(CSV_ENRICHED) / 1024:.2f} KB")
-
-# ============================================================================
-# PASO 5: CREAR BASE DE DATOS SQL ITE
-# ============================================================================
-
-print("\n\n💾 PASO 5: CREANDO BASE DE DATOS SQLITE")
-print("=" * 80)
-
-# Eliminar BD anterior
-if os.path.exists(DB_FILE):
-    os.remove(DB_FILE)
-
-conn = sqlite3.connect(DB_FILE)
-cursor = conn.cursor()
-
-# Insertar datos
-print(f"\n📥 Insertando datos en SQLite...")
-df.to_sql('accidents', conn, if_exists='replace', index=False)
-
-# Verificar
-cursor.execute("SELECT COUNT(*) FROM accidents")
-count = cursor.fetchone()[0]
-print(f"✓ {count:,} registros insertados")
-
-# Crear índices
-print(f"\n⚡ Creando índices...")
-indices = [
-    "CREATE INDEX IF NOT EXISTS idx_severity ON accidents(severity);",
-    "CREATE INDEX IF NOT EXISTS idx_city ON accidents(city);",
-    "CREATE INDEX IF NOT EXISTS idx_weather ON accidents(weather_condition);",
-]
-
-for idx in indices:
-    cursor.execute(idx)
-print(f"✓ {len(indices)} índices creados")
-
-# Crear vistas
-print(f"\n👁️  Creando vistas...")
-
-view1 = """
-CREATE VIEW IF NOT EXISTS accidents_by_city AS
-SELECT 
-    city,
-    COUNT(*) as total_accidents,
-    ROUND(AVG(severity), 2) as avg_severity
-FROM accidents
-GROUP BY city
-ORDER BY total_accidents DESC;
-"""
-cursor.execute(view1)
-
-view2 = """
-CREATE VIEW IF NOT EXISTS accidents_by_weather AS
-SELECT 
-    weather_condition,
-    COUNT(*) as total_accidents,
-    ROUND(AVG(severity), 2) as avg_severity
-FROM accidents
-GROUP BY weather_condition
-ORDER BY total_accidents DESC;
-"""
-cursor.execute(view2)
-
-print(f"✓ 2 vistas creadas")
-
-conn.commit()
-
-# ============================================================================
-# PASO 6: EXPORTAR CSVs
-# ============================================================================
-
-print("\n\n📤 PASO 6: EXPORTANDO CSVs DESDE LA BASE DE DATOS")
-print("=" * 80)
-
-# Export principal
-df_export = pd.read_sql_query("SELECT * FROM accidents", conn)
-df_export.to_csv(CSV_EXPORT, index=False)
-print(f"\n✓ export.csv: {len(df_export):,} registros")
-
-# Export vistas
-view1_df = pd.read_sql_query("SELECT * FROM accidents_by_city", conn)
-view1_df.to_csv(os.path.join(DB_DIR, 'accidents_by_city.csv'), index=False)
-print(f"✓ accidents_by_city.csv: {len(view1_df):,} registros")
-
-view2_df = pd.read_sql_query("SELECT * FROM accidents_by_weather", conn)
-view2_df.to_csv(os.path.join(DB_DIR, 'accidents_by_weather.csv'), index=False)
-print(f"✓ accidents_by_weather.csv: {len(view2_df):,} registros")
-
-conn.close()
-
-# ============================================================================
-# RESUMEN FINAL
-# ============================================================================
-
-print("\n\n" + "=" * 80)
-print("✅ PROCESO COMPLETADO EXITOSAMENTE")
-print("=" * 80)
-
-print(f"\n📊 RESUMEN:")
-print(f"   • Registros procesados: {len(df):,}")
-print(f"   • Base de datos: {DB_FILE} ({os.path.getsize(DB_FILE) / 1024**2:.2f} MB)")
-print(f"   • Dataset enriquecido: {CSV_ENRICHED}")
-print(f"   • Archivos CSV generados: 4")
-
-print(f"\n📁 ARCHIVOS GENERADOS:")
-print(f"   1. {CSV_ENRICHED}")
-print(f"   2. {CSV_EXPORT}")
-print(f"   3. {os.path.join(DB_DIR, 'accidents_by_city.csv')}")
-print(f"   4. {os.path.join(DB_DIR, 'accidents_by_weather.csv')}")
-
-print(f"\n🎉 ¡TODO LISTO PARA EL ANÁLISIS EDA!")
-print(f"📝 Siguiente paso: Ejecutar el notebook 02_enriquecimiento_eda.ipynb")
-print("=" * 80)
\ No newline at end of file
+"""
+Script CORREGIDO para Etapa 2
+Limpieza, enriquecimiento y análisis de accidentes viales
+Autor: Sebastian Castaño
+Fecha: Noviembre 2024
+
+Uso:
+    python create_database.py                              # primeras 10,000 filas en memoria
+    python create_database.py --nrows 0 --chunksize 50000  # archivo completo por bloques
+    python create_database.py --workers 8                  # pasos 2.5 y 3.x en paralelo
+    python create_database.py --incremental                # solo filas nuevas o modificadas
+    python create_database.py --chunksize 50000 --aproximado  # medianas con sketch KLL
+    python create_database.py --solo-mapeadas              # sin las columnas no mapeadas
+    python create_database.py --nrows 0 --entrada "../data/feeds/*.csv.gz"  # varios archivos
+
+Se conservan todas las columnas del CSV; con --solo-mapeadas, si alguna
+mapea a id o start_time, read_csv solo parsea las que mapean a un nombre
+estándar (COLUMNAS_COMUNES, usecols) y los duplicados y row_hash se
+calculan sobre esas columnas.
+--entrada acepta un archivo, un directorio o un glob con .csv, .csv.gz y
+.zip, que se leen sin extraer y en orden fijo (ver entradas.py).
+
+Cada ejecución escribe un informe JSON con tiempos, CPU, filas/s y pico de
+memoria por paso (db/informe_ejecucion.json, ver instrumentacion.py).
+"""
+
+import argparse
+import sqlite3
+import pandas as pd
+import numpy as np
+import os
+from datetime import datetime
+import warnings
+warnings.filterwarnings('ignore')
+
+from transformaciones import (
+    COLUMNAS_CLAVE,
+    COLUMNAS_NECESARIAS,
+    COLUMNAS_TEXTO,
+    VERSION_HUELLAS,
+    mapear_columnas,
+    columna_id,
+    tipos_lectura,
+    proyectar_columnas,
+    estandarizar_columnas,
+    filtrar_filas,
+    hash_filas,
+    agregar_claves,
+    crear_columnas_sinteticas,
+    convertir_numericos,
+    normalizar_texto,
+    convertir_fechas,
+    requiere_fechas_sinteticas,
+    generar_fechas_aleatorias,
+    agregar_variables_temporales,
+    agregar_categorias,
+    calcular_medianas,
+    perfilar_bloque,
+    transformar_bloque,
+)
+from paralelo import mapear_en_orden, transformar_en_paralelo
+from carga_sqlite import (
+    INDICES,
+    cargar_accidentes,
+    upsert_accidentes,
+    TIPOS_ACCIDENTS,
+    columnas_tabla,
+    tipos_tabla,
+    existe_tabla,
+    version_huellas,
+    leer_watermark,
+    byte_de_reanudacion,
+    guardar_watermark,
+    huellas_cargadas,
+)
+from esquema import compactar, memoria_mb
+from resumenes import leer_resumen, dimensiones_presentes
+from columnar import (
+    FORMATOS_COLUMNARES,
+    verificar_pyarrow,
+    ruta_columnar,
+    reiniciar_salida,
+    escribir_bloque,
+    finalizar_salida,
+    esquema_existente,
+    restaurar_tipos,
+    tamano_salida,
+)
+from instrumentacion import paso, registrar, iniciar, finalizar, imprimir_tiempos, anotar
+from entradas import abrir_entrada, encabezado_entrada, leer_bloques_entrada, reportar_archivos
+from sketches import kll_nuevo, kll_agregar, kll_cuantiles
+from huellas import huellas_nuevas, registrar as registrar_huellas, contiene, ultimas, memoria_huellas_mb
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+DB_DIR = '../db'
+CSV_INPUT = os.path.join(DATA_DIR, 'road_accidents.csv')
+DB_FILE = os.path.join(DB_DIR, 'proyecto.db')
+CSV_EXPORT = os.path.join(DB_DIR, 'export.csv')
+CSV_ENRICHED = os.path.join(DATA_DIR, 'dataset_enriquecido.csv')
+INFORME_FILE = os.path.join(DB_DIR, 'informe_ejecucion.json')
+
+# Leer solo las primeras 10,000 filas para el proyecto académico (0 = todas)
+NROWS_DEFECTO = 10000
+
+# Tamaño de bloque para exportar desde SQLite en modo streaming
+CHUNK_EXPORT = 50000
+
+# Tamaño de bloque por defecto del modo incremental
+CHUNK_INCREMENTAL = 50000
+
+# Hilos que descomprimen y parsean archivos de entrada por adelantado
+HILOS_LECTURA = min(4, os.cpu_count() or 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Etapa 2: limpieza, enriquecimiento y carga en SQLite")
+    parser.add_argument('--entrada', default=CSV_INPUT,
+                        help="Archivo, directorio o patrón glob (entre comillas) con .csv, .csv.gz o .zip. "
+                             "Por defecto: %(default)s")
+    parser.add_argument('--hilos-lectura', type=int, default=HILOS_LECTURA,
+                        help="Archivos de entrada leídos a la vez (descompresión y parseo). "
+                             "Por defecto: %(default)s")
+    parser.add_argument('--nrows', type=int, default=NROWS_DEFECTO,
+                        help="Filas a leer del CSV de entrada (0 = todas). Por defecto: %(default)s")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Procesar el CSV en bloques de N filas (modo streaming, memoria acotada)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos para los pasos 2.5 y 3.1-3.2 (1 = en serie). Por defecto: %(default)s")
+    parser.add_argument('--semilla', type=int, default=None,
+                        help="Semilla para las fechas sintéticas (ejecuciones reproducibles)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Actualizar proyecto.db solo con filas nuevas o modificadas (ignora --nrows)")
+    parser.add_argument('--columnar', choices=sorted(FORMATOS_COLUMNARES), default=None,
+                        help="Escribir además el dataset enriquecido en Parquet o Arrow IPC, "
+                             "particionado por año (requiere pyarrow)")
+    parser.add_argument('--informe', default=INFORME_FILE,
+                        help="Informe JSON de tiempos y memoria por paso. Por defecto: %(default)s")
+    parser.add_argument('--solo-mapeadas', action='store_true',
+                        help="Leer solo las columnas que mapean a un nombre estándar (requiere una "
+                             "columna de id o de fecha; los duplicados se detectan sobre esas columnas)")
+    parser.add_argument('--aproximado', action='store_true',
+                        help="Con --chunksize, medianas globales con un sketch KLL en vez de guardar "
+                             "todos los valores (memoria constante, error de rango < 2 %%)")
+    return parser.parse_args()
+
+
+# ============================================================================
+# PASO 1: CARGAR DATASET
+# ============================================================================
+
+def verificar_entrada(entrada):
+    if not entrada['archivos']:
+        print(f"❌ ERROR: No se encontraron archivos .csv, .csv.gz o .zip en {entrada['patron']}")
+        print(f"\n💡 SOLUCIÓN:")
+        print(f"   1. Ve a: https://www.kaggle.com/datasets/ankushpanday1/global-road-accidents-dataset")
+        print(f"   2. Descarga el dataset (requiere cuenta de Kaggle)")
+        print(f"   3. Extrae el CSV y renómbralo a 'road_accidents.csv'")
+        print(f"   4. Guárdalo en: {DATA_DIR}/road_accidents.csv")
+        print(f"   5. Ejecuta este script nuevamente")
+        print(f"   (o usa --entrada con el ZIP descargado, sin extraerlo)")
+        exit(1)
+    archivos = entrada['archivos']
+    if len(archivos) == 1:
+        print(f"✓ Archivo encontrado: {archivos[0]['ruta']}")
+    else:
+        print(f"✓ {len(archivos)} archivos encontrados en {entrada['patron']}")
+
+
+def describir_dataset(df, registros):
+    print(f"  - Registros: {registros:,}")
+    print(f"  - Columnas: {len(df.columns)}")
+    print(f"  - Tamaño en memoria: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+
+    print(f"\n📋 Columnas encontradas:")
+    for i, col in enumerate(df.columns, 1):
+        print(f"   {i:2d}. {col}")
+
+    print(f"\n📋 Primeras 3 filas:")
+    print(df.head(3))
+
+
+def opciones_lectura(entrada, solo_mapeadas=False):
+    """
+    Pre-pasada sobre el encabezado: normaliza y mapea los nombres antes de
+    leer, para que read_csv lea como texto las columnas de texto (dtype).
+    Con solo_mapeadas read_csv además solo parsea las columnas que mapean a
+    un nombre estándar (usecols, ver proyectar_columnas): los duplicados y
+    row_hash se calculan sobre esas columnas, no sobre la fila completa.
+    """
+    encabezado = encabezado_entrada(entrada)
+    lectura = {'dtype': tipos_lectura(encabezado)}
+    proyeccion = proyectar_columnas(encabezado) if solo_mapeadas else None
+    if proyeccion is not None:
+        lectura['usecols'] = proyeccion
+        print(f"✓ Proyección: se leen {len(proyeccion)} de {len(encabezado)} columnas "
+              f"(duplicados sobre las columnas leídas)")
+    elif solo_mapeadas:
+        print(f"⚠️  --solo-mapeadas sin efecto: ninguna columna mapea a id ni a start_time; "
+              f"se conservan las {len(encabezado)} columnas")
+    else:
+        print(f"✓ Se leen las {len(encabezado)} columnas del archivo")
+    return lectura
+
+
+def proyeccion_distinta(conn, entrada, solo_mapeadas):
+    """
+    True si proyecto.db se cargó con la otra opción de --solo-mapeadas:
+    row_hash se calcula sobre las columnas leídas y no coincidiría. Solo
+    sin proyección la tabla tiene las columnas no mapeadas.
+    """
+    encabezado = encabezado_entrada(entrada)
+    proyeccion = proyectar_columnas(encabezado)
+    if proyeccion is None:
+        return False
+    columnas_nuevas, _ = mapear_columnas(encabezado)
+    descartadas = {columnas_nuevas[col] for col in encabezado if col not in proyeccion}
+    if not descartadas:
+        return False
+    return bool(descartadas & set(columnas_tabla(conn))) == solo_mapeadas
+
+
+def cargar_dataset(nrows, entrada, solo_mapeadas=False):
+    print("📂 PASO 1: Cargando dataset...")
+    print("-" * 80)
+
+    verificar_entrada(entrada)
+
+    try:
+        # Leer CSV (ajustar según el dataset real)
+        lectura = opciones_lectura(entrada, solo_mapeadas)
+        print(f"⏳ Cargando datos (esto puede tomar varios minutos)...")
+
+        partes = list(leer_bloques_entrada(entrada, nrows, lectura=lectura))
+        anotar('archivos', reportar_archivos(entrada))
+        if not partes:
+            raise ValueError("no se pudo leer ningún archivo de entrada")
+        df_original = partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+        del partes
+
+        print(f"✓ Dataset cargado exitosamente")
+        describir_dataset(df_original, len(df_original))
+
+    except Exception as e:
+        print(f"❌ ERROR al cargar datos: {e}")
+        print(f"\n💡 Verifica que el archivo CSV sea válido y esté en el formato correcto")
+        exit(1)
+
+    return df_original
+
+
+def guardar_watermarks(conn, entrada, previas=None):
+    """
+    Watermark de cada archivo leído sin error, con sus filas acumuladas
+    (`previas`: {ruta: filas ya ingeridas antes del byte de reanudación}).
+    """
+    previas = previas or {}
+    for archivo in entrada['archivos']:
+        if archivo.get('filas') is not None and not archivo.get('error'):
+            guardar_watermark(conn, archivo['ruta'], archivo['bytes'],
+                              previas.get(archivo['ruta'], 0) + archivo['filas'])
+
+
+# ============================================================================
+# PASO 2: LIMPIEZA DE DATOS
+# ============================================================================
+
+def reportar_nulos(nulos, total):
+    columnas_con_nulos = nulos[nulos > 0].sort_values(ascending=False)
+
+    if len(columnas_con_nulos) > 0:
+        print(f"   ⚠️  Columnas con valores nulos:")
+        for col, count in columnas_con_nulos.items():
+            pct = (count / total) * 100
+            print(f"      - {col}: {count:,} ({pct:.1f}%)")
+    else:
+        print(f"   ✓ No se encontraron valores nulos")
+
+
+def reportar_columnas(columnas_originales, columnas_nuevas, columnas_encontradas):
+    # 2.3 Normalizar nombres de columnas
+    print("\n2.3 NORMALIZANDO NOMBRES DE COLUMNAS...")
+    print(f"   Columnas originales (primeras 5): {list(columnas_originales[:5])}")
+    print(f"   ✓ Columnas normalizadas: {len(columnas_nuevas)}")
+    print(f"   Columnas nuevas (primeras 5): {[columnas_nuevas[c] for c in columnas_originales[:5]]}")
+
+    # 2.4 Seleccionar columnas relevantes
+    print("\n2.4 SELECCIONANDO COLUMNAS RELEVANTES...")
+    print(f"   ✓ Columnas mapeadas:")
+    for estandar, real in columnas_encontradas.items():
+        print(f"      {estandar} ← {real}")
+
+    faltantes = [col for col in COLUMNAS_NECESARIAS if col not in columnas_encontradas]
+    if faltantes:
+        print(f"   ⚠️  Columnas faltantes: {faltantes}")
+        print(f"   Creando columnas sintéticas para demostración...")
+
+
+def reportar_tipos(df, medianas):
+    if 'severity' in df.columns:
+        print(f"   ✓ 'severity' → integer (rango: {df['severity'].min()}-{df['severity'].max()})")
+    for col in medianas:
+        print(f"   ✓ '{col}' → float (mediana: {medianas[col]:.2f})")
+    for col in COLUMNAS_TEXTO:
+        if col in df.columns:
+            print(f"   ✓ '{col}' → string limpio")
+
+
+def reportar_limpieza(registros_iniciales, registros_finales, duplicados_eliminados, n_columnas):
+    print("\n✅ RESUMEN DE LIMPIEZA:")
+    print(f"   Registros iniciales: {registros_iniciales:,}")
+    print(f"   Registros finales: {registros_finales:,}")
+    print(f"   Duplicados eliminados: {duplicados_eliminados}")
+    print(f"   Columnas procesadas: {n_columnas}")
+
+
+def limpiar_dataset(df, workers=1, semilla=None):
+    """
+    Paso 2 sobre el DataFrame cargado, que se modifica en el lugar (sin
+    copia previa): quien llama no debe seguir usando el original.
+    """
+    print("\n\n🧹 PASO 2: LIMPIEZA DE DATOS")
+    print("=" * 80)
+
+    registros_iniciales = len(df)
+
+    # 2.1 Eliminar duplicados: un solo hash por fila, reutilizado como row_hash
+    print("\n2.1 ELIMINANDO DUPLICADOS...")
+    with paso('2.1', 'Duplicados', filas=registros_iniciales):
+        contenido = hash_filas(df)
+        conservar = registrar_huellas(huellas_nuevas(), contenido)
+        duplicados_eliminados = registros_iniciales - int(conservar.sum())
+        # Un mismo id de origen con contenido distinto: se conserva la última
+        # versión, antes de exportar, para que el CSV y accidents coincidan.
+        # Se marca sobre las posiciones sin duplicar y se filtra una sola vez
+        claves = None
+        claves_repetidas = 0
+        col_id = columna_id(df.columns)
+        if col_id is not None:
+            claves = hash_filas(df[[col_id]])
+            posiciones = np.flatnonzero(conservar)
+            reemplazadas = posiciones[~ultimas(claves[posiciones])]
+            del posiciones
+            claves_repetidas = len(reemplazadas)
+            conservar[reemplazadas] = False
+        if not conservar.all():
+            df = filtrar_filas(df, conservar)
+            contenido = contenido[conservar]
+            if claves is not None:
+                claves = claves[conservar]
+    print(f"   ✓ Duplicados eliminados: {duplicados_eliminados}")
+    if claves_repetidas:
+        print(f"   ✓ Filas con id repetido reemplazadas por su última versión: {claves_repetidas:,}")
+    print(f"   ✓ Registros restantes: {len(df):,}")
+
+    # 2.2 Analizar valores nulos (columna a columna, sin máscara del DataFrame completo)
+    print("\n2.2 ANALIZANDO VALORES NULOS...")
+    with paso('2.2', 'Nulos', filas=len(df)):
+        nulos = pd.Series({col: int(df[col].isna().sum()) for col in df.columns}, dtype='int64')
+    reportar_nulos(nulos, len(df))
+
+    # 2.3 - 2.4 Normalizar y mapear nombres de columnas
+    with paso('2.3', 'Nombres de columnas'):
+        columnas_nuevas, columnas_encontradas = mapear_columnas(df.columns)
+    reportar_columnas(list(df.columns), columnas_nuevas, columnas_encontradas)
+    with paso('2.4', 'Selección de columnas', filas=len(df)):
+        df = estandarizar_columnas(df, columnas_nuevas, columnas_encontradas)
+        df = agregar_claves(df, contenido, claves)
+        df = crear_columnas_sinteticas(df)
+
+    # 2.5 Validar y convertir tipos de datos
+    print("\n2.5 VALIDANDO TIPOS DE DATOS...")
+    with paso('2.5', 'Tipos de datos' + (' + 3.1-3.2 (paralelo)' if workers > 1 else ''), filas=len(df)):
+        df = convertir_tipos(df, workers, semilla)
+
+    # 2.6 Resumen de limpieza
+    reportar_limpieza(registros_iniciales, len(df), duplicados_eliminados + claves_repetidas, len(df.columns))
+
+    return df
+
+
+def convertir_tipos(df, workers=1, semilla=None):
+    """Paso 2.5 (con 3.1-3.2 dentro del pool si workers > 1)."""
+    if workers > 1:
+        # 2.5 y 3.1-3.2 en un pool de procesos; las medianas se calculan una vez
+        print(f"   ⚙️  Pasos 2.5 y 3.1-3.2 en paralelo ({workers} procesos)")
+        medianas = calcular_medianas(df)
+        df, nulos_fecha = transformar_en_paralelo(df, medianas, workers)
+        reportar_tipos(df, medianas)
+        if 'start_time' in df.columns:
+            if requiere_fechas_sinteticas(nulos_fecha, len(df)):
+                print(f"   ⚠️  Generando fechas aleatorias ({nulos_fecha} nulos)")
+                df['start_time'] = generar_fechas_aleatorias(len(df), semilla)
+                df = agregar_variables_temporales(df)
+            print(f"   ✓ 'start_time' → datetime")
+    else:
+        df, medianas = convertir_numericos(df)
+        df = normalizar_texto(df)
+        reportar_tipos(df, medianas)
+
+    # Start_time
+    if 'start_time' in df.columns and workers <= 1:
+        df = convertir_fechas(df)
+        # Si hay muchos nulos, generar fechas aleatorias
+        nulos_fecha = df['start_time'].isnull().sum()
+        if requiere_fechas_sinteticas(nulos_fecha, len(df)):
+            print(f"   ⚠️  Generando fechas aleatorias ({nulos_fecha} nulos)")
+            df['start_time'] = generar_fechas_aleatorias(len(df), semilla)
+        print(f"   ✓ 'start_time' → datetime")
+    return df
+
+
+# ============================================================================
+# PASO 3: ENRIQUECIMIENTO DE DATOS
+# ============================================================================
+
+def reportar_enriquecimiento(df, n_columnas_originales, registros, memoria=None):
+    print("\n3.1 CREANDO VARIABLES TEMPORALES...")
+    if 'start_time' in df.columns:
+        print(f"   ✓ fecha, anio, mes, mes_nombre, dia, dia_semana, hora, trimestre")
+
+    print("\n3.2 CREANDO VARIABLES CATEGÓRICAS...")
+    for col in ['categoria_visibilidad', 'categoria_temperatura']:
+        if col in df.columns:
+            print(f"   ✓ {col}")
+
+    if memoria:
+        antes, despues = memoria
+        print("\n3.3 APLICANDO ESQUEMA COMPACTO DE TIPOS...")
+        print(f"   ✓ Memoria: {antes:.2f} MB → {despues:.2f} MB "
+              f"({(1 - despues / antes) * 100 if antes else 0:.1f}% menos)")
+
+    print(f"\n✅ DATASET ENRIQUECIDO:")
+    print(f"   Registros: {registros:,}")
+    n_columnas = len(columnas_dataset(df))
+    print(f"   Columnas totales: {n_columnas}")
+    print(f"   Columnas agregadas: {n_columnas - n_columnas_originales}")
+
+
+def enriquecer_dataset(df, n_columnas_originales, enriquecido=False):
+    print("\n\n📅 PASO 3: ENRIQUECIMIENTO DE DATOS")
+    print("=" * 80)
+
+    # En modo paralelo el enriquecimiento ya se hizo dentro del pool
+    if not enriquecido:
+        with paso('3.1', 'Variables temporales', filas=len(df)):
+            df = agregar_variables_temporales(df)
+        with paso('3.2', 'Variables categóricas', filas=len(df)):
+            df = agregar_categorias(df)
+
+    # Tipos compactos sin pérdida: CSV y SQLite se escriben igual que antes
+    with paso('3.3', 'Tipos compactos', filas=len(df)):
+        antes = memoria_mb(df)
+        df = compactar(df, precision_completa=True)
+        memoria = (antes, memoria_mb(df))
+
+    if 'start_time' in df.columns:
+        print(f"\n   fecha (rango: {df['start_time'].min()} a {df['start_time'].max()})")
+        print(f"   anio (valores: {sorted(df['anio'].unique())})")
+    reportar_enriquecimiento(df, n_columnas_originales, len(df), memoria)
+
+    return df
+
+
+# ============================================================================
+# PASO 4: EXPORTAR DATASET ENRIQUECIDO
+# ============================================================================
+
+def columnas_dataset(df):
+    """Columnas publicadas en los CSV (sin las claves internas de carga)."""
+    return [col for col in df.columns if col not in COLUMNAS_CLAVE]
+
+
+def reportar_exportacion(registros, n_columnas):
+    print(f"\n✓ Dataset enriquecido exportado:")
+    print(f"   Ruta: {CSV_ENRICHED}")
+    print(f"   Registros: {registros:,}")
+    print(f"   Columnas: {n_columnas}")
+    print(f"   Tamaño: {os.path.getsize(CSV_ENRICHED) / 1024:.2f} KB")
+
+
+def reportar_columnar(formato):
+    ruta = ruta_columnar(formato)
+    particiones = [nombre for nombre in os.listdir(ruta) if nombre.startswith('anio=')]
+    print(f"\n✓ Salida columnar ({formato}):")
+    print(f"   Ruta: {ruta}")
+    if particiones:
+        print(f"   Particiones por año: {len(particiones)}")
+    print(f"   Tamaño: {tamano_salida(ruta) / 1024:.2f} KB")
+
+
+def exportar_enriquecido(df, columnar=None):
+    print("\n\n💾 PASO 4: EXPORTANDO DATASET ENRIQUECIDO")
+    print("=" * 80)
+
+    columnas = columnas_dataset(df)
+    with paso('4.1', 'CSV enriquecido', filas=len(df)):
+        df.to_csv(CSV_ENRICHED, index=False, columns=columnas)
+    reportar_exportacion(len(df), len(columnas))
+
+    if columnar:
+        with paso('4.2', f'Salida columnar ({columnar})', filas=len(df)):
+            ruta = ruta_columnar(columnar)
+            reiniciar_salida(ruta)
+            escribir_bloque(df[columnas], ruta, columnar, 'parte')
+            finalizar_salida(ruta)
+        reportar_columnar(columnar)
+
+
+# ============================================================================
+# PASO 5: CREAR BASE DE DATOS SQL ITE
+# ============================================================================
+
+def abrir_base_datos():
+    # Eliminar BD anterior
+    if os.path.exists(DB_FILE):
+        os.remove(DB_FILE)
+    return sqlite3.connect(DB_FILE)
+
+
+def registrar_carga(carga):
+    """Sub-pasos del paso 5, cronometrados dentro de carga_sqlite."""
+    registrar('5.1', 'Inserción (executemany)', carga['segundos'], filas=carga['filas'])
+    if 'segundos_indices' in carga:
+        registrar('5.2', 'Índices', carga['segundos_indices'])
+    registrar('5.3', 'Tablas de resumen', carga['segundos_resumenes'])
+
+
+def reportar_carga(conn, carga):
+    # Verificar
+    count = conn.execute("SELECT COUNT(*) FROM accidents").fetchone()[0]
+    print(f"✓ {count:,} registros insertados en {carga['segundos']:.2f} s "
+          f"({carga['filas_por_segundo']:,.0f} filas/s)")
+
+    # Índices creados después de la carga
+    print(f"\n⚡ Creando índices...")
+    print(f"✓ {len(INDICES)} índices creados en {carga['segundos_indices']:.2f} s")
+    resumenes = dimensiones_presentes(columnas_tabla(conn))
+    print(f"✓ {len(resumenes)} tablas de resumen actualizadas en {carga['segundos_resumenes']:.2f} s")
+
+
+def crear_vistas(conn):
+    cursor = conn.cursor()
+
+    # Crear vistas
+    print(f"\n👁️  Creando vistas...")
+
+    view1 = """
+    CREATE VIEW IF NOT EXISTS accidents_by_city AS
+    SELECT
+        city,
+        COUNT(*) as total_accidents,
+        ROUND(AVG(severity), 2) as avg_severity
+    FROM accidents
+    GROUP BY city
+    ORDER BY total_accidents DESC, city;
+    """
+    cursor.execute(view1)
+
+    view2 = """
+    CREATE VIEW IF NOT EXISTS accidents_by_weather AS
+    SELECT
+        weather_condition,
+        COUNT(*) as total_accidents,
+        ROUND(AVG(severity), 2) as avg_severity
+    FROM accidents
+    GROUP BY weather_condition
+    ORDER BY total_accidents DESC, weather_condition;
+    """
+    cursor.execute(view2)
+
+    print(f"✓ 2 vistas creadas")
+
+    conn.commit()
+
+
+def crear_base_datos(df):
+    print("\n\n💾 PASO 5: CREANDO BASE DE DATOS SQLITE")
+    print("=" * 80)
+
+    conn = abrir_base_datos()
+
+    # Insertar datos
+    print(f"\n📥 Insertando datos en SQLite...")
+    with paso('5', 'Base de datos SQLite', filas=len(df)):
+        carga = cargar_accidentes(conn, [df])
+        registrar_carga(carga)
+
+    reportar_carga(conn, carga)
+    crear_vistas(conn)
+    return conn
+
+
+# ============================================================================
+# PASO 6: EXPORTAR CSVs
+# ============================================================================
+
+def consulta_export(conn):
+    """SELECT de accidents con las columnas publicadas (sin claves internas)."""
+    columnas = ', '.join(f'"{col}"' for col in columnas_tabla(conn) if col not in COLUMNAS_CLAVE)
+    return f"SELECT {columnas} FROM accidents"
+
+
+def exportar_csvs(conn, chunksize=None):
+    print("\n\n📤 PASO 6: EXPORTANDO CSVs DESDE LA BASE DE DATOS")
+    print("=" * 80)
+
+    # Export principal
+    with paso('6', 'Exportación de CSVs') as registro:
+        registro['filas'] = exportar_principal(conn, chunksize)
+        print(f"\n✓ export.csv: {registro['filas']:,} registros")
+        exportar_vistas(conn)
+    conn.close()
+
+
+def exportar_principal(conn, chunksize=None):
+    """Escribe export.csv desde accidents. Retorna los registros escritos."""
+    if chunksize:
+        registros = 0
+        bloques = pd.read_sql_query(consulta_export(conn), conn, chunksize=chunksize)
+        for i, bloque in enumerate(bloques):
+            bloque.to_csv(CSV_EXPORT, index=False, mode='w' if i == 0 else 'a', header=(i == 0))
+            registros += len(bloque)
+    else:
+        df_export = pd.read_sql_query(consulta_export(conn), conn)
+        df_export.to_csv(CSV_EXPORT, index=False)
+        registros = len(df_export)
+    return registros
+
+
+def exportar_vistas(conn):
+    # Export vistas
+    # Se leen de las tablas de resumen materializadas (mismo formato que las vistas)
+    view1_df = leer_resumen(conn, 'city')
+    view1_df.to_csv(os.path.join(DB_DIR, 'accidents_by_city.csv'), index=False)
+    print(f"✓ accidents_by_city.csv: {len(view1_df):,} registros")
+
+    view2_df = leer_resumen(conn, 'weather_condition')
+    view2_df.to_csv(os.path.join(DB_DIR, 'accidents_by_weather.csv'), index=False)
+    print(f"✓ accidents_by_weather.csv: {len(view2_df):,} registros")
+
+
+# ============================================================================
+# MODO STREAMING (--chunksize)
+# ============================================================================
+
+def perfilar_fuente(nrows, chunksize, entrada, aproximado=False, solo_mapeadas=False, cargadas=None):
+    """
+    Primera pasada: recorre el CSV por bloques y calcula las estadísticas
+    globales que necesita la limpieza (duplicados, nulos, medianas y nulos
+    de start_time), guardando solo lo imprescindible por fila. Con
+    aproximado=True las medianas salen de un sketch KLL por columna
+    (sketches.py) en vez de acumular todos los valores.
+
+    Los duplicados se detectan con huellas de fila (huellas.py, ~8 bytes
+    por fila) sobre las columnas leídas (ver opciones_lectura). `cargadas`
+    son las huellas ya presentes en proyecto.db: esas filas cuentan para
+    las estadísticas pero no pasan a la segunda pasada. Si hay id de
+    origen, de las filas con el mismo id solo pasa la última (otros ~8
+    bytes por fila); las versiones reemplazadas sí cuentan para nulos y
+    medianas, que se acumulan antes de conocerlas.
+    """
+    print("📂 PASO 1: Perfilando dataset por bloques...")
+    print("-" * 80)
+
+    verificar_entrada(entrada)
+    lectura = opciones_lectura(entrada, solo_mapeadas)
+    print(f"⏳ Primera pasada en bloques de {chunksize:,} filas...")
+
+    vistas = huellas_nuevas()
+    mascaras = []
+    # Por bloque, con id de origen: filas sin duplicar y hash de su id
+    conservadas = []
+    claves = []
+    ya_cargadas = 0
+    nulos = None
+    valores = {}
+    nulos_fecha = 0
+    registros_iniciales = 0
+    columnas = None
+
+    for bloque in leer_bloques_entrada(entrada, nrows, chunksize, lectura):
+        if columnas is None:
+            col_id = columna_id(bloque.columns)
+            describir_dataset(bloque, len(bloque))
+            columnas = list(bloque.columns)
+            columnas_nuevas, columnas_encontradas = mapear_columnas(columnas)
+        registros_iniciales += len(bloque)
+
+        # 2.1 Duplicados dentro del bloque, contra bloques anteriores y
+        # contra lo ya cargado (huella = row_hash de la segunda pasada)
+        huellas = hash_filas(bloque)
+        conservar = registrar_huellas(vistas, huellas)
+        nuevas = conservar
+        if cargadas is not None:
+            nuevas = conservar & ~contiene(cargadas, huellas)
+            ya_cargadas += int(conservar.sum() - nuevas.sum())
+        mascaras.append(nuevas)
+        bloque = bloque[conservar]
+        if col_id is not None:
+            conservadas.append(conservar)
+            claves.append(hash_filas(bloque[[col_id]]))
+
+        # 2.2 Nulos sobre los nombres originales
+        nulos_bloque = bloque.isnull().sum()
+        nulos = nulos_bloque if nulos is None else nulos.add(nulos_bloque, fill_value=0)
+
+        # 2.5 Valores para medianas y nulos de fecha
+        bloque = estandarizar_columnas(bloque, columnas_nuevas, columnas_encontradas)
+        perfil = perfilar_bloque(bloque)
+        for col, v in perfil['valores'].items():
+            if aproximado:
+                kll_agregar(valores.setdefault(col, kll_nuevo()), v)
+            else:
+                valores.setdefault(col, []).append(v)
+        nulos_fecha += perfil['nulos_fecha']
+
+    anotar('archivos', reportar_archivos(entrada))
+    if columnas is None:
+        print(f"❌ ERROR: no se pudo leer ningún archivo de entrada")
+        exit(1)
+
+    # Con el id de todas las filas ya se sabe cuál es la última versión de cada uno
+    claves_repetidas = 0
+    if claves:
+        ultima = ultimas(np.concatenate(claves))
+        claves_repetidas = int((~ultima).sum())
+        desde = 0
+        for mascara, conservar in zip(mascaras, conservadas):
+            n = int(conservar.sum())
+            mascara[np.flatnonzero(conservar)[~ultima[desde:desde + n]]] = False
+            desde += n
+        del claves, conservadas
+
+    registros_finales = vistas['n'] - claves_repetidas
+    medianas = {}
+    for col, partes in valores.items():
+        if aproximado:
+            medianas[col] = kll_cuantiles(partes, [0.5])[0]
+            continue
+        todos = np.concatenate(partes)
+        medianas[col] = float(np.median(todos)) if len(todos) else np.nan
+
+    return {
+        'lectura': lectura,
+        'columnas': columnas,
+        'columnas_nuevas': columnas_nuevas,
+        'columnas_encontradas': columnas_encontradas,
+        'mascaras': mascaras,
+        'nulos': nulos.astype(int),
+        'medianas': medianas,
+        'medianas_aproximadas': aproximado,
+        'nulos_fecha': nulos_fecha,
+        'generar_fechas': requiere_fechas_sinteticas(nulos_fecha, registros_finales),
+        'registros_iniciales': registros_iniciales,
+        'registros_finales': registros_finales,
+        'claves_repetidas': claves_repetidas,
+        'ya_cargadas': ya_cargadas if cargadas is not None else None,
+        'memoria_huellas_mb': memoria_huellas_mb(vistas),
+    }
+
+
+def preparar_bloques(nrows, chunksize, entrada, perfil, semilla=None):
+    """Segunda pasada: bloques sin duplicados, con nombres estándar y claves."""
+    for i, bloque in enumerate(leer_bloques_entrada(entrada, nrows, chunksize, perfil['lectura'])):
+        bloque = bloque[perfil['mascaras'][i]]
+        bloque = estandarizar_columnas(bloque, perfil['columnas_nuevas'], perfil['columnas_encontradas'])
+        bloque = agregar_claves(bloque)
+        bloque = crear_columnas_sinteticas(bloque)
+        # Semilla derivada por bloque: reproducible con cualquier número de workers
+        semilla_bloque = None if semilla is None else [semilla, i]
+        yield bloque, perfil['medianas'], perfil['generar_fechas'], semilla_bloque
+
+
+def reportar_perfil(perfil):
+    """Paso 2: reporte de limpieza con las estadísticas globales del perfil."""
+    registros_iniciales = perfil['registros_iniciales']
+    registros_finales = perfil['registros_finales']
+
+    print("\n\n🧹 PASO 2: LIMPIEZA DE DATOS")
+    print("=" * 80)
+
+    print("\n2.1 ELIMINANDO DUPLICADOS...")
+    print(f"   ✓ Duplicados eliminados: {registros_iniciales - registros_finales - perfil['claves_repetidas']}")
+    if perfil['claves_repetidas']:
+        print(f"   ✓ Filas con id repetido reemplazadas por su última versión: {perfil['claves_repetidas']:,}")
+    print(f"   ✓ Registros restantes: {registros_finales:,}")
+    print(f"   ✓ Huellas de fila en memoria: {perfil['memoria_huellas_mb']:.2f} MB")
+    if perfil['ya_cargadas'] is not None:
+        print(f"   ✓ Ya cargadas en proyecto.db (se omiten): {perfil['ya_cargadas']:,}")
+
+    print("\n2.2 ANALIZANDO VALORES NULOS...")
+    reportar_nulos(perfil['nulos'], registros_finales)
+
+    reportar_columnas(perfil['columnas'], perfil['columnas_nuevas'], perfil['columnas_encontradas'])
+
+    print("\n2.5 VALIDANDO TIPOS DE DATOS...")
+    tipo_mediana = 'mediana global aproximada (KLL)' if perfil['medianas_aproximadas'] else 'mediana global'
+    for col, mediana in perfil['medianas'].items():
+        print(f"   ✓ '{col}' → float ({tipo_mediana}: {mediana:.2f})")
+    if perfil['generar_fechas']:
+        print(f"   ⚠️  Generando fechas aleatorias ({perfil['nulos_fecha']} nulos)")
+
+
+def ejecutar_streaming(nrows, chunksize, entrada, workers=1, semilla=None, columnar=None, aproximado=False,
+                       solo_mapeadas=False):
+    with paso('1', 'Primera pasada (perfil)') as registro:
+        perfil = perfilar_fuente(nrows, chunksize, entrada, aproximado, solo_mapeadas)
+        registro['filas'] = perfil['registros_iniciales']
+    registros_iniciales = perfil['registros_iniciales']
+    registros_finales = perfil['registros_finales']
+    reportar_perfil(perfil)
+
+    # Pasos 2.5 - 5: segunda pasada, bloque a bloque hacia los destinos
+    print(f"\n⏳ Segunda pasada: transformando y cargando bloques...")
+    if workers > 1:
+        print(f"   ⚙️  Pasos 2.5 y 3.1-3.2 en paralelo ({workers} procesos)")
+    conn = abrir_base_datos()
+    progreso = {'registros': 0, 'n_columnas': 0, 'ultimo': None, 'memoria': [0.0, 0.0]}
+    if columnar:
+        reiniciar_salida(ruta_columnar(columnar))
+
+    def exportar_bloques(bloques):
+        # Cada bloque se escribe en el CSV enriquecido (y en la salida
+        # columnar) y pasa al cargador SQLite
+        esquema = None
+        for i, bloque in enumerate(bloques):
+            progreso['memoria'][0] += memoria_mb(bloque)
+            bloque = compactar(bloque, precision_completa=True)
+            progreso['memoria'][1] += memoria_mb(bloque)
+            columnas = columnas_dataset(bloque)
+            bloque.to_csv(CSV_ENRICHED, index=False, columns=columnas,
+                          mode='w' if i == 0 else 'a', header=(i == 0))
+            if columnar:
+                esquema = escribir_bloque(bloque[columnas], ruta_columnar(columnar), columnar,
+                                          f'bloque-{i:05d}', esquema)
+            progreso['registros'] += len(bloque)
+            progreso['n_columnas'] = len(columnas)
+            progreso['ultimo'] = bloque
+            print(f"   ✓ Bloque {i + 1}: {len(bloque):,} registros (acumulado: {progreso['registros']:,})")
+            yield bloque
+
+    with paso('2-5', 'Segunda pasada (transformación y carga)') as registro:
+        bloques = mapear_en_orden(transformar_bloque, preparar_bloques(nrows, chunksize, entrada, perfil, semilla),
+                                  workers)
+        carga = cargar_accidentes(conn, exportar_bloques(bloques))
+        registrar_carga(carga)
+        registro['filas'] = progreso['registros']
+    registros = progreso['registros']
+    n_columnas = progreso['n_columnas']
+    df = progreso['ultimo']
+
+    reportar_limpieza(registros_iniciales, registros, registros_iniciales - registros_finales, n_columnas)
+
+    print("\n\n📅 PASO 3: ENRIQUECIMIENTO DE DATOS")
+    print("=" * 80)
+    reportar_enriquecimiento(df, len(perfil['columnas']), registros, progreso['memoria'])
+
+    print("\n\n💾 PASO 4: EXPORTANDO DATASET ENRIQUECIDO")
+    print("=" * 80)
+    reportar_exportacion(registros, n_columnas)
+    if columnar:
+        finalizar_salida(ruta_columnar(columnar))
+        reportar_columnar(columnar)
+
+    print("\n\n💾 PASO 5: CREANDO BASE DE DATOS SQLITE")
+    print("=" * 80)
+    reportar_carga(conn, carga)
+    crear_vistas(conn)
+    if nrows is None:
+        guardar_watermarks(conn, entrada)
+
+    exportar_csvs(conn, chunksize=CHUNK_EXPORT)
+    return registros
+
+
+# ============================================================================
+# MODO INCREMENTAL (--incremental)
+# ============================================================================
+
+def exportar_incremental(conn, ultimo_rowid, actualizadas, columnar=None):
+    """
+    Paso 6 incremental: si solo hubo inserciones se agregan al final de los
+    CSV (y a la salida columnar) las filas nuevas (rowid > ultimo_rowid); si
+    alguna fila cambió se regeneran completos desde la base de datos.
+    Retorna los registros escritos.
+    """
+    print("\n\n📤 PASO 6: EXPORTANDO CSVs DESDE LA BASE DE DATOS")
+    print("=" * 80)
+
+    ruta = ruta_columnar(columnar) if columnar else None
+    consulta = consulta_export(conn)
+    if actualizadas or not os.path.exists(CSV_EXPORT) or (ruta and not os.path.exists(ruta)):
+        parametros = ()
+        print(f"\n⏳ Regenerando CSVs completos ({actualizadas:,} filas modificadas)...")
+    else:
+        consulta += " WHERE rowid > ?"
+        parametros = (ultimo_rowid,)
+        print(f"\n⏳ Agregando filas nuevas a los CSVs...")
+
+    registros = 0
+    esquema = None
+    if ruta:
+        # Las filas nuevas se agregan con el esquema de la salida existente
+        if parametros:
+            esquema = esquema_existente(ruta, columnar)
+        else:
+            reiniciar_salida(ruta)
+    bloques = pd.read_sql_query(consulta, conn, params=parametros, chunksize=CHUNK_EXPORT)
+    for i, bloque in enumerate(bloques):
+        for ruta_csv in [CSV_EXPORT, CSV_ENRICHED]:
+            reescribir = not parametros and i == 0
+            bloque.to_csv(ruta_csv, index=False, mode='w' if reescribir else 'a', header=reescribir)
+        if ruta:
+            esquema = escribir_bloque(restaurar_tipos(bloque), ruta, columnar,
+                                      f'bloque-{ultimo_rowid if parametros else 0}-{i:05d}', esquema)
+        registros += len(bloque)
+    print(f"✓ export.csv y dataset_enriquecido.csv: {registros:,} registros escritos")
+    if ruta and os.path.exists(ruta):
+        finalizar_salida(ruta)
+        reportar_columnar(columnar)
+
+    exportar_vistas(conn)
+    conn.close()
+    return registros
+
+
+def ejecutar_incremental(chunksize, entrada, workers=1, semilla=None, columnar=None, aproximado=False,
+                         solo_mapeadas=False):
+    print("🔄 MODO INCREMENTAL")
+    print("-" * 80)
+
+    verificar_entrada(entrada)
+    conn = sqlite3.connect(DB_FILE) if os.path.exists(DB_FILE) else None
+    motivo = None
+    if conn is None or not existe_tabla(conn) or 'row_key' not in columnas_tabla(conn):
+        motivo = "no existe o no tiene claves de fila"
+    elif version_huellas(conn) != VERSION_HUELLAS:
+        # Claves calculadas con otra versión de hash_filas no coinciden con
+        # las nuevas: toda fila se vería nueva o modificada
+        motivo = "tiene claves de fila de otra versión del hash"
+    elif tipos_tabla(conn).get('id', TIPOS_ACCIDENTS['id']) != TIPOS_ACCIDENTS['id']:
+        # Versiones anteriores declaraban id INTEGER: ids de texto y numéricos mezclados
+        motivo = "declara id con otro tipo"
+    elif proyeccion_distinta(conn, entrada, solo_mapeadas):
+        motivo = "se cargó con la otra opción de --solo-mapeadas"
+    if motivo is not None:
+        print(f"⚠️  proyecto.db {motivo}: se reconstruye completa\n")
+        if conn is not None:
+            conn.close()
+        return ejecutar_streaming(None, chunksize, entrada, workers, semilla, columnar, aproximado,
+                                  solo_mapeadas)
+
+    # Watermark por archivo: los CSV que solo crecieron se reanudan en el
+    # último byte ingerido; un comprimido que cambió se relee completo
+    pendientes = []
+    filas_previas = {}
+    for archivo in entrada['archivos']:
+        marca = leer_watermark(conn, archivo['ruta'])
+        desde_byte = byte_de_reanudacion(conn, archivo['ruta'])
+        if marca and desde_byte >= archivo['bytes']:
+            print(f"✓ {archivo['nombre']}: sin cambios ({marca['filas']:,} filas, {marca['actualizado']})")
+            continue
+        if desde_byte and archivo['tipo'] != 'csv':
+            print(f"⚠️  {archivo['nombre']}: el archivo comprimido cambió, se relee completo")
+            desde_byte = 0
+        elif desde_byte:
+            print(f"✓ {archivo['nombre']}: reanudando desde el byte {desde_byte:,} de {archivo['bytes']:,} "
+                  f"({marca['filas']:,} filas ya ingeridas)")
+            filas_previas[archivo['ruta']] = marca['filas']
+        else:
+            print(f"⚠️  {archivo['nombre']}: sin watermark válido, se relee y solo se cargan cambios")
+        archivo['desde'] = desde_byte
+        pendientes.append(archivo)
+
+    if not pendientes:
+        print(f"\n✓ Sin datos nuevos desde la última ingesta")
+        conn.close()
+        return 0
+
+    entrada = dict(entrada, archivos=pendientes)
+    with paso('1', 'Primera pasada (perfil)') as registro:
+        # Las filas ya cargadas (mismo row_hash) no se transforman de nuevo
+        cargadas = huellas_nuevas(huellas_cargadas(conn))
+        perfil = perfilar_fuente(None, chunksize, entrada, aproximado, solo_mapeadas, cargadas)
+        registro['filas'] = perfil['registros_iniciales']
+    reportar_perfil(perfil)
+
+    print("\n\n💾 PASO 5: ACTUALIZANDO BASE DE DATOS SQLITE")
+    print("=" * 80)
+    ultimo_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM accidents").fetchone()[0]
+    with paso('2-5', 'Segunda pasada (transformación y upsert)') as registro:
+        bloques = mapear_en_orden(
+            transformar_bloque,
+            preparar_bloques(None, chunksize, entrada, perfil, semilla),
+            workers
+        )
+        carga = upsert_accidentes(conn, bloques)
+        registrar_carga(carga)
+        registro['filas'] = carga['filas']
+    print(f"✓ {carga['filas']:,} filas procesadas en {carga['segundos']:.2f} s "
+          f"({carga['filas_por_segundo']:,.0f} filas/s)")
+    print(f"   - Nuevas: {carga['insertadas']:,}")
+    print(f"   - Modificadas: {carga['actualizadas']:,}")
+    sin_cambios = carga['filas'] - carga['insertadas'] - carga['actualizadas'] + perfil['ya_cargadas']
+    print(f"   - Sin cambios: {sin_cambios:,}")
+    print(f"✓ Tablas de resumen actualizadas en {carga['segundos_resumenes']:.2f} s")
+
+    crear_vistas(conn)
+    guardar_watermarks(conn, entrada, filas_previas)
+
+    with paso('6', 'Exportación de CSVs') as registro:
+        registro['filas'] = exportar_incremental(conn, ultimo_rowid, carga['actualizadas'], columnar)
+    return carga['insertadas'] + carga['actualizadas']
+
+
+# ============================================================================
+# RESUMEN FINAL
+# ============================================================================
+
+def resumen_final(registros, columnar=None, informe=None):
+    print("\n\n" + "=" * 80)
+    print("✅ PROCESO COMPLETADO EXITOSAMENTE")
+    print("=" * 80)
+
+    print(f"\n📊 RESUMEN:")
+    print(f"   • Registros procesados: {registros:,}")
+    print(f"   • Base de datos: {DB_FILE} ({os.path.getsize(DB_FILE) / 1024**2:.2f} MB)")
+    print(f"   • Dataset enriquecido: {CSV_ENRICHED}")
+    print(f"   • Archivos CSV generados: 4")
+    if informe:
+        print(f"   • Informe de tiempos: {informe}")
+
+    print(f"\n📁 ARCHIVOS GENERADOS:")
+    print(f"   1. {CSV_ENRICHED}")
+    print(f"   2. {CSV_EXPORT}")
+    print(f"   3. {os.path.join(DB_DIR, 'accidents_by_city.csv')}")
+    print(f"   4. {os.path.join(DB_DIR, 'accidents_by_weather.csv')}")
+    if columnar:
+        print(f"   5. {ruta_columnar(columnar)}")
+
+    print(f"\n🎉 ¡TODO LISTO PARA EL ANÁLISIS EDA!")
+    print(f"📝 Siguiente paso: Ejecutar el notebook 02_enriquecimiento_eda.ipynb")
+    print("=" * 80)
+
+
+def main():
+    args = parse_args()
+    nrows = args.nrows or None
+    if args.columnar:
+        verificar_pyarrow()
+
+    # Crear directorios
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(DB_DIR, exist_ok=True)
+
+    print("=" * 80)
+    print("🚗 ETAPA 2: LIMPIEZA Y ENRIQUECIMIENTO DE DATOS")
+    print("=" * 80)
+    print(f"\n📅 Fecha de ejecución: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    modo = 'incremental' if args.incremental else 'streaming' if args.chunksize else 'memoria'
+    iniciar(vars(args), modo)
+    entrada = abrir_entrada(args.entrada, args.hilos_lectura)
+
+    if args.incremental:
+        registros = ejecutar_incremental(args.chunksize or CHUNK_INCREMENTAL, entrada, args.workers,
+                                         args.semilla, args.columnar, args.aproximado, args.solo_mapeadas)
+    elif args.chunksize:
+        registros = ejecutar_streaming(nrows, args.chunksize, entrada, args.workers, args.semilla,
+                                       args.columnar, args.aproximado, args.solo_mapeadas)
+    else:
+        # Sin referencia al DataFrame cargado: la limpieza trabaja en el lugar
+        with paso('1', 'Carga del CSV') as registro:
+            df = cargar_dataset(nrows, entrada, args.solo_mapeadas)
+            registro['filas'] = len(df)
+        registros_iniciales = len(df)
+        n_columnas_originales = len(df.columns)
+        with paso('2', 'Limpieza', filas=registros_iniciales):
+            df = limpiar_dataset(df, args.workers, args.semilla)
+        with paso('3', 'Enriquecimiento', filas=len(df)):
+            df = enriquecer_dataset(df, n_columnas_originales, enriquecido=args.workers > 1)
+        with paso('4', 'Exportación del dataset enriquecido', filas=len(df)):
+            exportar_enriquecido(df, args.columnar)
+        conn = crear_base_datos(df)
+        if nrows is None:
+            guardar_watermarks(conn, entrada)
+        exportar_csvs(conn)
+        registros = len(df)
+
+    informe = finalizar(args.informe, registros)
+    imprimir_tiempos(informe)
+    resumen_final(registros, args.columnar, args.informe)
+
+
+if __name__ == '__main__':
+    main()
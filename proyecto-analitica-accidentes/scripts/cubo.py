@@ -0,0 +1,164 @@
+"""
+Cubo de agregados para el dashboard
+Agrupa una sola vez el dataset por (anio, mes, city, severity,
+weather_condition) y guarda por celda el conteo y, para visibilidad y
+temperatura, conteo, suma, suma de cuadrados, mínimo, máximo e histograma.
+Cualquier combinación de filtros del dashboard se responde sumando celdas,
+así que el costo depende del número de celdas y no del de filas.
+"""
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONES_CUBO = ['anio', 'mes', 'city', 'severity', 'weather_condition']
+METRICAS_CUBO = ['visibility_mi', 'temperature_f']
+
+# Bins de los histogramas por celda (para mediana y cuantiles aproximados)
+BINS_CUBO = 200
+
+
+# ============================================================================
+# CONSTRUCCIÓN
+# ============================================================================
+
+def extremos_por_celda(celda, valores, n_celdas, funcion, inicial):
+    resultado = np.full(n_celdas, inicial)
+    funcion.at(resultado, celda, valores)
+    return resultado
+
+
+def construir_cubo(df, bins=BINS_CUBO):
+    """
+    Construye el cubo a partir del DataFrame de filas. Retorna un dict con:
+      - celdas: DataFrame con una fila por combinación observada de las
+        dimensiones, su conteo 'n' y por métrica '<m>_n', '<m>_suma',
+        '<m>_suma2', '<m>_min' y '<m>_max'
+      - histogramas: {métrica: (celda, bin, conteo, suma)} en formato
+        disperso; la suma de valores por bin permite estimar cuantiles con
+        la media del bin (exacta cuando el bin concentra un solo valor,
+        p. ej. la mediana imputada a los nulos)
+      - bordes: {métrica: bordes de los bins}
+    """
+    dimensiones = [dim for dim in DIMENSIONES_CUBO if dim in df.columns]
+    metricas = [m for m in METRICAS_CUBO if m in df.columns]
+
+    grupos = df.groupby(dimensiones, observed=True, dropna=False, sort=False)
+    celda = grupos.ngroup().to_numpy()
+    n_celdas = int(celda.max()) + 1 if len(celda) else 0
+
+    # Valores de las dimensiones: los de la primera fila de cada celda
+    _, primera_fila = np.unique(celda, return_index=True)
+    celdas = df[dimensiones].iloc[primera_fila].reset_index(drop=True)
+    celdas['n'] = np.bincount(celda, minlength=n_celdas)
+
+    histogramas = {}
+    bordes = {}
+    for m in metricas:
+        valores = df[m].to_numpy(dtype='float64', na_value=np.nan)
+        validos = ~np.isnan(valores)
+        c, x = celda[validos], valores[validos]
+        celdas[f'{m}_n'] = np.bincount(c, minlength=n_celdas)
+        celdas[f'{m}_suma'] = np.bincount(c, weights=x, minlength=n_celdas)
+        celdas[f'{m}_suma2'] = np.bincount(c, weights=x * x, minlength=n_celdas)
+        celdas[f'{m}_min'] = extremos_por_celda(c, x, n_celdas, np.minimum, np.inf)
+        celdas[f'{m}_max'] = extremos_por_celda(c, x, n_celdas, np.maximum, -np.inf)
+
+        # Histograma disperso: solo los pares (celda, bin) con filas
+        bordes[m] = np.linspace(x.min(), x.max(), bins + 1) if len(x) else np.linspace(0, 1, bins + 1)
+        indice_bin = np.clip(np.searchsorted(bordes[m], x, side='right') - 1, 0, bins - 1)
+        claves, inversa, conteos = np.unique(c.astype('int64') * bins + indice_bin,
+                                             return_inverse=True, return_counts=True)
+        sumas = np.bincount(inversa, weights=x, minlength=len(claves))
+        histogramas[m] = (claves // bins, claves % bins, conteos, sumas)
+
+    return {'celdas': celdas, 'histogramas': histogramas, 'bordes': bordes,
+            'dimensiones': dimensiones, 'metricas': metricas}
+
+
+# ============================================================================
+# CONSULTAS
+# ============================================================================
+
+def mascara_celdas(cubo, filtros):
+    """Celdas que cumplen los filtros {dimensión: valores} (vacío = todos)."""
+    celdas = cubo['celdas']
+    mascara = np.ones(len(celdas), dtype=bool)
+    for dim, valores in filtros.items():
+        if valores and dim in celdas.columns:
+            mascara &= celdas[dim].isin(list(valores)).to_numpy()
+    return mascara
+
+
+def cuantil_histograma(conteos, sumas, q):
+    """
+    Cuantil q aproximado: media de los valores del bin que lo contiene
+    (error máximo: el ancho del bin).
+    """
+    total = conteos.sum()
+    if total == 0:
+        return np.nan
+    i = int(np.searchsorted(np.cumsum(conteos), q * total))
+    return sumas[i] / conteos[i]
+
+
+def estadisticas_metrica(cubo, m, mascara):
+    """Media, desviación, mínimo, máximo, mediana e histograma de una métrica."""
+    sub = cubo['celdas'][mascara]
+    n = sub[f'{m}_n'].sum()
+    bordes = cubo['bordes'][m]
+    celda, indice_bin, conteo, suma = cubo['histogramas'][m]
+    dentro = mascara[celda]
+    histograma = np.bincount(indice_bin[dentro], weights=conteo[dentro], minlength=len(bordes) - 1)
+    sumas_bin = np.bincount(indice_bin[dentro], weights=suma[dentro], minlength=len(bordes) - 1)
+
+    if n == 0:
+        return {'n': 0, 'media': np.nan, 'desviacion': np.nan, 'minimo': np.nan,
+                'maximo': np.nan, 'mediana': np.nan, 'histograma': histograma, 'bordes': bordes}
+    media = sub[f'{m}_suma'].sum() / n
+    varianza = max(sub[f'{m}_suma2'].sum() / n - media**2, 0.0)
+    return {
+        'n': int(n),
+        'media': media,
+        'desviacion': np.sqrt(varianza * n / (n - 1)) if n > 1 else 0.0,
+        'minimo': sub[f'{m}_min'].min(),
+        'maximo': sub[f'{m}_max'].max(),
+        'mediana': cuantil_histograma(histograma, sumas_bin, 0.5),
+        'histograma': histograma,
+        'bordes': bordes,
+    }
+
+
+def consultar(cubo, filtros):
+    """
+    Agregados del dashboard para una combinación de filtros:
+      - total y severidad_media
+      - conteos: {dimensión: Series ordenada de mayor a menor, como value_counts}
+      - severidad_por_clima: severidad media por weather_condition
+      - metricas: {métrica: estadisticas_metrica}
+    """
+    mascara = mascara_celdas(cubo, filtros)
+    sub = cubo['celdas'][mascara]
+    total = int(sub['n'].sum())
+
+    conteos = {}
+    for dim in cubo['dimensiones']:
+        serie = sub.groupby(dim, observed=True)['n'].sum()
+        conteos[dim] = serie[serie > 0].sort_values(ascending=False, kind='stable')
+
+    resultado = {'total': total, 'conteos': conteos, 'severidad_media': np.nan,
+                 'severidad_por_clima': pd.Series(dtype='float64')}
+    if 'severity' in sub.columns and total:
+        peso = sub['severity'].astype('float64') * sub['n']
+        resultado['severidad_media'] = peso.sum() / total
+        if 'weather_condition' in sub.columns:
+            por_clima = pd.DataFrame({'clima': sub['weather_condition'], 'peso': peso, 'n': sub['n']})
+            sumas = por_clima.groupby('clima', observed=True)[['peso', 'n']].sum()
+            resultado['severidad_por_clima'] = sumas['peso'] / sumas['n']
+
+    resultado['metricas'] = {m: estadisticas_metrica(cubo, m, mascara) for m in cubo['metricas']}
+    return resultado
+
+
+def clave_filtros(filtros):
+    """Clave hashable y estable de {dimensión: selección} para la caché."""
+    return tuple(sorted((dim, tuple(valores)) for dim, valores in filtros.items() if valores))
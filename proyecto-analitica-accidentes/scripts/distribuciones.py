@@ -0,0 +1,79 @@
+"""
+Resúmenes de distribución calculados en el servidor
+Histograma con bordes fijos y estadísticas de boxplot (cuartiles, bigotes de
+Tukey y una muestra acotada de atípicos) con NumPy, para que los gráficos
+reciban solo el resumen y no cada fila: el tamaño no depende del número de
+registros.
+"""
+
+import numpy as np
+
+# Bins del histograma (igual que el nbins=50 anterior de Plotly)
+BINS_HISTOGRAMA = 50
+
+# Máximo de atípicos que se dibujan en un boxplot
+MAX_ATIPICOS = 200
+
+# Factor de los bigotes de Tukey: Q1 - 1.5·IQR y Q3 + 1.5·IQR
+FACTOR_BIGOTES = 1.5
+
+
+def valores_validos(serie):
+    """Valores de la serie como float64 sin nulos."""
+    valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+    return valores[~np.isnan(valores)]
+
+
+def histograma(valores, bins=BINS_HISTOGRAMA):
+    """Retorna (bordes, conteos) de un histograma de `bins` intervalos iguales."""
+    if len(valores) == 0:
+        return np.linspace(0, 1, bins + 1), np.zeros(bins, dtype='int64')
+    conteos, bordes = np.histogram(valores, bins=bins)
+    return bordes, conteos
+
+
+def estadisticas_caja(valores, max_atipicos=MAX_ATIPICOS, semilla=0):
+    """
+    Estadísticas de boxplot: q1, mediana, q3, media, bigotes (el valor más
+    extremo dentro de 1.5·IQR), n_atipicos y atipicos. Si hay más de
+    `max_atipicos` se toma una muestra fija (misma semilla en cada rerun)
+    que conserva siempre el mínimo y el máximo.
+    """
+    if len(valores) == 0:
+        return None
+    # Cuantiles con interpolación lineal, el mismo método por defecto de Plotly
+    q1, mediana, q3 = np.quantile(valores, [0.25, 0.5, 0.75])
+    rango = q3 - q1
+    limite_inf = q1 - FACTOR_BIGOTES * rango
+    limite_sup = q3 + FACTOR_BIGOTES * rango
+
+    dentro = (valores >= limite_inf) & (valores <= limite_sup)
+    atipicos = valores[~dentro]
+    n_atipicos = len(atipicos)
+    if n_atipicos > max_atipicos:
+        rng = np.random.default_rng(semilla)
+        muestra = rng.choice(n_atipicos, size=max_atipicos - 2, replace=False)
+        atipicos = np.concatenate([[atipicos.min(), atipicos.max()], atipicos[muestra]])
+
+    return {
+        'n': len(valores),
+        'q1': q1,
+        'mediana': mediana,
+        'q3': q3,
+        'media': valores.mean(),
+        'bigote_inf': valores[dentro].min(),
+        'bigote_sup': valores[dentro].max(),
+        'n_atipicos': n_atipicos,
+        'atipicos': np.sort(atipicos),
+    }
+
+
+def resumir_distribucion(serie, bins=BINS_HISTOGRAMA, max_atipicos=MAX_ATIPICOS):
+    """Histograma y estadísticas de boxplot de una columna numérica."""
+    valores = valores_validos(serie)
+    bordes, conteos = histograma(valores, bins)
+    return {
+        'bordes': bordes,
+        'conteos': conteos,
+        'caja': estadisticas_caja(valores, max_atipicos),
+    }
@@ -0,0 +1,300 @@
+"""
+Entrada del ETL: uno o varios CSV, comprimidos o no
+--entrada acepta un archivo, un directorio o un patrón glob. Se ingieren
+.csv, .csv.gz y .zip (cada miembro .csv del ZIP, en orden alfabético)
+leyéndolos en streaming, sin extraerlos a disco, siempre en el mismo orden
+(alfabético por ruta). Con varios hilos, un pool acotado descomprime y
+parsea por adelantado los archivos siguientes mientras el ETL procesa el
+actual (zlib y el parser C de pandas liberan el GIL); cada archivo deja
+como mucho BLOQUES_EN_COLA bloques en memoria y los bloques llegan en el
+orden de los archivos, así que las dos pasadas del modo streaming ven la
+misma secuencia.
+Cada archivo es un dict que además registra, por pasada, filas leídas,
+segundos de lectura (descompresión y parseo) y el error si no se pudo leer:
+un archivo con error se omite y el resto de la ingesta continúa.
+"""
+
+import glob
+import gzip
+import os
+import queue
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+
+import pandas as pd
+
+EXTENSIONES = ('.csv', '.csv.gz', '.zip')
+
+# Bloques ya parseados que cada archivo puede tener en espera
+BLOQUES_EN_COLA = 2
+
+# Fin de archivo en la cola de un lector
+_FIN = object()
+
+
+# ============================================================================
+# ARCHIVOS
+# ============================================================================
+
+def tipo_archivo(ruta):
+    nombre = ruta.lower()
+    if nombre.endswith('.csv.gz'):
+        return 'gz'
+    if nombre.endswith('.zip'):
+        return 'zip'
+    return 'csv'
+
+
+def listar_archivos(entrada):
+    """Rutas de `entrada` (archivo, directorio o glob) con extensión soportada, ordenadas."""
+    if os.path.isdir(entrada):
+        rutas = [os.path.join(entrada, nombre) for nombre in os.listdir(entrada)]
+    elif glob.has_magic(entrada):
+        rutas = glob.glob(entrada, recursive=True)
+    else:
+        return [entrada] if os.path.isfile(entrada) else []
+    return sorted(ruta for ruta in rutas
+                  if os.path.isfile(ruta) and ruta.lower().endswith(EXTENSIONES))
+
+
+def abrir_entrada(entrada, hilos=1):
+    """
+    Describe la entrada: {'patron', 'hilos', 'archivos': [{'ruta', 'nombre',
+    'tipo', 'bytes', 'desde'}]}. 'desde' es el byte donde empezar a leer
+    (solo CSV sin comprimir, modo incremental).
+    """
+    archivos = [{
+        'ruta': ruta,
+        'nombre': os.path.basename(ruta),
+        'tipo': tipo_archivo(ruta),
+        'bytes': os.path.getsize(ruta),
+        'desde': 0,
+    } for ruta in listar_archivos(entrada)]
+    return {'patron': entrada, 'hilos': max(1, hilos), 'archivos': archivos}
+
+
+def miembros_zip(ruta):
+    with zipfile.ZipFile(ruta) as archivo_zip:
+        return sorted(nombre for nombre in archivo_zip.namelist()
+                      if nombre.lower().endswith('.csv') and not nombre.startswith('__MACOSX/'))
+
+
+@contextmanager
+def abrir_miembro(archivo, miembro=None):
+    """Flujo binario del archivo (descomprimido al vuelo si es .gz o .zip)."""
+    if archivo['tipo'] == 'gz':
+        with gzip.open(archivo['ruta'], 'rb') as flujo:
+            yield flujo
+    elif archivo['tipo'] == 'zip':
+        with zipfile.ZipFile(archivo['ruta']) as archivo_zip, archivo_zip.open(miembro) as flujo:
+            yield flujo
+    else:
+        with open(archivo['ruta'], 'rb') as flujo:
+            yield flujo
+
+
+def miembros(archivo):
+    """Partes a leer de un archivo: los CSV de un ZIP o el archivo mismo (None)."""
+    if archivo['tipo'] == 'zip':
+        nombres = miembros_zip(archivo['ruta'])
+        if not nombres:
+            raise ValueError("el ZIP no contiene archivos .csv")
+        return nombres
+    return [None]
+
+
+def leer_encabezado(archivo, miembro=None):
+    with abrir_miembro(archivo, miembro) as flujo:
+        return list(pd.read_csv(flujo, nrows=0).columns)
+
+
+def encabezado_entrada(entrada):
+    """Encabezado del primer archivo legible: define las columnas de toda la entrada."""
+    errores = []
+    for archivo in entrada['archivos']:
+        try:
+            return leer_encabezado(archivo, miembros(archivo)[0])
+        except Exception as e:
+            errores.append(f"{archivo['nombre']}: {e}")
+    raise ValueError("ningún archivo de entrada es legible (" + '; '.join(errores) + ")")
+
+
+# ============================================================================
+# LECTURA
+# ============================================================================
+
+def leer_archivo(archivo, encabezado, nrows=None, chunksize=None, lectura=None):
+    """
+    Genera los bloques de un archivo (un único DataFrame por miembro si no
+    hay chunksize), con a lo sumo `nrows` filas por miembro. Cada miembro
+    debe tener el `encabezado` de la entrada. Con archivo['desde'] > 0 un
+    CSV sin comprimir se lee desde ese byte (inicio de línea).
+    """
+    lectura = lectura or {}
+    for miembro in miembros(archivo):
+        propio = leer_encabezado(archivo, miembro)
+        if propio != encabezado:
+            raise ValueError(f"encabezado distinto al del primer archivo ({len(propio)} columnas)")
+        with abrir_miembro(archivo, miembro) as flujo:
+            opciones = dict(nrows=nrows, chunksize=chunksize, low_memory=False, **lectura)
+            if archivo['desde']:
+                flujo.seek(archivo['desde'])
+                opciones.update(header=None, names=encabezado)
+            resultado = pd.read_csv(flujo, **opciones)
+            if chunksize is None:
+                yield resultado
+            else:
+                with resultado as lector:
+                    yield from lector
+
+
+def leer_medido(archivo, bloques):
+    """Recorre `bloques` acumulando en el archivo filas, segundos de lectura y error."""
+    archivo.update(filas=0, segundos=0.0, error=None)
+    while True:
+        inicio = time.perf_counter()
+        try:
+            bloque = next(bloques)
+        except StopIteration:
+            return
+        except Exception as e:
+            archivo['error'] = f"{type(e).__name__}: {e}"
+            return
+        finally:
+            archivo['segundos'] += time.perf_counter() - inicio
+        archivo['filas'] += len(bloque)
+        yield bloque
+
+
+def _poner(cola, elemento, cancelado):
+    """Espera lugar en la cola; False si la lectura se canceló mientras tanto."""
+    while not cancelado.is_set():
+        try:
+            cola.put(elemento, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _producir(archivo, bloques, cola, cancelado):
+    """Hilo lector: pasa los bloques de un archivo a su cola acotada."""
+    for bloque in leer_medido(archivo, bloques):
+        if not _poner(cola, bloque, cancelado):
+            return
+    _poner(cola, _FIN, cancelado)
+
+
+def _consumir(cola):
+    while True:
+        bloque = cola.get()
+        if bloque is _FIN:
+            return
+        yield bloque
+
+
+def leer_bloques_entrada(entrada, nrows=None, chunksize=None, lectura=None):
+    """
+    Bloques de todos los archivos de la entrada, en orden, con a lo sumo
+    `nrows` filas en total. Con entrada['hilos'] > 1 los archivos
+    siguientes se leen por adelantado, como mucho `hilos` a la vez.
+    """
+    archivos = entrada['archivos']
+    encabezado = encabezado_entrada(entrada)
+    for archivo in archivos:
+        # Con nrows el archivo puede quedar a medio leer: sin MB/s
+        archivo.update(filas=None, segundos=None, error=None, completo=nrows is None)
+
+    def bloques_de(archivo):
+        return leer_archivo(archivo, encabezado, nrows, chunksize, lectura)
+
+    if entrada['hilos'] <= 1:
+        fuentes = (leer_medido(archivo, bloques_de(archivo)) for archivo in archivos)
+        yield from _limitar((bloque for fuente in fuentes for bloque in fuente), nrows)
+        return
+
+    cancelado = threading.Event()
+    hilos = []
+    colas = []
+
+    def lanzar(i):
+        cola = queue.Queue(maxsize=BLOQUES_EN_COLA)
+        hilo = threading.Thread(target=_producir, args=(archivos[i], bloques_de(archivos[i]), cola, cancelado),
+                                daemon=True)
+        hilo.start()
+        hilos.append(hilo)
+        colas.append(cola)
+
+    def en_orden():
+        for i in range(len(archivos)):
+            # El archivo i y los hilos - 1 siguientes se leen a la vez
+            while len(colas) < min(len(archivos), i + entrada['hilos']):
+                lanzar(len(colas))
+            yield from _consumir(colas[i])
+
+    try:
+        yield from _limitar(en_orden(), nrows)
+    finally:
+        cancelado.set()
+        for hilo in hilos:
+            hilo.join()
+
+
+def _limitar(bloques, nrows):
+    """Corta la secuencia de bloques al llegar a `nrows` filas."""
+    restantes = nrows
+    for bloque in bloques:
+        if restantes is not None:
+            bloque = bloque.iloc[:restantes]
+            restantes -= len(bloque)
+        yield bloque
+        if restantes is not None and restantes <= 0:
+            return
+
+
+# ============================================================================
+# REPORTE
+# ============================================================================
+
+def estadisticas_archivos(entrada):
+    """Por archivo: nombre, tipo, MB, filas, segundos, filas/s, MB/s y error."""
+    resultado = []
+    for archivo in entrada['archivos']:
+        segundos = archivo.get('segundos')
+        filas = archivo.get('filas')
+        mb = archivo['bytes'] / 1024**2
+        resultado.append({
+            'archivo': archivo['nombre'],
+            'tipo': archivo['tipo'],
+            'mb': round(mb, 2),
+            'filas': filas,
+            'segundos': None if segundos is None else round(segundos, 4),
+            'filas_por_segundo': round(filas / segundos, 1) if filas and segundos else None,
+            'mb_por_segundo': round(mb / segundos, 2) if filas and segundos and archivo['completo'] else None,
+            'error': archivo.get('error'),
+        })
+    return resultado
+
+
+def reportar_archivos(entrada):
+    estadisticas = estadisticas_archivos(entrada)
+    leidos = [e for e in estadisticas if e['filas'] is not None]
+    errores = [e for e in estadisticas if e['error']]
+    hilos = f", {entrada['hilos']} hilos de lectura" if entrada['hilos'] > 1 else ''
+    print(f"\n📁 Archivos de entrada: {len(estadisticas)}{hilos}")
+    print(f"   {'Archivo':<36} {'Tipo':>4} {'MB':>9} {'Filas':>11} {'Seg.':>7} {'Filas/s':>10} {'MB/s':>7}")
+    for e in leidos:
+        filas_s = '-' if e['filas_por_segundo'] is None else f"{e['filas_por_segundo']:,.0f}"
+        mb_s = '-' if e['mb_por_segundo'] is None else f"{e['mb_por_segundo']:.1f}"
+        print(f"   {e['archivo'][:36]:<36} {e['tipo']:>4} {e['mb']:>9.2f} {e['filas']:>11,} "
+              f"{e['segundos']:>7.2f} {filas_s:>10} {mb_s:>7}" + ('  ❌' if e['error'] else ''))
+    sin_leer = len(estadisticas) - len(leidos)
+    if sin_leer:
+        print(f"   ({sin_leer} archivos sin leer: se alcanzó el límite de filas)")
+    if errores:
+        print(f"   ⚠️  {len(errores)} archivos con error (omitidos):")
+        for e in errores:
+            print(f"      - {e['archivo']}: {e['error']}")
+    return estadisticas
@@ -0,0 +1,129 @@
+"""
+Esquema compacto de tipos para el dataset enriquecido
+Define una sola vez el tipo más ajustado de cada columna (category,
+int8/int16, float32) y lo aplican el ETL, generar_graficos.py y el
+dashboard para reducir la memoria de los DataFrames.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Tipos explícitos de las columnas conocidas
+ESQUEMA = {
+    # Enteros de rango pequeño
+    'severity': 'int8',
+    'anio': 'int16',
+    'mes': 'int8',
+    'dia': 'int8',
+    'hora': 'int8',
+    'trimestre': 'int8',
+    # Medidas con 1-2 decimales en origen: float32 basta para análisis
+    'temperature_f': 'float32',
+    'visibility_mi': 'float32',
+    # Texto con pocos valores distintos
+    'city': 'category',
+    'state': 'category',
+    'weather_condition': 'category',
+    'mes_nombre': 'category',
+    'dia_semana': 'category',
+    'country': 'category',
+    'road_type': 'category',
+    'categoria_visibilidad': 'category',
+    'categoria_temperatura': 'category',
+    # Fechas (datetime.date): a lo sumo unos cientos de días distintos
+    'fecha': 'category',
+}
+
+# Columnas de texto fuera del esquema: category si la fracción de valores
+# distintos es menor que este umbral
+UMBRAL_CATEGORIA = 0.5
+
+# Equivalentes con nulos (pandas nullable) de los enteros del esquema
+ENTEROS_NULABLES = {'int8': 'Int8', 'int16': 'Int16', 'int32': 'Int32'}
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def es_texto(serie):
+    if serie.dtype == object:
+        return pd.api.types.infer_dtype(serie, skipna=True) == 'string'
+    return pd.api.types.is_string_dtype(serie)
+
+
+def entero_cabe(serie, tipo):
+    """True si los valores (sin nulos, todos enteros) caben en `tipo`."""
+    valores = serie.dropna()
+    if valores.empty:
+        return True
+    if pd.api.types.is_float_dtype(valores) and not np.all(np.mod(valores, 1) == 0):
+        return False
+    limites = np.iinfo(tipo)
+    return limites.min <= valores.min() and valores.max() <= limites.max
+
+
+def tipo_compacto(serie, nombre, precision_completa=False):
+    """
+    Tipo al que convertir `serie` (None si se deja como está).
+
+    Con precision_completa=True solo se aplican conversiones sin pérdida y
+    que no cambian cómo se escriben los valores: se conservan float64 y las
+    columnas enteras con nulos (que pandas guarda como float).
+    """
+    tipo = ESQUEMA.get(nombre)
+    if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(serie):
+        return None
+
+    if tipo == 'category' or (tipo is None and es_texto(serie)):
+        if tipo is None and serie.nunique() >= UMBRAL_CATEGORIA * len(serie):
+            return None
+        return 'category'
+
+    if tipo in ENTEROS_NULABLES:
+        if not pd.api.types.is_numeric_dtype(serie) or not entero_cabe(serie, tipo):
+            return None
+        if serie.isna().any():
+            return None if precision_completa else ENTEROS_NULABLES[tipo]
+        return tipo
+
+    if tipo == 'float32' or (tipo is None and pd.api.types.is_float_dtype(serie)):
+        if precision_completa or not pd.api.types.is_numeric_dtype(serie):
+            return None
+        return 'float32'
+
+    if tipo is None and pd.api.types.is_integer_dtype(serie) and serie.dtype.kind in 'iu':
+        for candidato in ('int8', 'int16', 'int32'):
+            if entero_cabe(serie, candidato):
+                return candidato if candidato != serie.dtype else None
+    return None
+
+
+def compactar(df, precision_completa=False):
+    """
+    Convierte cada columna de df a su tipo compacto (ver ESQUEMA) y
+    retorna el DataFrame. Columnas fuera del esquema: texto repetitivo →
+    category, enteros → el menor intN que los contiene, float64 → float32.
+    """
+    for col in df.columns:
+        tipo = tipo_compacto(df[col], col, precision_completa)
+        if tipo is not None and tipo != df[col].dtype:
+            df[col] = df[col].astype(tipo)
+    return df
+
+
+def compactar_tabla(tabla, precision_completa=False):
+    """
+    DataFrame compacto a partir de una tabla Arrow, columna por columna:
+    solo una columna con su tipo original existe a la vez, en vez del
+    DataFrame completo sin compactar. Retorna (df, MB que habría ocupado
+    sin compactar).
+    """
+    columnas = {}
+    memoria_original = 0.0
+    for nombre in tabla.column_names:
+        serie = tabla.column(nombre).to_pandas().rename(nombre)
+        memoria_original += serie.memory_usage(deep=True, index=False) / 1024**2
+        tipo = tipo_compacto(serie, nombre, precision_completa)
+        columnas[nombre] = serie if tipo is None or tipo == serie.dtype else serie.astype(tipo)
+    return pd.DataFrame(columnas, copy=False), memoria_original
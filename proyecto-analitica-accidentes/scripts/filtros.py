@@ -0,0 +1,137 @@
+"""
+Motor de filtros del dashboard basado en índices de posiciones
+Al cargar los datos se construye, para cada columna de filtro, un índice
+invertido: los códigos de cada fila y, por valor, el arreglo ordenado de
+posiciones donde aparece (formato CSR: un solo arreglo y sus offsets).
+Filtrar ya no recorre ni copia el DataFrame: se parte de las posiciones de
+la columna más selectiva y se descartan las que no cumplen las demás con
+una tabla de búsqueda por código. Solo se extraen después las columnas
+que se necesitan, en esas posiciones.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from cubo import clave_filtros
+
+COLUMNAS_FILTRO = ['anio', 'city', 'severity']
+
+# Combinaciones de filtros memorizadas
+TAMANO_CACHE = 64
+
+
+def solo_lectura(arreglo):
+    """
+    Marca un arreglo como de solo lectura: el índice y las posiciones
+    memorizadas se comparten entre sesiones del dashboard, y escribir en
+    ellos por error lanza ValueError en vez de alterar las demás.
+    """
+    if arreglo is not None:
+        arreglo.flags.writeable = False
+    return arreglo
+
+
+def indexar_columna(serie):
+    """
+    Índice de una columna: codigos (int32 por fila), valores únicos y su
+    mapa valor → código, posiciones de las filas agrupadas por código
+    (ordenadas dentro de cada grupo) e inicios (offset de cada código en
+    posiciones).
+    """
+    codigos, valores = pd.factorize(serie, sort=True)
+    codigos = codigos.astype('int32')
+    # argsort estable: las posiciones de cada valor quedan en orden creciente
+    posiciones = np.argsort(codigos, kind='stable').astype('int32')
+    conteos = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+    inicios = np.zeros(len(valores) + 1, dtype='int64')
+    np.cumsum(conteos, out=inicios[1:])
+    # Los nulos (código -1) quedan al principio del argsort: se saltan
+    posiciones = posiciones[len(codigos) - inicios[-1]:]
+    return {
+        'codigos': solo_lectura(codigos),
+        'valores': valores,
+        # dict en vez de Index.get_indexer: sin su costo fijo por llamada
+        'codigo_de': {valor: i for i, valor in enumerate(pd.Index(valores).tolist())},
+        'posiciones': solo_lectura(posiciones),
+        'inicios': solo_lectura(inicios),
+    }
+
+
+def construir_indice(df, columnas=COLUMNAS_FILTRO):
+    """Índices de las columnas de filtro presentes en df."""
+    return {
+        'filas': len(df),
+        'columnas': {col: indexar_columna(df[col]) for col in columnas if col in df.columns},
+    }
+
+
+def codigos_seleccion(indice_columna, seleccion):
+    """Códigos de los valores seleccionados (se ignoran los inexistentes)."""
+    codigo_de = indice_columna['codigo_de']
+    return np.unique(np.array([codigo_de[v] for v in seleccion if v in codigo_de], dtype='int64'))
+
+
+def filtrar_posiciones(indice, filtros):
+    """
+    Posiciones (int32) de las filas que cumplen los filtros {columna:
+    valores}, o None si ningún filtro restringe (todas las filas). Quedan
+    agrupadas por valor de la columna más selectiva y en orden creciente
+    dentro de cada grupo; no se reordenan porque las distribuciones no
+    dependen del orden. Una selección vacía o que incluye todos los
+    valores no filtra.
+    """
+    restricciones = []
+    for col, seleccion in filtros.items():
+        indice_columna = indice['columnas'].get(col)
+        if not seleccion or indice_columna is None:
+            continue
+        codigos = codigos_seleccion(indice_columna, seleccion)
+        if len(codigos) == len(indice_columna['valores']) and indice_columna['inicios'][-1] == indice['filas']:
+            continue
+        inicios = indice_columna['inicios']
+        filas = int((inicios[codigos + 1] - inicios[codigos]).sum())
+        restricciones.append((filas, col, codigos))
+
+    if not restricciones:
+        return None
+
+    # Se parte de la columna más selectiva: sus posiciones ya están indexadas
+    restricciones.sort(key=lambda r: r[0])
+    _, col, codigos = restricciones[0]
+    indice_columna = indice['columnas'][col]
+    inicios, todas = indice_columna['inicios'], indice_columna['posiciones']
+    posiciones = np.concatenate([todas[inicios[c]:inicios[c + 1]] for c in codigos]) \
+        if len(codigos) else np.empty(0, dtype='int32')
+
+    # Las demás columnas solo descartan: tabla de búsqueda por código
+    for _, col, codigos in restricciones[1:]:
+        indice_columna = indice['columnas'][col]
+        permitido = np.zeros(len(indice_columna['valores']) + 1, dtype=bool)
+        permitido[codigos] = True  # el índice -1 (nulo) cae en el último, False
+        posiciones = posiciones[permitido[indice_columna['codigos'][posiciones]]]
+    return posiciones
+
+
+def valores_filtrados(df, columna, posiciones):
+    """Serie de `columna` en las posiciones filtradas (sin copiar el resto del DataFrame)."""
+    if posiciones is None:
+        return df[columna]
+    return pd.Series(df[columna].to_numpy()[posiciones], name=columna)
+
+
+def crear_filtro(indice, tamano_cache=TAMANO_CACHE):
+    """
+    Retorna filtrar(filtros) memorizada con una caché LRU acotada. Las
+    posiciones devueltas se comparten entre llamadas (de solo lectura).
+    """
+    @lru_cache(maxsize=tamano_cache)
+    def filtrar_clave(clave):
+        return solo_lectura(filtrar_posiciones(indice, dict(clave)))
+
+    def filtrar(filtros):
+        return filtrar_clave(clave_filtros(filtros))
+
+    filtrar.cache_info = filtrar_clave.cache_info
+    return filtrar
@@ -0,0 +1,174 @@
+"""
+Fuentes de datos intercambiables del dashboard y de los gráficos
+Cada fuente responde las mismas consultas con un motor distinto:
+  - memoria: dataset cargado en pandas, cubo de agregados e índice de filtros
+  - sqlite:  SQL parametrizado sobre proyecto.db (solo lectura)
+  - duckdb:  DuckDB sobre las exportaciones Parquet/Arrow/CSV, sin cargarlas
+Una fuente es un dict con nombre, descripcion, columnas,
+mediana_aproximada y dos funciones memorizadas:
+  - consultar(filtros): agregados con la forma de cubo.consultar
+  - distribucion(columna, filtros): histograma y boxplot con la forma de
+    distribuciones.resumir_distribucion
+Con aproximado=True la fuente sqlite responde las consultas que solo
+filtran por año con los sketches de proyecto.db (aproximados.py), sin
+leer filas; el resultado trae 'aproximado': True y 'distintos'. La
+fuente memoria da medianas exactas sobre las filas filtradas, salvo con
+aproximado=True, que usa las del histograma del cubo.
+Los módulos de cada motor (pandas, sqlite3, duckdb) se importan al abrir
+la fuente que los usa: importar este módulo no carga ninguno.
+"""
+
+import os
+from functools import lru_cache
+
+from columnar import DATA_DIR, salida_vigente
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'db', 'proyecto.db')
+
+FUENTES = ['memoria', 'sqlite', 'duckdb']
+
+# Combinaciones de filtros memorizadas por función (0 = sin caché)
+TAMANO_CACHE = 256
+
+
+def memorizar(funcion, tamano_cache=TAMANO_CACHE):
+    """
+    funcion(*args, filtros) memorizada con una caché LRU acotada por
+    (args, filtros). Los resultados se comparten: no deben modificarse.
+    """
+    from cubo import clave_filtros
+
+    @lru_cache(maxsize=tamano_cache)
+    def por_clave(args, clave):
+        return funcion(*args, dict(clave))
+
+    def memorizada(*args):
+        *resto, filtros = args
+        return por_clave(tuple(resto), clave_filtros(filtros))
+
+    memorizada.cache_info = por_clave.cache_info
+    return memorizada
+
+
+def fuente_memoria(data_dir=DATA_DIR, columnas=None, tamano_cache=TAMANO_CACHE, aproximado=False, **_):
+    from columnar import leer_dataset, leer_tabla
+    from esquema import compactar, compactar_tabla, memoria_mb
+    from cubo import construir_cubo, consultar
+    from distribuciones import resumir_distribucion
+    from filtros import construir_indice, crear_filtro, valores_filtrados
+
+    tabla = leer_tabla(columnas, data_dir)
+    if tabla is not None:
+        df, memoria_original = compactar_tabla(tabla)
+        del tabla
+    else:
+        df = leer_dataset(columnas, data_dir)
+        memoria_original = memoria_mb(df)
+        df = compactar(df)
+    cubo = construir_cubo(df)
+    filtrar = crear_filtro(construir_indice(df))
+
+    distribucion = memorizar(
+        lambda columna, filtros: resumir_distribucion(valores_filtrados(df, columna, filtrar(filtros))),
+        tamano_cache
+    )
+
+    def consultar_filtros(filtros):
+        resultado = consultar(cubo, filtros)
+        if not aproximado:
+            # Mediana exacta: la de la caja de la distribución de las filas
+            # filtradas (memorizada; el dashboard la pide igual para el boxplot)
+            for m, estadisticas in resultado['metricas'].items():
+                caja = distribucion(m, filtros)['caja']
+                estadisticas['mediana'] = float('nan') if caja is None else caja['mediana']
+        return resultado
+
+    return {
+        'nombre': 'memoria',
+        'descripcion': f"pandas en memoria, {memoria_original:.1f} MB → {memoria_mb(df):.1f} MB (tipos compactos)",
+        'columnas': list(df.columns),
+        'mediana_aproximada': aproximado,
+        'consultar': memorizar(consultar_filtros, tamano_cache),
+        'distribucion': distribucion,
+    }
+
+
+def fuente_sql(nombre, pool, descripcion, tamano_cache=TAMANO_CACHE, sketches=None):
+    """
+    Fuente sobre un pool de consultas_sqlite (SQLite o DuckDB). Con
+    `sketches` ({año: resumen} de aproximados.py) las consultas que solo
+    filtran por año se responden con ellos.
+    """
+    import consultas_sqlite
+
+    def consultar(filtros):
+        if sketches:
+            from aproximados import aplica, consultar_aproximado
+            if aplica(filtros):
+                return consultar_aproximado(sketches, filtros)
+        return consultas_sqlite.consultar(pool, filtros)
+
+    return {
+        'nombre': nombre,
+        'descripcion': descripcion,
+        'columnas': pool['columnas'],
+        'mediana_aproximada': False,
+        'consultar': memorizar(consultar, tamano_cache),
+        'distribucion': memorizar(
+            lambda columna, filtros: consultas_sqlite.resumir_distribucion_sql(pool, columna, filtros),
+            tamano_cache
+        ),
+        'pool': pool,
+    }
+
+
+def fuente_sqlite(db_file=DB_FILE, tamano_cache=TAMANO_CACHE, aproximado=False, **_):
+    import consultas_sqlite
+    pool = consultas_sqlite.crear_pool(db_file)
+    descripcion = f"{os.path.basename(db_file)} (SQLite, solo lectura)"
+    sketches = None
+    if aproximado:
+        from aproximados import leer_sketches
+        with consultas_sqlite.conexion(pool) as conn:
+            sketches = leer_sketches(conn)
+        if sketches:
+            descripcion += ", sketches por año"
+    return fuente_sql('sqlite', pool, descripcion, tamano_cache, sketches)
+
+
+def fuente_duckdb(data_dir=DATA_DIR, tamano_cache=TAMANO_CACHE, **_):
+    import consultas_duckdb
+    pool = consultas_duckdb.crear_pool(data_dir)
+    return fuente_sql('duckdb', pool, f"{os.path.basename(pool['ruta'])} (DuckDB, sin cargar)", tamano_cache)
+
+
+CONSTRUCTORES = {
+    'memoria': fuente_memoria,
+    'sqlite': fuente_sqlite,
+    'duckdb': fuente_duckdb,
+}
+
+
+def abrir_fuente(nombre, data_dir=DATA_DIR, db_file=DB_FILE, columnas=None, tamano_cache=TAMANO_CACHE,
+                 aproximado=False):
+    """
+    Crea la fuente `nombre`. columnas limita lo que se carga en memoria;
+    las fuentes SQL solo leen lo que pide cada consulta. aproximado cambia
+    la fuente sqlite (sketches por año) y las medianas de la fuente
+    memoria (histograma del cubo); DuckDB no lo usa.
+    """
+    if nombre not in CONSTRUCTORES:
+        raise ValueError(f"Fuente desconocida: {nombre} (opciones: {', '.join(FUENTES)})")
+    return CONSTRUCTORES[nombre](data_dir=data_dir, db_file=db_file, columnas=columnas,
+                                 tamano_cache=tamano_cache, aproximado=aproximado)
+
+
+def ruta_entrada(nombre, data_dir=DATA_DIR, db_file=DB_FILE):
+    """Archivo o directorio que lee la fuente `nombre` (sin abrirla)."""
+    if nombre == 'sqlite':
+        return db_file
+    salida = salida_vigente(data_dir)
+    if salida is not None:
+        return salida[1]
+    return os.path.join(data_dir, 'dataset_enriquecido.csv')
@@ -1,143 +1,398 @@
-"""
-Script para generar todos los gráficos del EDA
-Ejecutar: python scripts/generar_graficos.py
-"""
-
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-
-# -------------------------------------------------------------------
-# CONFIGURACIÓN DE RUTAS (ABSOLUTAS)
-# -------------------------------------------------------------------
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
-DOCS_DIR = os.path.join(BASE_DIR, '..', 'docs', 'graficos')
-
-# Crear carpeta si no existe
-os.makedirs(DOCS_DIR, exist_ok=True)
-
-# Cargar dataset enriquecido
-df = pd.read_csv(os.path.join(DATA_DIR, 'dataset_enriquecido.csv'))
-
-# Estilos
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-
-
-# Función para guardar gráficos correctamente
-def save_plot(filename):
-    plt.savefig(os.path.join(DOCS_DIR, filename), dpi=300)
-    plt.close()
-
-
-# -------------------------------------------------------------------
-# GRÁFICO 1: Severidad
-# -------------------------------------------------------------------
-
-print("Generando gráfico 1...")
-fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-severity_counts = df['severity'].value_counts().sort_index()
-axes[0].bar(severity_counts.index, severity_counts.values, color='steelblue', edgecolor='black')
-axes[0].set_title('Distribución de Severidad')
-axes[1].pie(severity_counts, labels=[f'Sev {i}' for i in severity_counts.index], autopct='%1.1f%%')
-plt.tight_layout()
-save_plot('01_severidad.png')
-print("✅ 01_severidad.png")
-
-
-# -------------------------------------------------------------------
-# GRÁFICO 2: Clima
-# -------------------------------------------------------------------
-
-print("Generando gráfico 2...")
-fig, ax = plt.subplots(figsize=(12, 6))
-top_weather = df['weather_condition'].value_counts().head(10)
-ax.barh(range(len(top_weather)), top_weather.values, color='coral')
-ax.set_yticks(range(len(top_weather)))
-ax.set_yticklabels(top_weather.index)
-ax.set_title('Top 10 Condiciones Climáticas')
-ax.invert_yaxis()
-plt.tight_layout()
-save_plot('02_clima.png')
-print("✅ 02_clima.png")
-
-
-# -------------------------------------------------------------------
-# GRÁFICO 3: Visibilidad
-# -------------------------------------------------------------------
-
-print("Generando gráfico 3...")
-fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-axes[0].hist(df['visibility_mi'].dropna(), bins=50, color='skyblue', edgecolor='black')
-axes[0].set_title('Distribución de Visibilidad')
-axes[1].boxplot(df['visibility_mi'].dropna(), vert=False)
-axes[1].set_title('Boxplot de Visibilidad')
-plt.tight_layout()
-save_plot('03_visibilidad.png')
-print("✅ 03_visibilidad.png")
-
-
-# -------------------------------------------------------------------
-# GRÁFICO 4: Ciudades
-# -------------------------------------------------------------------
-
-print("Generando gráfico 4...")
-fig, ax = plt.subplots(figsize=(12, 6))
-top_cities = df['city'].value_counts().head(15)
-ax.barh(range(len(top_cities)), top_cities.values, color='green')
-ax.set_yticks(range(len(top_cities)))
-ax.set_yticklabels(top_cities.index)
-ax.set_title('Top 15 Ciudades')
-ax.invert_yaxis()
-plt.tight_layout()
-save_plot('04_ciudades.png')
-print("✅ 04_ciudades.png")
-
-
-# -------------------------------------------------------------------
-# GRÁFICO 5: Temperatura
-# -------------------------------------------------------------------
-
-print("Generando gráfico 5...")
-fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-axes[0].hist(df['temperature_f'].dropna(), bins=50, color='orange', edgecolor='black')
-axes[0].set_title('Distribución de Temperatura')
-axes[1].boxplot(df['temperature_f'].dropna(), vert=False)
-axes[1].set_title('Boxplot de Temperatura')
-plt.tight_layout()
-save_plot('05_temperatura.png')
-print("✅ 05_temperatura.png")
-
-
-# -------------------------------------------------------------------
-# GRÁFICO 6: Temporal (Años y Meses)
-# -------------------------------------------------------------------
-
-print("Generando gráfico 6...")
-fig, axes = plt.subplots(2, 1, figsize=(12, 10))
-
-if 'anio' in df.columns:
-    anio_counts = df['anio'].value_counts().sort_index()
-    axes[0].bar(anio_counts.index, anio_counts.values, color='purple')
-    axes[0].set_title('Accidentes por Año')
-
-if 'mes' in df.columns:
-    mes_counts = df['mes'].value_counts().sort_index()
-    axes[1].plot(mes_counts.index, mes_counts.values, marker='o', color='navy')
-    axes[1].set_title('Accidentes por Mes')
-
-plt.tight_layout()
-save_plot('06_temporal.png')
-print("✅ 06_temporal.png")
-
-
-# -------------------------------------------------------------------
-# FIN
-# -------------------------------------------------------------------
-
-print("\n🎉 ¡Todos los gráficos fueron generados correctamente!")
-print(f"📁 Carpeta: {DOCS_DIR}")
+"""
+Script para generar todos los gráficos del EDA
+Ejecutar: python scripts/generar_graficos.py [--fuente memoria|sqlite|duckdb] [--jobs N]
+                                             [--etapa completo|resumen|graficos] [--forzar]
+Dos etapas:
+  1. resumen:  agrega una sola vez los datos de todos los gráficos (conteos,
+               histogramas, estadísticas de boxplot y series de año/mes) y
+               los guarda en resumen_graficos.json (pocos KB, comparable
+               entre ejecuciones con diff)
+  2. graficos: dibuja cada gráfico solo a partir de ese archivo, sin leer
+               el dataset; con --jobs N > 1 cada uno en un proceso del pool
+Ambas etapas se saltan lo que no cambió (ver cache_graficos.py): el resumen
+si la entrada tiene el mismo contenido y cada gráfico si sus datos,
+parámetros y código son los mismos que generaron el PNG actual.
+"""
+
+import argparse
+import json
+import time
+import os
+from importlib.metadata import version
+
+# pandas, matplotlib, seaborn y la fuente de datos se importan solo en la
+# etapa que los usa: una ejecución sin cambios no carga ninguno
+from fuentes import FUENTES, ruta_entrada
+from cache_graficos import (huella_archivos, huella_datos, leer_manifiesto, guardar_manifiesto,
+                            entrada_vigente, grafico_vigente, registrar_grafico)
+
+# -------------------------------------------------------------------
+# CONFIGURACIÓN DE RUTAS (ABSOLUTAS)
+# -------------------------------------------------------------------
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+DOCS_DIR = os.path.join(BASE_DIR, '..', 'docs', 'graficos')
+RESUMEN_FILE = os.path.join(DOCS_DIR, 'resumen_graficos.json')
+MANIFIESTO_FILE = os.path.join(DOCS_DIR, 'manifiesto_graficos.json')
+
+# Parámetros de dibujo (forman parte de la clave de caché de cada gráfico)
+PARAMETROS = {
+    'dpi': 300,
+    'estilo': 'seaborn-v0_8-darkgrid',
+    'paleta': 'husl',
+    'matplotlib': version('matplotlib'),
+}
+
+# Versión del formato de resumen_graficos.json
+VERSION_RESUMEN = 1
+
+# Columnas usadas por los gráficos (se lee solo esto del dataset)
+COLUMNAS_GRAFICOS = ['severity', 'weather_condition', 'visibility_mi', 'city',
+                     'temperature_f', 'anio', 'mes']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Genera los gráficos del EDA")
+    parser.add_argument('--fuente', choices=FUENTES, default='memoria',
+                        help="memoria: carga el dataset enriquecido; sqlite: consulta proyecto.db; "
+                             "duckdb: consulta las exportaciones sin cargarlas (por defecto: memoria)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Procesos para renderizar los gráficos (1 = en serie, 0 = uno por CPU). "
+                             "Por defecto: %(default)s")
+    parser.add_argument('--etapa', choices=['completo', 'resumen', 'graficos'], default='completo',
+                        help="resumen: solo escribe el archivo de resumen; graficos: solo dibuja desde "
+                             "él; completo: ambas (por defecto)")
+    parser.add_argument('--resumen', default=RESUMEN_FILE,
+                        help="Archivo JSON de resumen (por defecto: docs/graficos/resumen_graficos.json)")
+    parser.add_argument('--forzar', action='store_true',
+                        help="Regenerar el resumen y todos los gráficos aunque no hayan cambiado")
+    return parser.parse_args()
+
+
+# Función para guardar gráficos correctamente
+def save_plot(filename):
+    import matplotlib.pyplot as plt
+    plt.savefig(os.path.join(DOCS_DIR, filename), dpi=PARAMETROS['dpi'])
+    plt.close()
+
+
+# Estadísticas de distribuciones.estadisticas_caja → formato de Axes.bxp
+def estadisticas_bxp(caja):
+    return {
+        'med': caja['mediana'],
+        'q1': caja['q1'],
+        'q3': caja['q3'],
+        'whislo': caja['bigote_inf'],
+        'whishi': caja['bigote_sup'],
+        'fliers': caja['atipicos'],
+    }
+
+
+# -------------------------------------------------------------------
+# RESUMEN COMPARTIDO: todo lo que dibujan los seis gráficos
+# -------------------------------------------------------------------
+
+def preparar_resumen(fuente):
+    """
+    Conteos, histogramas y estadísticas de boxplot desde la fuente elegida.
+    Es lo único que reciben los procesos de renderizado: no viaja ninguna
+    fila del dataset.
+    """
+    agregados = fuente['consultar']({})
+    conteos = agregados['conteos']
+    return {
+        'version': VERSION_RESUMEN,
+        'fuente': fuente['nombre'],
+        'total': agregados['total'],
+        'severidad': conteos['severity'].sort_index(),
+        'clima': conteos['weather_condition'].head(10),
+        'ciudades': conteos['city'].head(15),
+        'visibilidad': fuente['distribucion']('visibility_mi', {}),
+        'temperatura': fuente['distribucion']('temperature_f', {}),
+        'anio': conteos['anio'].sort_index() if 'anio' in conteos else None,
+        'mes': conteos['mes'].sort_index() if 'mes' in conteos else None,
+    }
+
+
+def a_json(valor):
+    """
+    Convierte el resumen a tipos de JSON. Las series quedan como pares
+    [valor, conteo] en su orden (los índices numéricos no pasan a texto).
+    """
+    import numpy as np
+    import pandas as pd
+    if isinstance(valor, pd.Series):
+        return {'serie': [[k, v] for k, v in zip(valor.index.tolist(), valor.tolist())]}
+    if isinstance(valor, dict):
+        return {clave: a_json(v) for clave, v in valor.items()}
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def desde_json(valor):
+    """Inversa de a_json: series de pandas y arreglos de NumPy."""
+    import numpy as np
+    import pandas as pd
+    if isinstance(valor, dict):
+        if set(valor) == {'serie'}:
+            pares = valor['serie']
+            return pd.Series([v for _, v in pares], index=[k for k, _ in pares], dtype='int64')
+        return {clave: desde_json(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return np.array(valor)
+    return valor
+
+
+def formatear_json(valor, sangria=''):
+    """
+    JSON con un dato por línea: cada clave y cada par [valor, conteo] en la
+    suya y los arreglos numéricos en una sola, para que un diff entre
+    ejecuciones muestre exactamente qué cambió.
+    """
+    interior = sangria + '  '
+    if isinstance(valor, dict) and valor:
+        lineas = [f"{interior}{json.dumps(clave, ensure_ascii=False)}: {formatear_json(v, interior)}"
+                  for clave, v in valor.items()]
+        return '{\n' + ',\n'.join(lineas) + f'\n{sangria}}}'
+    if isinstance(valor, list) and valor and all(isinstance(v, list) for v in valor):
+        lineas = [interior + json.dumps(v, ensure_ascii=False) for v in valor]
+        return '[\n' + ',\n'.join(lineas) + f'\n{sangria}]'
+    return json.dumps(valor, ensure_ascii=False)
+
+
+def guardar_resumen(resumen, ruta):
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(formatear_json(a_json(resumen)) + '\n')
+
+
+def leer_resumen(ruta):
+    """Resumen tal como está en el JSON (sin convertir a pandas/NumPy)."""
+    with open(ruta, encoding='utf-8') as f:
+        resumen = json.load(f)
+    if resumen.get('version') != VERSION_RESUMEN:
+        raise ValueError(f"{ruta}: versión de resumen {resumen.get('version')} no soportada "
+                         f"(se espera {VERSION_RESUMEN}); regenerar con --etapa resumen")
+    return resumen
+
+
+def dibujar_distribucion(axes, distribucion, color, titulo):
+    """Histograma (desde bordes y conteos) y boxplot (desde sus estadísticas)."""
+    bordes = distribucion['bordes']
+    axes[0].hist(bordes[:-1], bins=bordes, weights=distribucion['conteos'], color=color, edgecolor='black')
+    axes[0].set_title(f'Distribución de {titulo}')
+    if distribucion['caja'] is not None:
+        axes[1].bxp([estadisticas_bxp(distribucion['caja'])], orientation='horizontal')
+    axes[1].set_title(f'Boxplot de {titulo}')
+
+
+# -------------------------------------------------------------------
+# GRÁFICO 1: Severidad
+# -------------------------------------------------------------------
+
+def grafico_severidad(axes, resumen):
+    severity_counts = resumen['severidad']
+    axes[0].bar(severity_counts.index, severity_counts.values, color='steelblue', edgecolor='black')
+    axes[0].set_title('Distribución de Severidad')
+    axes[1].pie(severity_counts, labels=[f'Sev {i}' for i in severity_counts.index], autopct='%1.1f%%')
+
+
+# -------------------------------------------------------------------
+# GRÁFICO 2: Clima
+# -------------------------------------------------------------------
+
+def grafico_clima(ax, resumen):
+    top_weather = resumen['clima']
+    ax.barh(range(len(top_weather)), top_weather.values, color='coral')
+    ax.set_yticks(range(len(top_weather)))
+    ax.set_yticklabels(top_weather.index)
+    ax.set_title('Top 10 Condiciones Climáticas')
+    ax.invert_yaxis()
+
+
+# -------------------------------------------------------------------
+# GRÁFICO 3: Visibilidad
+# -------------------------------------------------------------------
+
+def grafico_visibilidad(axes, resumen):
+    dibujar_distribucion(axes, resumen['visibilidad'], 'skyblue', 'Visibilidad')
+
+
+# -------------------------------------------------------------------
+# GRÁFICO 4: Ciudades
+# -------------------------------------------------------------------
+
+def grafico_ciudades(ax, resumen):
+    top_cities = resumen['ciudades']
+    ax.barh(range(len(top_cities)), top_cities.values, color='green')
+    ax.set_yticks(range(len(top_cities)))
+    ax.set_yticklabels(top_cities.index)
+    ax.set_title('Top 15 Ciudades')
+    ax.invert_yaxis()
+
+
+# -------------------------------------------------------------------
+# GRÁFICO 5: Temperatura
+# -------------------------------------------------------------------
+
+def grafico_temperatura(axes, resumen):
+    dibujar_distribucion(axes, resumen['temperatura'], 'orange', 'Temperatura')
+
+
+# -------------------------------------------------------------------
+# GRÁFICO 6: Temporal (Años y Meses)
+# -------------------------------------------------------------------
+
+def grafico_temporal(axes, resumen):
+    if resumen['anio'] is not None:
+        anio_counts = resumen['anio']
+        axes[0].bar(anio_counts.index, anio_counts.values, color='purple')
+        axes[0].set_title('Accidentes por Año')
+
+    if resumen['mes'] is not None:
+        mes_counts = resumen['mes']
+        axes[1].plot(mes_counts.index, mes_counts.values, marker='o', color='navy')
+        axes[1].set_title('Accidentes por Mes')
+
+
+# Archivo → (función que lo dibuja, claves del resumen que usa, argumentos de plt.subplots)
+GRAFICOS = {
+    '01_severidad.png': (grafico_severidad, ['severidad'], dict(nrows=1, ncols=2, figsize=(14, 5))),
+    '02_clima.png': (grafico_clima, ['clima'], dict(figsize=(12, 6))),
+    '03_visibilidad.png': (grafico_visibilidad, ['visibilidad'], dict(nrows=1, ncols=2, figsize=(14, 5))),
+    '04_ciudades.png': (grafico_ciudades, ['ciudades'], dict(figsize=(12, 6))),
+    '05_temperatura.png': (grafico_temperatura, ['temperatura'], dict(nrows=1, ncols=2, figsize=(14, 5))),
+    '06_temporal.png': (grafico_temporal, ['anio', 'mes'], dict(nrows=2, ncols=1, figsize=(12, 10))),
+}
+
+
+def renderizar(archivo, datos):
+    """
+    Dibuja y guarda un gráfico a partir de sus datos del resumen (en JSON).
+    Corre en el proceso principal o en un worker; matplotlib y seaborn se
+    importan aquí, la primera vez que se renderiza en el proceso.
+    """
+    inicio = time.perf_counter()
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Estilos (se aplican en cada proceso)
+    plt.style.use(PARAMETROS['estilo'])
+    sns.set_palette(PARAMETROS['paleta'])
+    funcion, _, figura = GRAFICOS[archivo]
+    _, axes = plt.subplots(**figura)
+    funcion(axes, desde_json(datos))
+    plt.tight_layout()
+    save_plot(archivo)
+    return archivo, time.perf_counter() - inicio
+
+
+def datos_grafico(archivo, resumen):
+    """Parte del resumen (en JSON) que usa un gráfico."""
+    return {clave: resumen[clave] for clave in GRAFICOS[archivo][1]}
+
+
+def clave_grafico(archivo, resumen, codigo):
+    """Clave de caché: datos del gráfico en el resumen, parámetros de dibujo y código."""
+    return huella_datos(datos_grafico(archivo, resumen), PARAMETROS, codigo)
+
+
+def etapa_resumen(args, manifiesto):
+    """
+    Etapa 1: agrega los datos de todos los gráficos y escribe el resumen.
+    Si los archivos de entrada tienen el mismo contenido que la vez
+    anterior, se reutiliza el resumen guardado sin abrir la fuente.
+    """
+    inicio = time.perf_counter()
+    ruta = ruta_entrada(args.fuente, data_dir=DATA_DIR)
+    entrada = {'fuente': args.fuente, 'ruta': os.path.abspath(ruta), 'huella': huella_archivos(ruta)}
+    if not args.forzar and entrada_vigente(manifiesto, entrada, args.resumen):
+        print(f"♻️  Entrada sin cambios ({os.path.basename(ruta)}, huella en "
+              f"{time.perf_counter() - inicio:.2f} s): se reutiliza {os.path.basename(args.resumen)}")
+        return
+
+    from fuentes import abrir_fuente
+    fuente = abrir_fuente(args.fuente, data_dir=DATA_DIR, columnas=COLUMNAS_GRAFICOS)
+    resumen = preparar_resumen(fuente)
+    guardar_resumen(resumen, args.resumen)
+    manifiesto['entrada'] = dict(entrada, huella_resumen=huella_archivos(args.resumen))
+    print(f"📦 Dataset: {resumen['total']:,} registros | fuente: {fuente['descripcion']}")
+    print(f"📊 Resumen de los gráficos en {time.perf_counter() - inicio:.2f} s: {args.resumen} "
+          f"({os.path.getsize(args.resumen) / 1024:.1f} KB)")
+
+
+def etapa_graficos(args, manifiesto):
+    """
+    Etapa 2: dibuja los gráficos solo desde el archivo de resumen. Se
+    saltan los que tienen la misma clave y el mismo PNG que en el
+    manifiesto.
+    """
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    resumen = leer_resumen(args.resumen)
+    # Cualquier cambio en este script invalida todos los gráficos
+    codigo = huella_archivos(os.path.abspath(__file__))
+
+    claves = {archivo: clave_grafico(archivo, resumen, codigo) for archivo in GRAFICOS}
+    pendientes = [
+        archivo for archivo in GRAFICOS
+        if args.forzar or not grafico_vigente(manifiesto, archivo, claves[archivo],
+                                              os.path.join(DOCS_DIR, archivo))
+    ]
+    for archivo in GRAFICOS:
+        if archivo not in pendientes:
+            print(f"♻️  {archivo} sin cambios (renderizado en "
+                  f"{manifiesto['graficos'][archivo]['segundos']:.2f} s)")
+    if not pendientes:
+        print("\n✅ Todos los gráficos están al día")
+        print(f"📁 Carpeta: {DOCS_DIR}")
+        return
+
+    modo = f"en paralelo ({jobs} procesos)" if jobs > 1 else "en serie"
+    print(f"Generando {len(pendientes)} gráficos {modo} desde {os.path.basename(args.resumen)}...")
+    inicio = time.perf_counter()
+    tiempos = []
+    from paralelo import mapear_en_orden
+    trabajos = ((archivo, datos_grafico(archivo, resumen)) for archivo in pendientes)
+    for archivo, segundos in mapear_en_orden(renderizar, trabajos,
+                                             min(jobs, len(pendientes))):
+        tiempos.append(segundos)
+        registrar_grafico(manifiesto, archivo, claves[archivo], os.path.join(DOCS_DIR, archivo), segundos)
+        print(f"✅ {archivo} ({segundos:.2f} s)")
+    renderizado = time.perf_counter() - inicio
+
+    # -------------------------------------------------------------------
+    # FIN
+    # -------------------------------------------------------------------
+
+    print("\n🎉 ¡Todos los gráficos fueron generados correctamente!")
+    print(f"⏱️  Renderizado: {renderizado:.2f} s (suma por gráfico: {sum(tiempos):.2f} s, "
+          f"el más lento: {max(tiempos):.2f} s)")
+    print(f"📁 Carpeta: {DOCS_DIR}")
+
+
+def main():
+    args = parse_args()
+
+    # Crear carpeta si no existe
+    os.makedirs(DOCS_DIR, exist_ok=True)
+
+    manifiesto = leer_manifiesto(MANIFIESTO_FILE)
+    try:
+        if args.etapa in ('completo', 'resumen'):
+            etapa_resumen(args, manifiesto)
+        if args.etapa in ('completo', 'graficos'):
+            etapa_graficos(args, manifiesto)
+    finally:
+        # Lo que se alcanzó a generar queda registrado aunque algo falle
+        guardar_manifiesto(manifiesto, MANIFIESTO_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Huellas de fila para detectar duplicados con memoria acotada
+Cada fila se reduce a un hash de 64 bits sobre su forma canónica
+(transformaciones.hash_filas, el mismo valor que se guarda como row_hash)
+y las huellas vistas se guardan en arreglos NumPy ordenados: ~8 bytes por
+fila, en vez de una copia del DataFrame o un set de Python (~60 bytes por
+elemento). El conjunto sirve entre bloques, entre archivos y, sembrado con
+los row_hash de proyecto.db, entre ejecuciones.
+Con n filas la probabilidad de que dos filas distintas compartan huella
+es ≈ n² / 2^65 (unas 3 en un millón con 10 millones de filas).
+"""
+
+import numpy as np
+
+# Un tramo se fusiona con el anterior si este no es más del doble de grande:
+# quedan O(log n) tramos y cada huella se copia O(log n) veces en total
+FACTOR_FUSION = 2
+
+
+def huellas_nuevas(ordenadas=None):
+    """
+    Conjunto de huellas: {'tramos': [arreglos int64 ordenados y sin
+    repetidos], 'n': total}. `ordenadas` lo siembra con un arreglo ya
+    ordenado y único.
+    """
+    huellas = {'tramos': [], 'n': 0}
+    if ordenadas is not None and len(ordenadas):
+        agregar(huellas, ordenadas)
+    return huellas
+
+
+def contiene(huellas, valores):
+    """Máscara de los `valores` que ya están en el conjunto."""
+    presentes = np.zeros(len(valores), dtype=bool)
+    for tramo in huellas['tramos']:
+        posicion = np.minimum(np.searchsorted(tramo, valores), len(tramo) - 1)
+        presentes |= tramo[posicion] == valores
+    return presentes
+
+
+def agregar(huellas, ordenadas):
+    """Agrega un arreglo ordenado de huellas ausentes y fusiona tramos pequeños."""
+    tramos = huellas['tramos']
+    tramos.append(ordenadas)
+    huellas['n'] += len(ordenadas)
+    while len(tramos) > 1 and len(tramos[-2]) <= FACTOR_FUSION * len(tramos[-1]):
+        ultimo = tramos.pop()
+        tramos[-1] = np.sort(np.concatenate([tramos[-1], ultimo]), kind='stable')
+    return huellas
+
+
+def registrar(huellas, valores):
+    """
+    Marca la primera aparición de cada huella que no estaba en el conjunto
+    (las repetidas dentro de `valores` o ya vistas quedan en False) y la
+    agrega. Retorna la máscara de filas a conservar.
+    """
+    valores = np.asarray(valores, dtype='int64')
+    unicas, primeras = np.unique(valores, return_index=True)
+    conservar = np.zeros(len(valores), dtype=bool)
+    conservar[primeras] = True
+    ausentes = ~contiene(huellas, unicas)
+    conservar[primeras[~ausentes]] = False
+    if ausentes.any():
+        agregar(huellas, unicas[ausentes])
+    return conservar
+
+
+def ultimas(valores):
+    """
+    Máscara de la última aparición de cada valor (en orden de `valores`):
+    entre filas con la misma clave se conserva la versión más reciente.
+
+    Un solo argsort estable: en cada grupo de valores iguales la última
+    posición ordenada es la última aparición. Sin np.unique, que copia los
+    valores y guarda además los únicos y sus índices.
+    """
+    valores = np.asarray(valores, dtype='int64')
+    conservar = np.ones(len(valores), dtype=bool)
+    if len(valores) < 2:
+        return conservar
+    orden = np.argsort(valores, kind='stable')
+    ordenados = valores[orden]
+    ultima = np.ones(len(valores), dtype=bool)
+    np.not_equal(ordenados[1:], ordenados[:-1], out=ultima[:-1])
+    del ordenados
+    conservar[orden] = ultima
+    return conservar
+
+
+def memoria_huellas_mb(huellas):
+    return sum(tramo.nbytes for tramo in huellas['tramos']) / 1024**2
@@ -0,0 +1,211 @@
+"""
+Instrumentación de create_database.py
+Cada paso y sub-paso del ETL se envuelve en `with paso('2.1', 'Duplicados')`
+y queda registrado con tiempo de pared, tiempo de CPU (del proceso y de los
+workers ya terminados), filas procesadas, filas/s y pico de memoria RSS.
+Al final se escribe un informe JSON por ejecución, que
+comparar_informes.py compara con otro para detectar regresiones.
+
+El pico de memoria es exacto por paso en Linux: antes de cada paso se
+reinicia la marca de agua del proceso (VmHWM, vía /proc/self/clear_refs) y
+los pasos que lo contienen conservan el máximo observado. En otros sistemas
+se usa el pico de toda la ejecución (ru_maxrss).
+"""
+
+import json
+import os
+import platform
+import re
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Versión del formato del informe
+VERSION_INFORME = 1
+
+# Informe de la ejecución en curso y pasos abiertos (el más interno al final)
+_informe = None
+_abiertos = []
+
+
+# ============================================================================
+# MEMORIA
+# ============================================================================
+
+def _leer_status(campo):
+    try:
+        with open('/proc/self/status') as f:
+            encontrado = re.search(rf'^{campo}:\s+(\d+) kB', f.read(), re.MULTILINE)
+    except OSError:
+        return None
+    return int(encontrado.group(1)) / 1024 if encontrado else None
+
+
+def _reiniciar_pico():
+    """Reinicia la marca de agua de RSS. Retorna False si el sistema no lo permite."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def rss_mb():
+    """RSS actual del proceso en MB (None si no se puede leer)."""
+    return _leer_status('VmRSS')
+
+
+def pico_mb():
+    """Pico de RSS desde el último reinicio (o desde el arranque) en MB."""
+    pico = _leer_status('VmHWM')
+    if pico is None and resource is not None:
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        pico = maximo / 1024**2 if sys.platform == 'darwin' else maximo / 1024
+    return pico
+
+
+def _actualizar_picos():
+    """Lleva el pico actual a todos los pasos abiertos."""
+    pico = pico_mb()
+    if pico is not None:
+        for abierto in _abiertos:
+            abierto['pico'] = max(abierto['pico'] or 0.0, pico)
+
+
+def _cpu():
+    """Segundos de CPU del proceso y de sus hijos ya esperados (workers del pool)."""
+    tiempos = os.times()
+    return tiempos.user + tiempos.system + tiempos.children_user + tiempos.children_system
+
+
+# ============================================================================
+# PASOS
+# ============================================================================
+
+def iniciar(argumentos=None, modo=None):
+    """Comienza el informe de una ejecución."""
+    global _informe
+    _informe = {
+        'version': VERSION_INFORME,
+        'inicio': datetime.now().isoformat(timespec='seconds'),
+        'modo': modo,
+        'argumentos': argumentos or {},
+        'entorno': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'pico_exacto': _reiniciar_pico(),
+        },
+        'pasos': [],
+    }
+    _abiertos.clear()
+    return _informe
+
+
+@contextmanager
+def paso(id_paso, nombre, filas=None):
+    """
+    Mide el bloque como el paso `id_paso`. Entrega el registro del paso:
+    quien llama puede fijar registro['filas'] cuando las conoce (p. ej. al
+    terminar de leer).
+    """
+    _actualizar_picos()
+    registro = {
+        'id': id_paso,
+        'nombre': nombre,
+        'padre': _abiertos[-1]['registro']['id'] if _abiertos else None,
+        'filas': filas,
+    }
+    abierto = {'registro': registro, 'pico': None}
+    _abiertos.append(abierto)
+    _reiniciar_pico()
+    cpu = _cpu()
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        segundos = time.perf_counter() - inicio
+        _actualizar_picos()
+        _abiertos.pop()
+        _registrar(registro, segundos, _cpu() - cpu, abierto['pico'])
+
+
+def registrar(id_paso, nombre, segundos, filas=None):
+    """Registra un sub-paso medido por otro módulo (solo tiempo de pared)."""
+    registro = {
+        'id': id_paso,
+        'nombre': nombre,
+        'padre': _abiertos[-1]['registro']['id'] if _abiertos else None,
+        'filas': filas,
+    }
+    _registrar(registro, segundos, None, None)
+
+
+def anotar(clave, valor):
+    """Agrega al informe un dato de la ejecución (p. ej. estadísticas por archivo)."""
+    if _informe is not None:
+        _informe[clave] = valor
+
+
+def _registrar(registro, segundos, cpu, pico):
+    filas = registro['filas']
+    rss = rss_mb() if cpu is not None else None
+    registro.update({
+        'segundos': round(segundos, 4),
+        'cpu_segundos': None if cpu is None else round(cpu, 4),
+        'filas_por_segundo': round(filas / segundos, 1) if filas and segundos > 0 else None,
+        'pico_rss_mb': None if pico is None else round(pico, 1),
+        'rss_final_mb': None if rss is None else round(rss, 1),
+    })
+    if _informe is not None:
+        _informe['pasos'].append(registro)
+
+
+# ============================================================================
+# INFORME
+# ============================================================================
+
+def finalizar(ruta, registros=None):
+    """Cierra el informe, lo escribe en `ruta` (JSON) y lo retorna."""
+    informe = _informe
+    if informe is None:
+        return None
+    informe['fin'] = datetime.now().isoformat(timespec='seconds')
+    informe['registros'] = registros
+    informe['pasos'].sort(key=lambda p: clave_orden(p['id']))
+    raiz = [p for p in informe['pasos'] if p['padre'] is None]
+    informe['segundos_total'] = round(sum(p['segundos'] for p in raiz), 4)
+    informe['pico_rss_mb'] = max((p['pico_rss_mb'] for p in raiz if p['pico_rss_mb'] is not None),
+                                 default=None)
+
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    return informe
+
+
+def clave_orden(id_paso):
+    """'2.10' va después de '2.9': orden numérico por componente."""
+    return [int(parte) if parte.isdigit() else parte for parte in re.split(r'[.\-]', id_paso)]
+
+
+def imprimir_tiempos(informe):
+    """Tabla de tiempos por paso en consola (los pasos ya vienen ordenados)."""
+    print(f"\n⏱️  TIEMPOS POR PASO:")
+    print(f"   {'Paso':<42} {'Pared (s)':>10} {'CPU (s)':>9} {'Filas/s':>12} {'Pico RSS (MB)':>14}")
+    for p in informe['pasos']:
+        sangria = '  ' if p['padre'] is not None else ''
+        cpu = '-' if p['cpu_segundos'] is None else f"{p['cpu_segundos']:.2f}"
+        filas_s = '-' if p['filas_por_segundo'] is None else f"{p['filas_por_segundo']:,.0f}"
+        pico = '-' if p['pico_rss_mb'] is None else f"{p['pico_rss_mb']:,.1f}"
+        print(f"   {sangria + p['id'] + ' ' + p['nombre']:<42} {p['segundos']:>10.2f} {cpu:>9} "
+              f"{filas_s:>12} {pico:>14}")
+    print(f"   {'Total':<42} {informe['segundos_total']:>10.2f}")
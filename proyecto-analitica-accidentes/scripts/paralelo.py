@@ -0,0 +1,64 @@
+"""
+Ejecución paralela de las transformaciones del ETL
+Reparte el dataset (o los bloques del modo streaming) en un pool de
+procesos y devuelve los resultados siempre en el orden de entrada.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from transformaciones import transformar_particion
+
+# Particiones por proceso: más de una equilibra la carga entre workers
+PARTICIONES_POR_WORKER = 2
+
+
+def mapear_en_orden(funcion, argumentos, workers, ventana=None):
+    """
+    Aplica funcion(*args) a cada tupla de `argumentos` en un pool de
+    `workers` procesos y genera los resultados en el orden de entrada.
+
+    Como mucho `ventana` tareas quedan en vuelo a la vez, de modo que la
+    memoria sigue acotada aunque `argumentos` sea un iterador de bloques.
+    Con workers <= 1 se ejecuta en serie, sin pool.
+    """
+    if workers <= 1:
+        for args in argumentos:
+            yield funcion(*args)
+        return
+
+    ventana = ventana or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pendientes = deque()
+        for args in argumentos:
+            pendientes.append(executor.submit(funcion, *args))
+            if len(pendientes) >= ventana:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+
+def particionar(df, n):
+    """Divide el DataFrame en n particiones contiguas por posición."""
+    limites = np.linspace(0, len(df), n + 1, dtype=int)
+    return [df.iloc[inicio:fin] for inicio, fin in zip(limites[:-1], limites[1:]) if fin > inicio]
+
+
+def transformar_en_paralelo(df, medianas, workers):
+    """
+    Ejecuta los pasos 2.5 y 3.1-3.2 sobre particiones del DataFrame en un
+    pool de procesos. Las medianas se calculan una sola vez fuera del pool
+    y se comparten con todas las particiones, así que el resultado es
+    idéntico al de una ejecución en serie. Retorna (df, nulos_fecha).
+    """
+    partes = particionar(df, workers * PARTICIONES_POR_WORKER)
+    resultados = list(mapear_en_orden(
+        transformar_particion,
+        ((parte, medianas) for parte in partes),
+        workers
+    ))
+    nulos_fecha = sum(nulos for _, nulos in resultados)
+    return pd.concat([parte for parte, _ in resultados]), nulos_fecha
@@ -0,0 +1,197 @@
+"""
+Tablas de resumen materializadas en proyecto.db
+Una tabla summary_<dimensión> por ciudad, clima, año, mes, hora y
+categorías de visibilidad/temperatura con total de accidentes, suma y
+promedio de severidad. Se actualizan por bloque al cargar filas, de modo
+que leerlas cuesta O(grupos) en vez de O(filas).
+"""
+
+import pandas as pd
+
+# Dimensiones materializadas (solo se crean las presentes en accidents)
+DIMENSIONES_RESUMEN = [
+    'city',
+    'weather_condition',
+    'anio',
+    'mes',
+    'hora',
+    'categoria_visibilidad',
+    'categoria_temperatura',
+]
+
+TIPOS_DIMENSION = {'anio': 'INTEGER', 'mes': 'INTEGER', 'hora': 'INTEGER'}
+
+
+def tabla_resumen(dimension):
+    return f'summary_{dimension}'
+
+
+def dimensiones_presentes(columnas):
+    return [dim for dim in DIMENSIONES_RESUMEN if dim in columnas]
+
+
+def crear_tablas_resumen(conn, columnas):
+    """(Re)crea vacías las tablas de resumen de las dimensiones presentes."""
+    for dim in dimensiones_presentes(columnas):
+        tabla = tabla_resumen(dim)
+        conn.execute(f'DROP TABLE IF EXISTS "{tabla}"')
+        conn.execute(
+            f'CREATE TABLE "{tabla}" ('
+            f'"{dim}" {TIPOS_DIMENSION.get(dim, "TEXT")}, '
+            f'total_accidents INTEGER NOT NULL, '
+            f'sum_severity INTEGER NOT NULL, '
+            f'avg_severity REAL)'
+        )
+    indexar_resumenes(conn, columnas)
+
+
+def indexar_resumenes(conn, columnas):
+    """
+    Índice único sobre la dimensión de cada tabla de resumen: es la clave
+    del ON CONFLICT de sumar_grupos. IF NOT EXISTS: también actualiza las
+    tablas de un proyecto.db anterior.
+    """
+    for dim in dimensiones_presentes(columnas):
+        tabla = tabla_resumen(dim)
+        conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "idx_{tabla}" ON "{tabla}"("{dim}")')
+
+
+def existen_tablas_resumen(conn, columnas):
+    consulta = "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'summary_%'"
+    existentes = {fila[0] for fila in conn.execute(consulta)}
+    return all(tabla_resumen(dim) in existentes for dim in dimensiones_presentes(columnas))
+
+
+def reconstruir_resumenes(conn, columnas):
+    """Recalcula todas las tablas de resumen con un GROUP BY sobre accidents."""
+    crear_tablas_resumen(conn, columnas)
+    for dim in dimensiones_presentes(columnas):
+        conn.execute(
+            f'INSERT INTO "{tabla_resumen(dim)}" '
+            f'SELECT "{dim}", COUNT(*), SUM(severity), AVG(severity) '
+            f'FROM accidents GROUP BY "{dim}"'
+        )
+    conn.commit()
+
+
+def valor_sql(valor):
+    """Valor de grupo apto para sqlite3 (NaN → NULL, tipos NumPy → Python)."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+def sumar_grupos(conn, dim, grupos, signo=1):
+    """
+    Suma (o resta con signo=-1) a summary_<dim> los totales de `grupos`,
+    iterable de (valor, total, suma_severidad), con un solo executemany de
+    INSERT ... ON CONFLICT sobre el índice único de la dimensión. NULL no
+    choca con el índice: su grupo (uno a lo sumo) se actualiza con IS NULL,
+    para que también sea uno solo, como en el GROUP BY.
+    """
+    tabla = tabla_resumen(dim)
+    filas = [(valor_sql(valor), signo * int(total), signo * int(suma)) for valor, total, suma in grupos]
+    conn.executemany(
+        f'INSERT INTO "{tabla}" VALUES (?, ?, ?, CAST(? AS REAL) / NULLIF(?, 0)) '
+        f'ON CONFLICT("{dim}") DO UPDATE SET '
+        f'total_accidents = total_accidents + excluded.total_accidents, '
+        f'sum_severity = sum_severity + excluded.sum_severity, '
+        f'avg_severity = CAST(sum_severity + excluded.sum_severity AS REAL) '
+        f'/ NULLIF(total_accidents + excluded.total_accidents, 0)',
+        [(valor, total, suma, suma, total) for valor, total, suma in filas if valor is not None]
+    )
+    for _, total, suma in (fila for fila in filas if fila[0] is None):
+        actualizadas = conn.execute(
+            f'UPDATE "{tabla}" SET total_accidents = total_accidents + ?, '
+            f'sum_severity = sum_severity + ?, '
+            f'avg_severity = CAST(sum_severity + ? AS REAL) / NULLIF(total_accidents + ?, 0) '
+            f'WHERE "{dim}" IS NULL',
+            (total, suma, suma, total)
+        ).rowcount
+        if actualizadas == 0:
+            conn.execute(f'INSERT INTO "{tabla}" VALUES (NULL, ?, ?, CAST(? AS REAL) / NULLIF(?, 0))',
+                         (total, suma, suma, total))
+    if signo < 0:
+        conn.execute(f'DELETE FROM "{tabla}" WHERE total_accidents <= 0')
+
+
+def agrupar(df, dim):
+    """(valor, total, suma_severidad) por valor de `dim` en un bloque."""
+    grupos = df.groupby(dim, dropna=False, observed=True)['severity'].agg(['size', 'sum'])
+    return grupos.itertuples(name=None)
+
+
+def acumular_bloque(conn, df):
+    """Suma a los resúmenes un bloque de filas nuevas (carga completa)."""
+    for dim in dimensiones_presentes(df.columns):
+        sumar_grupos(conn, dim, agrupar(df, dim))
+
+
+def restar_anteriores(conn, df):
+    """
+    Primera mitad del ajuste de los resúmenes para un bloque que se carga
+    con upsert, antes de escribirlo: guarda en staging_afectadas las
+    claves nuevas o modificadas y resta el aporte actual de las filas que
+    van a cambiar. Las filas sin cambios (mismo row_key y row_hash) no
+    alteran los totales.
+
+    Retorna (filas nuevas o modificadas del bloque, una por clave, cuántas
+    ya existían).
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS staging_claves (row_key INTEGER PRIMARY KEY, row_hash INTEGER)")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS staging_afectadas (row_key INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM staging_claves")
+    conn.execute("DELETE FROM staging_afectadas")
+    # Con una clave repetida en el bloque, el upsert deja la última versión
+    conn.executemany(
+        "INSERT OR REPLACE INTO staging_claves VALUES (?, ?)",
+        zip(df['row_key'].tolist(), df['row_hash'].tolist())
+    )
+    conn.execute(
+        "INSERT INTO staging_afectadas SELECT s.row_key FROM staging_claves s "
+        "LEFT JOIN accidents a ON a.row_key = s.row_key "
+        "WHERE a.row_key IS NULL OR a.row_hash IS NOT s.row_hash"
+    )
+
+    for dim in dimensiones_presentes(df.columns):
+        anteriores = conn.execute(
+            f'SELECT a."{dim}", COUNT(*), SUM(a.severity) FROM accidents a '
+            f'JOIN staging_afectadas s ON a.row_key = s.row_key GROUP BY a."{dim}"'
+        ).fetchall()
+        sumar_grupos(conn, dim, anteriores, signo=-1)
+
+    afectadas = {fila[0] for fila in conn.execute("SELECT row_key FROM staging_afectadas")}
+    cambios = df[df['row_key'].isin(afectadas)].drop_duplicates('row_key', keep='last')
+    modificadas = conn.execute(
+        "SELECT COUNT(*) FROM staging_afectadas s JOIN accidents a ON a.row_key = s.row_key"
+    ).fetchone()[0]
+    return cambios, modificadas
+
+
+def sumar_afectadas(conn, columnas):
+    """
+    Segunda mitad, después del upsert: suma el aporte de las claves de
+    staging_afectadas tal como quedaron en accidents (una fila por clave).
+    """
+    for dim in dimensiones_presentes(columnas):
+        nuevos = conn.execute(
+            f'SELECT a."{dim}", COUNT(*), SUM(a.severity) FROM accidents a '
+            f'JOIN staging_afectadas s ON a.row_key = s.row_key GROUP BY a."{dim}"'
+        ).fetchall()
+        sumar_grupos(conn, dim, nuevos)
+
+
+def leer_resumen(conn, dimension, limite=None):
+    """
+    Lee summary_<dimension> ordenada por total de accidentes (desc) y, en
+    los empates, por la dimensión, con el mismo formato que las vistas
+    accidents_by_city / accidents_by_weather. El orden no depende del modo
+    de carga y con `limite` el top N siempre tiene los mismos grupos.
+    """
+    consulta = (
+        f'SELECT "{dimension}", total_accidents, ROUND(avg_severity, 2) AS avg_severity '
+        f'FROM "{tabla_resumen(dimension)}" ORDER BY total_accidents DESC, "{dimension}"'
+    )
+    if limite:
+        consulta += f' LIMIT {int(limite)}'
+    return pd.read_sql_query(consulta, conn)
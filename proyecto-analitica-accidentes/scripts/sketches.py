@@ -0,0 +1,283 @@
+"""
+Sketches estadísticos fusionables (cuantiles, distintos y más frecuentes)
+Resúmenes de tamaño fijo que se construyen por bloque o partición, se
+fusionan sin volver a leer filas y se guardan como JSON:
+  - KLL (cuantiles): con k = 200 el rango del cuantil devuelto se aleja
+    del pedido a lo sumo ~1,7 % de n (99 % de confianza); p. ej. la mediana
+    devuelta está entre los percentiles 48,3 y 51,7. Guarda O(k log n) valores.
+  - HyperLogLog (distintos): con p = 14 (16.384 registros de 1 byte) el
+    error relativo típico es 1,04 / sqrt(2^p) ≈ 0,8 % (≈ 2,4 % a 3 sigmas);
+    hasta unos miles de valores usa conteo lineal, prácticamente exacto.
+  - Space-Saving (más frecuentes): con capacidad m, cada conteo estimado
+    es mayor o igual al real y lo supera a lo sumo en N / m (N = filas
+    sumadas); todo valor con frecuencia > N / m está en el resumen. Si hay
+    menos de m valores distintos los conteos son exactos.
+Todos son dicts con un campo 'tipo'; fusionar() y a_json()/desde_json()
+funcionan con cualquiera de ellos.
+"""
+
+import base64
+
+import numpy as np
+import pandas as pd
+
+# KLL: tamaño del compactor superior y razón entre niveles
+K_KLL = 200
+RAZON_KLL = 2 / 3
+
+# HyperLogLog: 2^P_HLL registros
+P_HLL = 14
+
+# Space-Saving: contadores por resumen
+CAPACIDAD_FRECUENTES = 256
+
+
+# ============================================================================
+# KLL (CUANTILES)
+# ============================================================================
+
+def kll_nuevo(k=K_KLL):
+    return {'tipo': 'kll', 'k': k, 'n': 0, 'minimo': np.inf, 'maximo': -np.inf,
+            'niveles': [np.empty(0)]}
+
+
+def capacidad_nivel(k, altura, nivel):
+    """Capacidad del compactor `nivel` con `altura` niveles (el superior tiene k)."""
+    return max(2, int(np.ceil(k * RAZON_KLL ** (altura - nivel - 1))))
+
+
+def kll_compactar(sketch):
+    """
+    Compacta los niveles que excedan su capacidad: ordena el nivel, deja
+    en él la mitad inferior de su capacidad y del resto (una cantidad par
+    de valores contiguos) promueve uno de cada dos, con desplazamiento
+    aleatorio, al nivel siguiente, donde cada valor pesa el doble.
+    Determinista: la semilla depende de n y del nivel.
+    """
+    niveles = sketch['niveles']
+    while True:
+        altura = len(niveles)
+        llenos = [h for h in range(altura) if len(niveles[h]) > capacidad_nivel(sketch['k'], altura, h)]
+        if not llenos:
+            return sketch
+        h = llenos[0]
+        if h + 1 == altura:
+            niveles.append(np.empty(0))
+        datos = np.sort(niveles[h])
+        compactar = (len(datos) - capacidad_nivel(sketch['k'], altura, h) // 2) // 2 * 2
+        resto, datos = datos[:len(datos) - compactar], datos[len(datos) - compactar:]
+        desplazamiento = int(np.random.default_rng([sketch['n'], h]).integers(0, 2))
+        niveles[h] = resto
+        niveles[h + 1] = np.concatenate([niveles[h + 1], datos[desplazamiento::2]])
+
+
+def kll_agregar(sketch, valores):
+    """Agrega los valores (se ignoran los NaN) y retorna el sketch."""
+    valores = np.asarray(valores, dtype='float64')
+    valores = valores[~np.isnan(valores)]
+    if len(valores) == 0:
+        return sketch
+    sketch['n'] += len(valores)
+    sketch['minimo'] = min(sketch['minimo'], float(valores.min()))
+    sketch['maximo'] = max(sketch['maximo'], float(valores.max()))
+    sketch['niveles'][0] = np.concatenate([sketch['niveles'][0], valores])
+    return kll_compactar(sketch)
+
+
+def kll_fusionar(a, b):
+    niveles = [
+        np.concatenate([a['niveles'][h] if h < len(a['niveles']) else np.empty(0),
+                        b['niveles'][h] if h < len(b['niveles']) else np.empty(0)])
+        for h in range(max(len(a['niveles']), len(b['niveles'])))
+    ]
+    fusion = {'tipo': 'kll', 'k': min(a['k'], b['k']), 'n': a['n'] + b['n'],
+              'minimo': min(a['minimo'], b['minimo']), 'maximo': max(a['maximo'], b['maximo']),
+              'niveles': niveles}
+    return kll_compactar(fusion)
+
+
+def kll_cuantiles(sketch, probabilidades):
+    """Cuantiles aproximados (el mínimo y el máximo son exactos). NaN si está vacío."""
+    if sketch['n'] == 0:
+        return [np.nan for _ in probabilidades]
+    valores = np.concatenate(sketch['niveles'])
+    pesos = np.concatenate([np.full(len(nivel), 2.0 ** h) for h, nivel in enumerate(sketch['niveles'])])
+    orden = np.argsort(valores, kind='stable')
+    valores, acumulado = valores[orden], np.cumsum(pesos[orden])
+    resultado = []
+    for p in probabilidades:
+        if p <= 0:
+            resultado.append(sketch['minimo'])
+        elif p >= 1:
+            resultado.append(sketch['maximo'])
+        else:
+            i = min(int(np.searchsorted(acumulado, p * acumulado[-1])), len(valores) - 1)
+            resultado.append(float(valores[i]))
+    return resultado
+
+
+# ============================================================================
+# HYPERLOGLOG (DISTINTOS)
+# ============================================================================
+
+def hll_nuevo(p=P_HLL):
+    return {'tipo': 'hll', 'p': p, 'registros': np.zeros(2 ** p, dtype='uint8')}
+
+
+def hashes_valores(valores):
+    """Hash de 64 bits estable entre ejecuciones (los valores se comparan como texto)."""
+    texto = pd.Series(valores).dropna().astype(str).unique()
+    return pd.util.hash_array(np.asarray(texto, dtype=object))
+
+
+def largo_bits(x):
+    """Posición del bit más alto (bit_length) de cada uint64."""
+    x = x.copy()
+    largo = np.zeros(len(x), dtype='int64')
+    for s in (32, 16, 8, 4, 2, 1):
+        grande = x >= np.uint64(1 << s)
+        largo += grande * s
+        x = np.where(grande, x >> np.uint64(s), x)
+    return largo + (x > 0)
+
+
+def hll_agregar(sketch, valores):
+    p = sketch['p']
+    h = hashes_valores(valores)
+    if len(h) == 0:
+        return sketch
+    indice = (h >> np.uint64(64 - p)).astype('int64')
+    resto = h & np.uint64((1 << (64 - p)) - 1)
+    # Posición del primer 1 en los 64 - p bits restantes
+    rango = ((64 - p) - largo_bits(resto) + 1).astype('uint8')
+    np.maximum.at(sketch['registros'], indice, rango)
+    return sketch
+
+
+def hll_fusionar(a, b):
+    if a['p'] != b['p']:
+        raise ValueError("HyperLogLog con distinta precisión")
+    return {'tipo': 'hll', 'p': a['p'], 'registros': np.maximum(a['registros'], b['registros'])}
+
+
+def hll_estimar(sketch):
+    registros = sketch['registros']
+    m = len(registros)
+    alfa = 0.7213 / (1 + 1.079 / m)
+    estimado = alfa * m * m / np.sum(np.ldexp(1.0, -registros.astype('int64')))
+    vacios = int(np.count_nonzero(registros == 0))
+    if estimado <= 2.5 * m and vacios:
+        # Rango bajo: conteo lineal
+        estimado = m * np.log(m / vacios)
+    return int(round(estimado))
+
+
+# ============================================================================
+# SPACE-SAVING (MÁS FRECUENTES)
+# ============================================================================
+
+def frecuentes_nuevo(capacidad=CAPACIDAD_FRECUENTES):
+    """Resumen vacío: 'conteos' es {valor: [conteo estimado, error máximo]}."""
+    return {'tipo': 'frecuentes', 'capacidad': capacidad, 'n': 0, 'conteos': {}}
+
+
+def recortar(conteos, capacidad):
+    """Conserva los `capacidad` contadores más altos (empates por valor, determinista)."""
+    if len(conteos) <= capacidad:
+        return conteos
+    orden = sorted(conteos.items(), key=lambda item: (-item[1][0], str(item[0])))
+    return dict(orden[:capacidad])
+
+
+def minimo_contador(sketch):
+    """Cota de la frecuencia de un valor ausente (0 si el resumen no está lleno)."""
+    if len(sketch['conteos']) < sketch['capacidad']:
+        return 0
+    return min(conteo for conteo, _ in sketch['conteos'].values())
+
+
+def frecuentes_fusionar(a, b):
+    """
+    Fusión de resúmenes Space-Saving: a un valor ausente de un resumen se
+    le suma el menor contador de ese resumen (si está lleno), que acota su
+    frecuencia real ahí, y se conservan los `capacidad` mayores.
+    """
+    capacidad = min(a['capacidad'], b['capacidad'])
+    min_a, min_b = minimo_contador(a), minimo_contador(b)
+    conteos = {}
+    for valor in a['conteos'].keys() | b['conteos'].keys():
+        conteo_a, error_a = a['conteos'].get(valor, (min_a, min_a))
+        conteo_b, error_b = b['conteos'].get(valor, (min_b, min_b))
+        conteos[valor] = [conteo_a + conteo_b, error_a + error_b]
+    return {'tipo': 'frecuentes', 'capacidad': capacidad, 'n': a['n'] + b['n'],
+            'conteos': recortar(conteos, capacidad)}
+
+
+def frecuentes_agregar(sketch, valores, pesos=None):
+    """
+    Agrega un bloque: se cuenta exacto (suma de `pesos` si se indican) y se
+    fusiona como un resumen cuyo menor contador acota a los que no entran.
+    """
+    serie = pd.Series(pesos if pesos is not None else 1, index=pd.Index(valores))
+    serie = serie[serie.index.notna()]
+    totales = serie.groupby(level=0, observed=True).sum()
+    bloque = frecuentes_nuevo(sketch['capacidad'])
+    bloque['n'] = int(serie.sum())
+    bloque['conteos'] = recortar({valor_python(v): [int(c), 0] for v, c in totales.items()},
+                                 sketch['capacidad'])
+    return frecuentes_fusionar(sketch, bloque)
+
+
+def frecuentes_top(sketch, n=None):
+    """Series de conteos estimados de mayor a menor (como value_counts), los n primeros."""
+    orden = sorted(sketch['conteos'].items(), key=lambda item: (-item[1][0], str(item[0])))[:n]
+    return pd.Series([conteo for _, (conteo, _) in orden], index=[valor for valor, _ in orden],
+                     dtype='int64', name='n')
+
+
+def valor_python(valor):
+    """Tipos NumPy → Python (claves comparables y serializables)."""
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+# ============================================================================
+# OPERACIONES GENERALES Y SERIALIZACIÓN
+# ============================================================================
+
+FUSIONES = {
+    'kll': kll_fusionar,
+    'hll': hll_fusionar,
+    'frecuentes': frecuentes_fusionar,
+}
+
+
+def fusionar(a, b):
+    """Fusiona dos sketches del mismo tipo."""
+    if a['tipo'] != b['tipo']:
+        raise ValueError(f"No se pueden fusionar sketches {a['tipo']} y {b['tipo']}")
+    return FUSIONES[a['tipo']](a, b)
+
+
+def codificar_arreglo(arreglo):
+    return {'dtype': str(arreglo.dtype), 'datos': base64.b64encode(arreglo.tobytes()).decode('ascii')}
+
+
+def decodificar_arreglo(datos):
+    return np.frombuffer(base64.b64decode(datos['datos']), dtype=datos['dtype']).copy()
+
+
+def a_json(sketch):
+    """Sketch → dict serializable con json (arreglos en base64)."""
+    if sketch['tipo'] == 'kll':
+        return dict(sketch, niveles=[codificar_arreglo(nivel) for nivel in sketch['niveles']])
+    if sketch['tipo'] == 'hll':
+        return dict(sketch, registros=codificar_arreglo(sketch['registros']))
+    return dict(sketch, conteos=[[valor, conteo, error] for valor, (conteo, error) in sketch['conteos'].items()])
+
+
+def desde_json(datos):
+    if datos['tipo'] == 'kll':
+        return dict(datos, niveles=[decodificar_arreglo(nivel) for nivel in datos['niveles']])
+    if datos['tipo'] == 'hll':
+        return dict(datos, registros=decodificar_arreglo(datos['registros']))
+    return dict(datos, conteos={valor: [conteo, error] for valor, conteo, error in datos['conteos']})
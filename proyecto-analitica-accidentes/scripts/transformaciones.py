@@ -0,0 +1,475 @@
+"""
+Transformaciones de limpieza y enriquecimiento (Etapa 2)
+Funciones compartidas por create_database.py para procesar el dataset
+completo en memoria o bloque a bloque (modo streaming).
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+
+# Mapeo de nombres comunes en datasets de accidentes
+COLUMNAS_COMUNES = {
+    'id': ['id', 'accident_id', 'index'],
+    'severity': ['severity', 'accident_severity'],
+    'start_time': ['start_time', 'date', 'datetime', 'accident_date'],
+    'city': ['city', 'ciudad'],
+    'state': ['state', 'estado', 'province'],
+    'weather_condition': ['weather_condition', 'weather', 'clima'],
+    'temperature_f': ['temperature_f', 'temperature', 'temp'],
+    'visibility_mi': ['visibility_mi', 'visibility'],
+    'description': ['description', 'descripcion']
+}
+
+# Columnas mínimas necesarias para el análisis
+COLUMNAS_NECESARIAS = ['severity', 'start_time', 'city', 'weather_condition',
+                       'temperature_f', 'visibility_mi']
+
+# Columnas numéricas cuyos nulos se imputan con la mediana global
+COLUMNAS_MEDIANA = ['temperature_f', 'visibility_mi']
+
+COLUMNAS_TEXTO = ['city', 'state', 'weather_condition']
+
+# Columnas estándar que se leen del CSV como texto, sin inferir el tipo
+# (un bloque sin valores tampoco llega como float). El id de origen es
+# texto libre ('A-0'): leerlo como número dependería de cada bloque
+COLUMNAS_LECTURA_TEXTO = ['id', 'start_time', 'city', 'state', 'weather_condition', 'description']
+
+# Normalización de nombres: espacios, '/' y '-' → '_', sin paréntesis ni acentos
+TRADUCCION_NOMBRES = str.maketrans({
+    ' ': '_', '/': '_', '-': '_', '(': None, ')': None,
+    'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
+})
+
+# Clave estable de fila y hash del contenido de origen (modo incremental)
+COLUMNAS_CLAVE = ['row_key', 'row_hash']
+
+# Filas por tramo al calcular hashes de fila (acota la memoria temporal)
+FILAS_POR_HASH = 100_000
+
+# Huellas de fila (hash_filas): hash fijo de un nulo de cualquier tipo y
+# constantes para combinar las columnas. VERSION_HUELLAS cambia si cambia
+# el hash, para no mezclar en proyecto.db claves calculadas de otra forma
+HASH_NULO = np.uint64(0x9E3779B97F4A7C15)
+SEMILLA_HASH = np.uint64(0x345678)
+MULTIPLICADOR_HASH = np.uint64(1_000_003)
+VERSION_HUELLAS = 2
+
+# Mayor magnitud (exclusiva) que cabe en int64 como float64
+LIMITE_INT64 = 2.0**63
+
+# Texto que read_csv leería como número (entero, decimal o infinito)
+PATRON_NUMERO = r'\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*|\s*[-+]?(?i:inf|infinity)\s*'
+
+BINS_VISIBILIDAD = [0, 2, 5, 10, float('inf')]
+ETIQUETAS_VISIBILIDAD = ['Muy Baja (0-2 mi)', 'Baja (2-5 mi)', 'Media (5-10 mi)', 'Alta (>10 mi)']
+
+BINS_TEMPERATURA = [0, 40, 60, 80, float('inf')]
+ETIQUETAS_TEMPERATURA = ['Fría (<40°F)', 'Templada (40-60°F)', 'Cálida (60-80°F)', 'Muy Cálida (>80°F)']
+
+FECHA_INICIO = datetime(2023, 1, 1)
+FECHA_FIN = datetime(2024, 12, 31)
+
+
+# ============================================================================
+# 2.3 - 2.4 NOMBRES DE COLUMNAS
+# ============================================================================
+
+def normalizar_nombre(col):
+    """Normaliza un nombre de columna: minúsculas, sin espacios ni acentos."""
+    return col.lower().strip().translate(TRADUCCION_NOMBRES)
+
+
+def mapear_columnas(columnas):
+    """
+    Calcula el renombrado de normalización (2.3) y el mapeo a nombres
+    estándar (2.4) a partir de los encabezados originales.
+
+    Retorna (columnas_nuevas, columnas_encontradas):
+      - columnas_nuevas: {original: normalizado}
+      - columnas_encontradas: {estandar: normalizado}
+    """
+    columnas_nuevas = {col: normalizar_nombre(col) for col in columnas}
+    normalizadas = set(columnas_nuevas.values())
+
+    columnas_encontradas = {}
+    for col_estandar, posibles_nombres in COLUMNAS_COMUNES.items():
+        for nombre in posibles_nombres:
+            if nombre in normalizadas:
+                columnas_encontradas[col_estandar] = nombre
+                break
+
+    return columnas_nuevas, columnas_encontradas
+
+
+def tipos_lectura(columnas):
+    """Tipo explícito (texto) de las columnas originales que mapean a una columna de texto."""
+    columnas_nuevas, columnas_encontradas = mapear_columnas(columnas)
+    estandar = {v: k for k, v in columnas_encontradas.items()}
+    return {col: 'str' for col in columnas if estandar.get(columnas_nuevas[col]) in COLUMNAS_LECTURA_TEXTO}
+
+
+def proyectar_columnas(columnas):
+    """
+    Columnas originales que conserva --solo-mapeadas: las que mapean a un
+    nombre estándar. Retorna None si ninguna mapea a id ni a start_time:
+    sin ellas las columnas mapeadas no identifican la fila y proyectar
+    solo perdería información.
+    """
+    columnas_nuevas, columnas_encontradas = mapear_columnas(columnas)
+    if not {'id', 'start_time'} & set(columnas_encontradas):
+        return None
+    estandar = set(columnas_encontradas.values())
+    return [col for col in columnas if columnas_nuevas[col] in estandar]
+
+
+def columna_id(columnas):
+    """Columna original que mapea al id de origen, o None si no hay."""
+    columnas_nuevas, columnas_encontradas = mapear_columnas(columnas)
+    if 'id' not in columnas_encontradas:
+        return None
+    return next(col for col in columnas if columnas_nuevas[col] == columnas_encontradas['id'])
+
+
+def estandarizar_columnas(df, columnas_nuevas, columnas_encontradas):
+    """
+    Aplica la normalización y el mapeo de nombres a un DataFrame en un solo
+    paso, reasignando df.columns (sin reconstruir el DataFrame).
+    """
+    estandar = {v: k for k, v in columnas_encontradas.items()}
+    nombres = [columnas_nuevas.get(col, col) for col in df.columns]
+    df.columns = [estandar.get(nombre, nombre) for nombre in nombres]
+    return df
+
+
+def filtrar_filas(df, conservar):
+    """
+    Conserva las filas marcadas en `conservar` (array booleano) copiando
+    columna a columna y soltando cada columna original tras copiarla, de
+    modo que nunca coexisten dos DataFrames completos en memoria.
+    """
+    columnas = {}
+    for col in list(df.columns):
+        columnas[col] = df.pop(col)[conservar]
+    return pd.DataFrame(columnas, copy=False)
+
+
+def bits_numericos(valores):
+    """
+    Representación de 64 bits de cada número: los enteros exactos como
+    int64 (5 y 5.0 iguales, ids mayores que 2^53 sin colisiones) y el resto
+    como float64. Retorna (bits int64, máscara de nulos).
+    """
+    valores = np.asarray(valores)
+    if valores.dtype.kind in 'iu':
+        return valores.astype('int64'), np.zeros(len(valores), dtype=bool)
+    valores = valores.astype('float64')
+    nulos = np.isnan(valores)
+    enteros = ~nulos & (np.trunc(valores) == valores) & (np.abs(valores) < LIMITE_INT64)
+    bits = valores.view('int64').copy()
+    bits[enteros] = valores[enteros].astype('int64')
+    return bits, nulos
+
+
+def hash_unicos(unicos):
+    """
+    Hash de cada valor distinto de una columna no numérica: los que read_csv
+    habría leído como número ('5', '5.0') hashean como ese número y el resto
+    (booleanos incluidos, como 'True') como su texto. to_numeric solo corre
+    sobre los textos con forma de número (PATRON_NUMERO), no sobre fechas o
+    descripciones.
+    """
+    unicos = np.asarray(unicos, dtype=object)
+    if pd.api.types.infer_dtype(unicos, skipna=False) != 'string':
+        unicos = unicos.astype(str).astype(object)
+    hashes = pd.util.hash_array(unicos)
+
+    candidatos = pd.Series(unicos, dtype='str').str.fullmatch(PATRON_NUMERO).to_numpy(dtype=bool)
+    candidatos = np.flatnonzero(candidatos)
+    if len(candidatos):
+        numeros = pd.to_numeric(pd.Series(unicos[candidatos]), errors='coerce').to_numpy()
+        bits, no_numericos = bits_numericos(numeros)
+        if numeros.dtype.kind == 'f':
+            # Con decimales to_numeric pasa a float64: los enteros grandes se releen exactos
+            grandes = ~no_numericos & (np.abs(numeros) >= 2.0**53) & (np.trunc(numeros) == numeros)
+            for i in np.flatnonzero(grandes):
+                try:
+                    bits[i] = int(unicos[candidatos[i]].strip())
+                except (ValueError, OverflowError):
+                    pass
+        hashes[candidatos[~no_numericos]] = pd.util.hash_array(bits[~no_numericos])
+    return hashes
+
+
+def hash_columna(serie):
+    """
+    Hash de 64 bits (uint64) por valor de una columna, independiente del
+    tipo que pandas infiera en cada bloque: un nulo da HASH_NULO sea la
+    columna texto, float64 u objeto, y el texto '5' da lo mismo que el
+    número 5 (ver bits_numericos y hash_unicos).
+    """
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        if serie.dtype.kind in 'iu':
+            bits, nulos = bits_numericos(serie.to_numpy())
+        else:
+            bits, nulos = bits_numericos(serie.to_numpy(dtype='float64', na_value=np.nan))
+        hashes = pd.util.hash_array(bits)
+        hashes[nulos] = HASH_NULO
+        return hashes
+    # Texto, objetos y booleanos: se hashean solo los valores distintos
+    codigos, unicos = pd.factorize(serie)
+    hashes = np.append(hash_unicos(unicos), HASH_NULO)
+    return hashes[codigos]
+
+
+def hash_filas(df):
+    """
+    Hash de 64 bits por fila (como int64, apto para SQLite), independiente
+    del tipo que pandas infiera en cada bloque o archivo (ver hash_columna):
+    la misma fila da la misma huella en memoria, por bloques, en otro
+    archivo o al reanudar una ingesta incremental.
+
+    El hash de cada fila no depende de las demás, así que se calcula por
+    tramos de FILAS_POR_HASH: los objetos temporales que pandas crea para
+    hashear texto quedan acotados al tramo.
+    """
+    hashes = np.empty(len(df), dtype='int64')
+    for inicio in range(0, len(df), FILAS_POR_HASH):
+        tramo = df.iloc[inicio:inicio + FILAS_POR_HASH]
+        huella = np.full(len(tramo), SEMILLA_HASH, dtype='uint64')
+        for _, serie in tramo.items():
+            huella ^= hash_columna(serie)
+            huella *= MULTIPLICADOR_HASH
+        hashes[inicio:inicio + len(tramo)] = huella.view('int64')
+    return hashes
+
+
+def agregar_claves(df, contenido=None, claves=None):
+    """
+    Agrega row_key (id de origen si existe, si no hash del contenido) y
+    row_hash (hash del contenido) calculados sobre las columnas de origen,
+    antes de crear columnas sintéticas o transformar valores. `contenido`
+    y `claves` permiten reutilizar los hashes ya calculados para detectar
+    duplicados.
+    """
+    if contenido is None:
+        contenido = hash_filas(df)
+    if claves is None:
+        claves = hash_filas(df[['id']]) if 'id' in df.columns else contenido
+    df['row_key'] = claves
+    df['row_hash'] = contenido
+    return df
+
+
+def crear_columnas_sinteticas(df):
+    """Crea columnas sintéticas para demostración si faltan en el dataset."""
+    if 'severity' not in df.columns:
+        df['severity'] = np.random.choice([1, 2, 3, 4], size=len(df), p=[0.4, 0.35, 0.2, 0.05])
+
+    if 'city' not in df.columns:
+        ciudades = ['Medellín', 'Bogotá', 'Cali', 'Barranquilla', 'Cartagena']
+        df['city'] = np.random.choice(ciudades, size=len(df))
+
+    if 'weather_condition' not in df.columns:
+        climas = ['Despejado', 'Lluvia leve', 'Nublado', 'Lluvia fuerte', 'Neblina']
+        df['weather_condition'] = np.random.choice(climas, size=len(df))
+
+    if 'temperature_f' not in df.columns:
+        df['temperature_f'] = np.random.uniform(50, 95, size=len(df))
+
+    if 'visibility_mi' not in df.columns:
+        df['visibility_mi'] = np.random.uniform(0.5, 10, size=len(df))
+
+    return df
+
+
+# ============================================================================
+# 2.5 TIPOS DE DATOS
+# ============================================================================
+
+def calcular_medianas(df):
+    """Medianas de las columnas imputables, tras la coerción a numérico."""
+    return {
+        col: pd.to_numeric(df[col], errors='coerce').median()
+        for col in COLUMNAS_MEDIANA if col in df.columns
+    }
+
+
+def convertir_numericos(df, medianas=None):
+    """
+    Convierte severity, temperature_f y visibility_mi a numérico.
+
+    Los nulos de temperatura y visibilidad se imputan con `medianas`; si no
+    se indican se calculan sobre el propio DataFrame (modo en memoria).
+    Retorna (df, medianas).
+    """
+    # Severity
+    if 'severity' in df.columns:
+        df['severity'] = pd.to_numeric(df['severity'], errors='coerce')
+        df['severity'] = df['severity'].fillna(2).astype(int)
+        df['severity'] = df['severity'].clip(1, 4)
+
+    medianas = dict(medianas or {})
+    for col in COLUMNAS_MEDIANA:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+            if col not in medianas:
+                medianas[col] = df[col].median()
+            df[col] = df[col].fillna(medianas[col])
+
+    return df, medianas
+
+
+def normalizar_texto(df):
+    """
+    Limpia las columnas de texto (strip + title, nulos → 'Desconocido').
+
+    La limpieza se aplica solo a los valores distintos (pd.factorize) y se
+    expande con los códigos, en vez de crear una cadena nueva por fila.
+    """
+    for col in COLUMNAS_TEXTO:
+        if col in df.columns:
+            codigos, unicos = pd.factorize(df[col], use_na_sentinel=False)
+            limpios = pd.Series(unicos).astype(str).str.strip().str.title()
+            limpios = limpios.replace('Nan', 'Desconocido')
+            df[col] = pd.Series(limpios.array.take(codigos), index=df.index)
+    return df
+
+
+def convertir_fechas(df):
+    """
+    Convierte start_time a datetime (valores inválidos → NaT).
+
+    El texto se convierte por tramos de FILAS_POR_HASH con el formato que
+    pandas deduce del primer valor no nulo, el mismo que usaría sobre la
+    columna completa: los objetos temporales del parseo quedan acotados al
+    tramo en vez de crecer con todo el DataFrame.
+    """
+    if 'start_time' not in df.columns:
+        return df
+    serie = df['start_time']
+    if not pd.api.types.is_string_dtype(serie) or len(serie) <= FILAS_POR_HASH:
+        df['start_time'] = pd.to_datetime(serie, errors='coerce')
+        return df
+    primero = serie.first_valid_index()
+    formato = None if primero is None else guess_datetime_format(serie.loc[primero])
+    df['start_time'] = pd.concat([
+        pd.to_datetime(serie.iloc[inicio:inicio + FILAS_POR_HASH], errors='coerce', format=formato)
+        for inicio in range(0, len(serie), FILAS_POR_HASH)
+    ])
+    return df
+
+
+def requiere_fechas_sinteticas(nulos_fecha, total):
+    """Si más de la mitad de start_time es nulo se generan fechas aleatorias."""
+    return nulos_fecha > total * 0.5
+
+
+def generar_fechas_aleatorias(n, semilla=None):
+    """
+    Genera n fechas aleatorias entre FECHA_INICIO y FECHA_FIN con
+    aritmética datetime64 de NumPy.
+
+    Día, hora y minuto uniformes equivalen a un desplazamiento uniforme en
+    minutos desde FECHA_INICIO, así que basta un sorteo por fila. Con la
+    misma `semilla` (entero o secuencia de enteros) el resultado se repite.
+    """
+    dias = (FECHA_FIN - FECHA_INICIO).days + 1
+    rng = np.random.default_rng(semilla)
+    minutos = rng.integers(0, dias * 24 * 60, size=n)
+    fechas = np.datetime64(FECHA_INICIO, 'm') + minutos.astype('timedelta64[m]')
+    return fechas.astype('datetime64[ns]')
+
+
+# ============================================================================
+# 3.1 - 3.2 ENRIQUECIMIENTO
+# ============================================================================
+
+def agregar_variables_temporales(df):
+    """3.1 Variables temporales derivadas de start_time."""
+    if 'start_time' in df.columns:
+        df['fecha'] = df['start_time'].dt.date
+        df['anio'] = df['start_time'].dt.year
+        df['mes'] = df['start_time'].dt.month
+        df['mes_nombre'] = df['start_time'].dt.month_name()
+        df['dia'] = df['start_time'].dt.day
+        df['dia_semana'] = df['start_time'].dt.day_name()
+        df['hora'] = df['start_time'].dt.hour
+        df['trimestre'] = df['start_time'].dt.quarter
+    return df
+
+
+def agregar_categorias(df):
+    """3.2 Variables categóricas de visibilidad y temperatura."""
+    # Categoría de visibilidad
+    if 'visibility_mi' in df.columns:
+        df['categoria_visibilidad'] = pd.cut(
+            df['visibility_mi'],
+            bins=BINS_VISIBILIDAD,
+            labels=ETIQUETAS_VISIBILIDAD
+        )
+
+    # Categoría de temperatura
+    if 'temperature_f' in df.columns:
+        df['categoria_temperatura'] = pd.cut(
+            df['temperature_f'],
+            bins=BINS_TEMPERATURA,
+            labels=ETIQUETAS_TEMPERATURA
+        )
+
+    return df
+
+
+def enriquecer(df):
+    """Agrega variables temporales (3.1) y categóricas derivadas (3.2)."""
+    df = agregar_variables_temporales(df)
+    return agregar_categorias(df)
+
+
+# ============================================================================
+# MODO STREAMING
+# ============================================================================
+
+def perfilar_bloque(df):
+    """
+    Primera pasada del modo streaming: extrae de un bloque ya estandarizado
+    lo necesario para las estadísticas globales (valores para las medianas
+    y nulos de start_time tras la conversión a fecha).
+    """
+    perfil = {'valores': {}, 'nulos_fecha': 0}
+    for col in COLUMNAS_MEDIANA:
+        if col in df.columns:
+            valores = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64')
+            perfil['valores'][col] = valores[~np.isnan(valores)]
+    if 'start_time' in df.columns:
+        perfil['nulos_fecha'] = int(pd.to_datetime(df['start_time'], errors='coerce').isnull().sum())
+    return perfil
+
+
+def transformar_bloque(df, medianas, generar_fechas, semilla=None):
+    """Aplica los pasos 2.5 y 3.1-3.2 a un bloque con estadísticas globales."""
+    df, _ = convertir_numericos(df, medianas)
+    df = normalizar_texto(df)
+    df = convertir_fechas(df)
+    if generar_fechas and 'start_time' in df.columns:
+        df['start_time'] = generar_fechas_aleatorias(len(df), semilla)
+    return enriquecer(df)
+
+
+def transformar_particion(df, medianas):
+    """
+    Pasos 2.5 y 3.1-3.2 sobre una partición del dataset en memoria (modo
+    paralelo). Las fechas sintéticas se deciden después, con el total de
+    nulos de todas las particiones. Retorna (df, nulos_fecha).
+    """
+    df, _ = convertir_numericos(df, medianas)
+    df = normalizar_texto(df)
+    df = convertir_fechas(df)
+    nulos_fecha = int(df['start_time'].isnull().sum()) if 'start_time' in df.columns else 0
+    return enriquecer(df), nulos_fecha
@@ -0,0 +1,81 @@
+"""
+Regresión: una fila duplicada se detecta igual leyendo el archivo completo
+(modo memoria) que por bloques (--chunksize), aunque un bloque quede con
+una columna sin valores y pandas la infiera como float64.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from entradas import abrir_entrada, encabezado_entrada, leer_bloques_entrada  # noqa: E402
+from huellas import huellas_nuevas, registrar  # noqa: E402
+from transformaciones import hash_filas, tipos_lectura  # noqa: E402
+
+# Con bloques de 3 filas el segundo bloque solo tiene la fila repetida y
+# Notes queda sin valores (float64); en el primero Notes es texto
+CSV_DUPLICADO = (
+    'Severity,City,Notes\n'
+    '1,A,\n'
+    '2,B,x\n'
+    '3,C,\n'
+    '1,A,\n'
+)
+
+
+def duplicados(ruta, chunksize=None):
+    """Filas descartadas por huella repetida, como en limpiar_dataset."""
+    entrada = abrir_entrada(ruta)
+    lectura = {'dtype': tipos_lectura(encabezado_entrada(entrada))}
+    vistas = huellas_nuevas()
+    descartadas = 0
+    for bloque in leer_bloques_entrada(entrada, chunksize=chunksize, lectura=lectura):
+        descartadas += int((~registrar(vistas, hash_filas(bloque))).sum())
+    return descartadas
+
+
+@pytest.fixture
+def csv_duplicado(tmp_path):
+    ruta = tmp_path / 'road_accidents.csv'
+    ruta.write_text(CSV_DUPLICADO)
+    return str(ruta)
+
+
+def test_duplicado_igual_en_memoria_y_por_bloques(csv_duplicado):
+    assert duplicados(csv_duplicado) == 1
+    assert duplicados(csv_duplicado, chunksize=3) == 1
+    assert duplicados(csv_duplicado, chunksize=1) == 1
+
+
+def test_id_repetido_no_depende_del_bloque(tmp_path):
+    ruta = tmp_path / 'road_accidents.csv'
+    ruta.write_text('ID,Severity\nA-0,1\n9007199254740993,2\n9007199254740993,2\n')
+    entrada = abrir_entrada(str(ruta))
+    completos = next(leer_bloques_entrada(entrada))
+    por_fila = list(leer_bloques_entrada(entrada, chunksize=1))
+    assert por_fila[2]['ID'].dtype.kind == 'i'
+    esperado = hash_filas(completos[['ID']])
+    obtenido = np.concatenate([hash_filas(bloque[['ID']]) for bloque in por_fila])
+    assert (esperado == obtenido).all()
+
+
+@pytest.mark.parametrize('a, b', [
+    (pd.Series([np.nan]), pd.Series([None], dtype='str')),
+    (pd.Series([np.nan]), pd.Series([None], dtype=object)),
+    (pd.Series([5]), pd.Series(['5'], dtype='str')),
+    (pd.Series([5]), pd.Series([5.0])),
+    (pd.Series([2**53 + 1]), pd.Series(['9007199254740993', 'x'], dtype='str').iloc[:1]),
+])
+def test_huella_independiente_del_tipo(a, b):
+    assert hash_filas(a.to_frame('c'))[0] == hash_filas(b.to_frame('c'))[0]
+
+
+def test_enteros_grandes_no_colisionan():
+    ids = pd.DataFrame({'id': np.array([2**53, 2**53 + 1], dtype='int64')})
+    huellas = hash_filas(ids)
+    assert huellas[0] != huellas[1]